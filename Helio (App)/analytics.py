@@ -0,0 +1,223 @@
+import numpy as np
+
+DAY = 86400
+HOUR = 3600
+
+# Half-life of the exponentially weighted trend, in seconds
+EWMA_HALF_LIFE = 3 * DAY
+
+# Rolling windows shown in the Analytics window, in days
+ROLLING_WINDOWS = (7, 30)
+
+# A day is flagged as a change point when its mean is this many standard
+# deviations away from the trailing 30-day baseline
+CHANGE_POINT_Z = 2.5
+CHANGE_POINT_MIN_DAYS = 7
+
+# Keeps exp() well inside float64 range when the EWMA is vectorized
+_EWMA_CHUNK_SPAN = 500
+
+
+def _ewma(times, scores, tau, start_time=None, start_value=None):
+    """Time-aware EWMA: each sample is weighted by the gap since the previous.
+
+    s_i = D_i * (s_0 + sum_j a_j x_j / D_j) with D_i = exp(-(t_i - t_0) / tau),
+    evaluated in chunks so exp() of long spans never overflows.
+    """
+    out = np.empty(len(times), dtype=np.float64)
+    if not len(times):
+        return out
+    x = scores.astype(np.float64)
+    t = times.astype(np.float64)
+
+    if start_time is None:
+        prev_t, prev_s = t[0], x[0]
+    else:
+        prev_t, prev_s = float(start_time), float(start_value)
+
+    i = 0
+    while i < len(t):
+        # Largest chunk whose span keeps exp() bounded
+        end = int(np.searchsorted(t, prev_t + _EWMA_CHUNK_SPAN * tau, side="right"))
+        end = max(end, i + 1)
+        ct, cx = t[i:end], x[i:end]
+        gaps = np.diff(np.r_[prev_t, ct])
+        alpha = 1.0 - np.exp(-gaps / tau)
+        growth = np.exp((ct - prev_t) / tau)
+        acc = np.cumsum(alpha * cx * growth)
+        out[i:end] = (prev_s + acc) / growth
+        prev_t, prev_s = ct[-1], out[end - 1]
+        i = end
+    return out
+
+
+class TrendAnalytics:
+    """Cached trend analytics over a ScoreStore.
+
+    New scores are folded into the EWMA and the heatmap in O(new samples);
+    the rolling means and change points work on the day rollup, so their cost
+    depends on the number of days, not the number of scores.
+    """
+
+    def __init__(self, store, half_life=EWMA_HALF_LIFE, state=None):
+        self.store = store
+        self.tau = half_life / np.log(2)
+        self._reset()
+        if state:
+            self._restore(state)
+
+    def _reset(self):
+        self._count = 0
+        self._revision = self.store.revision
+        self._ewma = np.empty(0, dtype=np.float64)
+        self._heat_sum = np.zeros((7, 24), dtype=np.float64)
+        self._heat_count = np.zeros((7, 24), dtype=np.int64)
+        self._daily = None
+
+    def state(self):
+        """Cached EWMA and heatmap sums, for the session snapshot"""
+        self.refresh()
+        return {
+            "count": self._count,
+            "tau": self.tau,
+            "ewma": self._ewma,
+            "heat_sum": self._heat_sum,
+            "heat_count": self._heat_count,
+        }
+
+    def _restore(self, state):
+        # Only valid if the store itself came back unchanged from the snapshot
+        try:
+            count = state["count"]
+            if (not self.store.restored or state["tau"] != self.tau
+                    or count != len(self.store) or len(state["ewma"]) != count):
+                return
+            self._ewma = state["ewma"].astype(np.float64)
+            self._heat_sum = state["heat_sum"].astype(np.float64)
+            self._heat_count = state["heat_count"].astype(np.int64)
+        except (KeyError, AttributeError):
+            return
+        self._count = count
+
+    def refresh(self):
+        """Fold any scores added since the last call into the cached results"""
+        if self.store.revision != self._revision or len(self.store) < self._count:
+            self._reset()
+        count = len(self.store)
+        if count == self._count:
+            return False
+
+        times = self.store.times[self._count:]
+        scores = self.store.scores[self._count:]
+
+        if self._count:
+            new = _ewma(times, scores, self.tau,
+                        start_time=self.store.times[self._count - 1],
+                        start_value=self._ewma[-1])
+        else:
+            new = _ewma(times, scores, self.tau)
+        self._ewma = np.concatenate([self._ewma, new])
+
+        local = times + self.store.utc_offset
+        weekday = ((local // DAY) + 3) % 7  # 1970-01-01 was a Thursday
+        hour = (local % DAY) // HOUR
+        np.add.at(self._heat_sum, (weekday, hour), scores)
+        np.add.at(self._heat_count, (weekday, hour), 1)
+
+        self._count = count
+        self._daily = None
+        return True
+
+    def ewma(self, tier=None):
+        """EWMA trend as (times, values); sampled at rollup buckets if tier is given"""
+        self.refresh()
+        times = self.store.times
+        if tier is None:
+            return times, self._ewma
+        bucket_ends = self.store.rollup(tier)["t"] + self.store.rollups[tier].width
+        idx = np.searchsorted(times, bucket_ends, side="left") - 1
+        idx = np.clip(idx, 0, max(len(times) - 1, 0))
+        return bucket_ends - self.store.rollups[tier].width, self._ewma[idx]
+
+    def daily(self):
+        """Per-day means, rolling means and change-point flags"""
+        self.refresh()
+        if self._daily is not None:
+            return self._daily
+
+        days = self.store.rollup("day")
+        t = days["t"]
+        sums = days["mean"].astype(np.float64) * days["count"]
+        counts = days["count"].astype(np.float64)
+        csum = np.r_[0.0, np.cumsum(sums)]
+        ccount = np.r_[0.0, np.cumsum(counts)]
+
+        result = {"t": t, "mean": days["mean"]}
+        end = np.arange(1, len(t) + 1)
+        for window in ROLLING_WINDOWS:
+            start = np.searchsorted(t, t - (window - 1) * DAY, side="left")
+            total = ccount[end] - ccount[start]
+            result[f"rolling_{window}"] = (csum[end] - csum[start]) / np.maximum(total, 1)
+
+        result["change_points"] = self._change_points(t, days["mean"].astype(np.float64))
+        self._daily = result
+        return result
+
+    @staticmethod
+    def _change_points(t, means):
+        """Flag days whose mean departs sharply from the trailing 30-day baseline"""
+        flags = np.zeros(len(t), dtype=bool)
+        if len(t) <= CHANGE_POINT_MIN_DAYS:
+            return flags
+        c1 = np.r_[0.0, np.cumsum(means)]
+        c2 = np.r_[0.0, np.cumsum(means ** 2)]
+        end = np.arange(len(t))  # baseline excludes the day itself
+        start = np.searchsorted(t, t - 30 * DAY, side="left")
+        n = end - start
+        valid = n >= CHANGE_POINT_MIN_DAYS
+        n_safe = np.maximum(n, 1)
+        mu = (c1[end] - c1[start]) / n_safe
+        var = np.maximum((c2[end] - c2[start]) / n_safe - mu ** 2, 0.0)
+        z = np.abs(means - mu) / (np.sqrt(var) + 0.25)
+        flags[valid & (z > CHANGE_POINT_Z)] = True
+        return flags
+
+    def heatmap(self):
+        """7 x 24 matrix of mean score by weekday (Monday first) and hour; NaN where empty"""
+        self.refresh()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self._heat_count > 0, self._heat_sum / self._heat_count, np.nan)
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling to `threshold` points.
+
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's average,
+    so peaks survive where plain striding would drop them.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+
+    bucket_size = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * bucket_size).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    picks = np.empty(threshold, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[end:next_end].mean()
+        avg_y = yf[end:next_end].mean()
+        area = np.abs(
+            (xf[a] - avg_x) * (yf[start:end] - yf[a])
+            - (xf[a] - xf[start:end]) * (avg_y - yf[a])
+        )
+        a = start + int(np.argmax(area))
+        picks[i + 1] = a
+    return x[picks], y[picks]
@@ -0,0 +1,133 @@
+import tkinter as tk
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from analytics import lttb
+from indicators import DEPRESSION_LEVELS
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+class AnalyticsCanvas:
+    """Long-lived Matplotlib canvas for the Analytics window.
+
+    Built once with the object-oriented Figure API (never pyplot, so nothing is
+    left in pyplot's global figure registry). New scores update the existing
+    artists in place, and every series is downsampled with LTTB to the canvas
+    width in pixels before it is handed to Matplotlib.
+    """
+
+    def __init__(self, master, store, analytics, bg="#2c3e50"):
+        self.store = store
+        self.analytics = analytics
+
+        self.figure = Figure(figsize=(10, 8))
+        self.figure.patch.set_facecolor(bg)
+        grid = self.figure.add_gridspec(2, 1, height_ratios=[3, 2])
+        self.ax = self.figure.add_subplot(grid[0])
+        self.heat_ax = self.figure.add_subplot(grid[1])
+        self._style_axes(bg)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.widget.bind("<Destroy>", self._on_destroy, add="+")
+
+        # Artists are created once and only their data changes afterwards
+        empty = np.array([], dtype='datetime64[s]')
+        self.hourly_line, = self.ax.plot(empty, [], linestyle='none', marker='.',
+                                         color='#3498db', alpha=0.4, label='Hourly mean')
+        self.trend_line, = self.ax.plot(empty, [], color='#FFD700', linewidth=2, label='Trend')
+        self.rolling_lines = {
+            7: self.ax.plot(empty, [], color='#2ecc71', label='7-day mean')[0],
+            30: self.ax.plot(empty, [], color='#e67e22', label='30-day mean')[0],
+        }
+        self.change_points, = self.ax.plot(empty, [], linestyle='none', marker='o',
+                                           color='#e74c3c', label='Change point')
+        for min_val, _, label in DEPRESSION_LEVELS[1:]:  # Skip the lowest level
+            self.ax.axhline(y=min_val, color='#95a5a6', linestyle='--', alpha=0.5)
+            self.ax.annotate(label, xy=(0, min_val + 0.1), xycoords=('axes fraction', 'data'),
+                             color='#95a5a6')
+        self.ax.legend(loc='upper left', fontsize=8, facecolor=bg, labelcolor='white')
+
+        self.heat_image = self.heat_ax.imshow(np.full((7, 24), np.nan), aspect='auto',
+                                              cmap='magma', vmin=0, vmax=6)
+
+        self.figure.tight_layout()
+        self.update()
+
+    def _style_axes(self, bg):
+        ax = self.ax
+        ax.set_facecolor(bg)
+        ax.set_xlabel('Date & Time', color='white')
+        ax.set_ylabel('Concern Level', color='white')
+        ax.tick_params(axis='x', colors='white', rotation=45)
+        ax.tick_params(axis='y', colors='white')
+        for side in ('bottom', 'top', 'right', 'left'):
+            ax.spines[side].set_color('white')
+
+        heat_ax = self.heat_ax
+        heat_ax.set_facecolor(bg)
+        heat_ax.set_yticks(range(7))
+        heat_ax.set_yticklabels(WEEKDAYS)
+        heat_ax.set_xticks(range(0, 24, 3))
+        heat_ax.set_xlabel('Hour of Day', color='white')
+        heat_ax.tick_params(colors='white')
+
+    def _pixel_width(self):
+        width = self.widget.winfo_width()
+        if width <= 1:  # Not mapped yet
+            width = int(self.figure.get_figwidth() * self.figure.dpi)
+        return width
+
+    def _to_dates(self, t):
+        return (t + self.store.utc_offset).astype('datetime64[s]')
+
+    def _set_series(self, line, t, y, points):
+        t, y = lttb(t, y, points)
+        line.set_data(self._to_dates(t), y)
+
+    def update(self):
+        """Pull new scores from the analytics cache and redraw lazily"""
+        if self.figure is None:
+            return
+        self.analytics.refresh()
+        points = self._pixel_width()
+
+        hourly = self.store.rollup('hour')
+        self._set_series(self.hourly_line, hourly['t'], hourly['mean'], points)
+        ewma_times, ewma = self.analytics.ewma('hour')
+        self._set_series(self.trend_line, ewma_times, ewma, points)
+
+        daily = self.analytics.daily()
+        for window, line in self.rolling_lines.items():
+            self._set_series(line, daily['t'], daily[f'rolling_{window}'], points)
+        flagged = daily['change_points']
+        self.change_points.set_data(self._to_dates(daily['t'][flagged]), daily['mean'][flagged])
+
+        self.heat_image.set_data(self.analytics.heatmap())
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def pack(self, **kwargs):
+        self.widget.pack(**kwargs)
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.close()
+
+    def close(self):
+        """Release the figure deterministically when the window goes away"""
+        if self.figure is None:
+            return
+        self.figure.clear()
+        self.figure = None
+        self.canvas = None
+        try:
+            if self.widget.winfo_exists():
+                self.widget.destroy()
+        except tk.TclError:
+            pass
@@ -1,24 +1,43 @@
+from lazy_imports import LazyModule, STARTUP, warm_up
+STARTUP.trace_imports()
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
-import speech_recognition as sr
-from elevenlabs import generate, play
-import tempfile
-import google.generativeai as genai
-from google.cloud import speech
-import io
-from PIL import Image, ImageTk
 from ttkbootstrap import Style
 import logging
 import dotenv
 import warnings
 from datetime import datetime
 import os
-import json
-import re
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from resources.themes import ThemeManager, THEMES
+import time
+from resources.themes import ThemeManager, THEMES, BUBBLE_STYLES, register_themed
+from resources.frame_clock import FrameClock
+from resources.plugins import PluginRegistry
+from indicators import INDICATOR_TABLES, COMPILED_INDICATORS, level_label
+from crisis_detector import CrisisDetector
+from language_detector import LanguageDetector
+from score_store import ScoreStore
+from analytics import TrendAnalytics
+from ui_dispatcher import UIDispatcher, install_thread_guard
+from recent_chat import RecentChatPanel
+from chat_store import ChatStore, ChatMessage, migrate_legacy
+from session_snapshot import load_snapshot, save_snapshot
+from log_pipeline import configure_logging, log_event
+import exporter
+from recommender import Recommender
+
+# Heavy subsystems load on first use, or on the warm-up thread once the
+# window is up (see TherapyApp.start_warm_up)
+sr = LazyModule("speech_recognition")
+elevenlabs = LazyModule("elevenlabs")
+speech = LazyModule("google.cloud.speech")
+genai = LazyModule(
+    "google.generativeai",
+    on_load=lambda module: module.configure(api_key=GEMINI_API_KEY)
+)
+analytics_canvas = LazyModule("analytics_canvas")  # pulls in Matplotlib
+
+STARTUP.stop_import_trace()
 
 # Suppress warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -87,7 +106,7 @@ CIRCLE_COLOR = "#FFD700"  # Yellow color
 CIRCLE_MIN_RADIUS = 40  # Minimum radius of the breathing circle
 CIRCLE_MAX_RADIUS = 80  # Maximum radius of the breathing circle
 CIRCLE_ANIMATION_SPEED = 0.8  # Increased speed for more noticeable pulsing
-ANIMATION_INTERVAL = 16  # Animation frame interval in milliseconds
+ANIMATION_INTERVAL = 16  # Reference frame interval in milliseconds for the speed above
 
 # Number of bars - calculate based on canvas width and bar sizes
 BAR_WIDTH = 4
@@ -97,229 +116,19 @@ BAR_HEIGHT = 100  # Base height for bars
 # Calculate number of bars to fit screen width
 NUM_BARS = int(400 / (BAR_WIDTH + BAR_SPACING))  # 400 is canvas width
 
-# Depression keywords and their weights
-DEPRESSION_INDICATORS = {
-    # 0.5 - Mild Symptoms
-    "bored|unmotivated|blah": 0.5,
-    "slightly sad|down day": 0.5,
-    "unfocused|distracted": 0.5,
-    "mood swings|irritable": 0.5,
-    "occasionally tearful|mild sadness": 0.5,
-    "disinterested|low motivation": 0.5,
-    "temporarily lonely|missing friends": 0.5,
-    "minor stress|daily worries": 0.5,
-    "low appetite|eating changes": 0.5,
-    "sleep changes|restless nights": 0.5,
-
-    # 1.0 - Noticeable Distress
-    "tired|exhausted|fatigue|no energy": 1.0,
-    "can't sleep|insomnia|nightmares": 1.0,
-    "anxious|worried|afraid|fear": 1.0,
-    "low energy|drained|lethargic": 1.0,
-    "sleep issues|restlessness": 1.0,
-    "nervous|apprehensive|on edge": 1.0,
-    "overwhelmed|stressed|burdened": 1.0,
-    "difficulty concentrating": 1.0,
-    "headaches|body aches": 1.0,
-    "social withdrawal": 1.0,
-
-    # 1.5 - Early Warning Signs
-    "no interest|don't care|apathy": 1.5,
-    "lack of enjoyment|indifference": 1.5,
-    "not motivated|can't be bothered": 1.5,
-    "stopped hobbies|no passion": 1.5,
-    "disengaged|detached": 1.5,
-    "nothing matters|mechanical living": 1.5,
-    "emotional numbness": 1.5,
-    "can't feel happy|flat affect": 1.5,
-    "no desires|apathetic": 1.5,
-    "uninterested|withdrawn": 1.5,
-
-    # 2.0 - Moderate Symptoms
-    "hopeless|worthless|useless": 2.0,
-    "crying|tears": 2.0,
-    "guilt|failure|mistake|fault": 2.0,
-    "self-blame|self-critical": 2.0,
-    "shame|embarrassed|humiliated": 2.0,
-    "feeling like a burden": 2.0,
-    "regret|remorse": 2.0,
-    "no self-worth|self-loathing": 2.0,
-    "worthlessness|undeserving": 2.0,
-    "dwelling on past mistakes": 2.0,
-
-    # 2.5 - Developing Severity
-    "persistent sadness": 2.5,
-    "feeling stuck|trapped": 2.5,
-    "loss of hope|pessimism": 2.5,
-    "questioning purpose": 2.5,
-    "chronic fatigue": 2.5,
-    "emotional pain|heartache": 2.5,
-    "feeling hollow|empty": 2.5,
-    "prolonged grief": 2.5,
-    "neglecting self-care": 2.5,
-    "avoiding family": 2.5,
-
-    # 3.0 - Severe Isolation
-    "alone|lonely|isolated": 3.0,
-    "social isolation": 3.0,
-    "feeling unloved|unwanted": 3.0,
-    "no one understands": 3.0,
-    "abandoned|rejected": 3.0,
-    "isolating self": 3.0,
-    "friendless|no support": 3.0,
-    "feeling like an outcast": 3.0,
-    "disconnected|estranged": 3.0,
-    "self-imposed isolation": 3.0,
-
-    # 3.5 - Crisis Development
-    "intense despair": 3.5,
-    "constant crying spells": 3.5,
-    "paralyzing insecurity": 3.5,
-    "feeling trapped": 3.5,
-    "mental anguish": 3.5,
-    "can't see a future": 3.5,
-    "debilitating guilt": 3.5,
-    "physical pain from sadness": 3.5,
-    "unbearable loneliness": 3.5,
-    "neglecting responsibilities": 3.5,
-
-    # 4.0 - Critical State
-    "sad|unhappy|miserable|depressed": 4.0,
-    "deep sorrow|grief-stricken": 4.0,
-    "paralyzing depression": 4.0,
-    "unbearable pain": 4.0,
-    "emptiness|numbness": 4.0,
-    "constant despair": 4.0,
-    "completely hopeless": 4.0,
-    "major depressive episode": 4.0,
-    "unable to function": 4.0,
-    "utter despair": 4.0,
-
-    # 4.5 - Emergency Level
-    "suicidal thoughts|self-harm": 4.5,
-    "planning death": 4.5,
-    "feeling beyond help": 4.5,
-    "giving up on recovery": 4.5,
-    "psychotic depression": 4.5,
-    "extreme withdrawal": 4.5,
-    "severe detachment": 4.5,
-    "mental collapse": 4.5,
-    "can't get out of bed": 4.5,
-    "total isolation": 4.5,
-
-    # 5.0 - Immediate Intervention Needed
-    "suicide|die|end|kill|myself": 5.0,
-    "ending my life": 5.0,
-    "no will to live": 5.0,
-    "want to disappear": 5.0,
-    "life is pointless": 5.0,
-    "self-harm urges": 5.0,
-    "death wishes": 5.0,
-    "ending it all": 5.0,
-    "wishing to die": 5.0,
-    "suicidal plans": 5.0
-}
-
-# Depression keywords and their weights for Hindi
-HINDI_DEPRESSION_INDICATORS = {
-    # 0.5 - Mild Symptoms
-    "बोर|अप्रेरित|थका हुआ": 0.5,
-    "थोड़ा दुखी|उदास दिन": 0.5,
-    "ध्यान नहीं लग रहा|विचलित": 0.5,
-    "मूड स्विंग्स|चिड़चिड़ा": 0.5,
-    "कभी-कभी रोना|हल्का दुख": 0.5,
-
-    # 1.0 - Noticeable Distress
-    "थका हुआ|थकान|ऊर्जा नहीं": 1.0,
-    "नींद नहीं आती|बुरे सपने": 1.0,
-    "चिंतित|परेशान|डर": 1.0,
-    "एकाग्रता में कठिनाई": 1.0,
-    "सिरदर्द|शारीरिक दर्द": 1.0,
-
-    # 2.0 - Moderate Symptoms
-    "निराशा|बेकार|व्यर्थ": 2.0,
-    "रोना|आंसू": 2.0,
-    "अपराध|गलती|दोष": 2.0,
-    "शर्म|शर्मिंदगी": 2.0,
-    "बोझ महसूस करना": 2.0,
-
-    # 3.0 - Severe Symptoms
-    "अकेला|एकाकी|अलग-थलग": 3.0,
-    "कोई नहीं समझता": 3.0,
-    "त्यागा हुआ|अस्वीकृत": 3.0,
-    "सामाजिक अलगाव": 3.0,
-    "दोस्त नहीं|सहारा नहीं": 3.0,
-
-    # 4.0 - Critical State
-    "बहुत दुखी|बेहद दुखी": 4.0,
-    "गहरा दुख|शोक": 4.0,
-    "असहनीय दर्द": 4.0,
-    "खालीपन|सुन्नता": 4.0,
-    "कार्य नहीं कर पाना": 4.0,
-
-    # 5.0 - Emergency Level
-    "आत्महत्या|मौत": 5.0,
-    "जीने की इच्छा नहीं": 5.0,
-    "खत्म कर दूं|समाप्त": 5.0,
-    "मरने की इच्छा": 5.0,
-    "जीवन बेकार है": 5.0
-}
-
-# Depression keywords and their weights for Marathi
-MARATHI_DEPRESSION_INDICATORS = {
-    # 0.5 - Mild Symptoms
-    "कंटाळा|अप्रेरित|थकलेला": 0.5,
-    "थोडे दुःखी|उदास दिवस": 0.5,
-    "लक्ष लागत नाही|विचलित": 0.5,
-    "मूड स्विंग्स|चिडचिड": 0.5,
-    "कधीकधी रडणे|हलके दुःख": 0.5,
-
-    # 1.0 - Noticeable Distress
-    "थकलेला|थकवा|ऊर्जा नाही": 1.0,
-    "झोप येत नाही|वाईट स्वप्ne": 1.0,
-    "काळजी|त्रास|भीती": 1.0,
-    "एकाग्रता कठीण": 1.0,
-    "डोकेदुखी|शारीरिक वेदना": 1.0,
-
-    # 2.0 - Moderate Symptoms
-    "निराशा|व्यर्थ|बेकार": 2.0,
-    "रडणे|अश्रू": 2.0,
-    "अपराध|चूक|दोष": 2.0,
-    "लाज|लज्जा": 2.0,
-    "ओझे वाटणे": 2.0,
-
-    # 3.0 - Severe Symptoms
-    "एकटा|एकाकी|वेगळा": 3.0,
-    "कोणीही समजत नाही": 3.0,
-    "त्यागलेला|नाकारलेला": 3.0,
-    "सामाजिक एकांत": 3.0,
-    "मित्र नाहीत|आधार नाही": 3.0,
-
-    # 4.0 - Critical State
-    "खूप दुःखी|अतिशय दुःखी": 4.0,
-    "खोल दुःख|शोक": 4.0,
-    "असह्य वेदना": 4.0,
-    "रिक्तता|शून्यता": 4.0,
-    "काम करू शकत नाही": 4.0,
-
-    # 5.0 - Emergency Level
-    "आत्महत्या|मृत्यू": 5.0,
-    "जगण्याची इच्छा नाही": 5.0,
-    "संपवून टाकू|समाप्त": 5.0,
-    "मरण्याची इच्छा": 5.0,
-    "जीवन व्यर्थ आहे": 5.0
-}
+RECENT_MESSAGE_COUNT = 3  # Messages shown above the breathing circle
+HISTORY_PAGE_SIZE = 100  # Messages per page in the history window
 
-DEPRESSION_LEVELS = [
-    (0, 1.5, "Low concern"),
-    (1.5, 3.0, "Mild concern"),
-    (3.0, 4.5, "Moderate concern"),
-    (4.5, 6.0, "High concern"),
-    (6.0, float('inf'), "Severe concern")
-]
-
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+# Prepended to the prompt when the crisis fast path fires
+CRISIS_PROMPT = (
+    "IMPORTANT: The user may be in crisis or at risk of self-harm. Put their safety first: "
+    "respond with warmth, take them seriously, and gently encourage them to reach out to "
+    "a crisis line or someone they trust right now. The support resources are on screen."
+)
+CRISIS_FALLBACK_RESPONSE = (
+    "I'm really glad you told me. You don't have to go through this alone - "
+    "please reach out to one of the support lines on your screen right now."
+)
 
 class TherapyApp:
     def __init__(self, root):
@@ -328,6 +137,9 @@ class TherapyApp:
         self.root.geometry("800x600")
         self.root.configure(bg="#2c3e50")
         
+        # All UI work from worker threads goes through this dispatcher
+        self.ui = UIDispatcher(self.root)
+        
         # Initialize theme manager
         self.theme_manager = ThemeManager(self)
         
@@ -336,40 +148,132 @@ class TherapyApp:
         self.is_animating = False
         self.current_radius = 80
         self.pulse_direction = 1
-        self.voice_name = VOICE_OPTIONS["Lily(F)"]
-        self.personality = "Therapist"
-        self.chat_history = []
         self.user_id = "default_user"  # For future multi-user support
-        self.depression_scores = []
-        self.current_language = "English"  # Default language
         
-        # Add stress relief options
+        # Written on clean shutdown; each store checks its part against the
+        # files on disk and falls back to a normal load if anything changed
+        self.snapshot_path = os.path.join('chat_history', f"{self.user_id}_session.npz")
+        snapshot = load_snapshot(self.snapshot_path)
+        session = snapshot.get("session", {})
+        
+        # Last few hundred messages in memory; older ones stay on disk
+        self.chat_store = ChatStore(
+            os.path.join('chat_history', f"{self.user_id}_chat.jsonl"), state=snapshot.get("chat")
+        )
+        self.score_store = ScoreStore(
+            os.path.join('chat_history', f"{self.user_id}_scores.bin"), state=snapshot.get("scores")
+        )
+        self.analytics = TrendAnalytics(self.score_store, state=snapshot.get("analytics"))
+        self.meter_score = None
+        
+        # Settings from the last session, or the defaults
+        self.voice_key = session.get("voice") if session.get("voice") in VOICE_OPTIONS else "Lily(F)"
+        self.voice_name = VOICE_OPTIONS[self.voice_key]
+        self.personality = session.get("personality") if session.get("personality") in PERSONALITIES else "Therapist"
+        self.current_language = session.get("language") if session.get("language") in SUPPORTED_LANGUAGES else "English"
+        self.stt_language = self.current_language  # Follows speech and typed Devanagari messages
+        self.crisis_detector = CrisisDetector(INDICATOR_TABLES)
+        self.language_detector = LanguageDetector()
+        
+        # Stress relief modules are only located here; each one is imported
+        # when first opened, or earlier on the warm-up thread as concern rises
+        self.plugins = PluginRegistry().discover()
+        self.plugins.set_warm_hook("music", self._warm_music_player)
+        self.plugins.set_warm_hook("stories", self._warm_stories)
         self.stress_relief_options = {
-            "🎵 Relaxing Music": self.show_music_section,
-            "📖 Motivational Stories": self.show_stories_section,
-            "🎮 Stress Relief Games": self.show_games_section,
-    
+            "music": self.show_music_section,
+            "stories": self.show_stories_section,
+            "games": self.show_games_section,
+            "breathing": self.show_breathing_section,
         }
         
         # Add paths for resources
         self.resources_dir = os.path.join(os.path.dirname(__file__), 'resources')
         self.music_dir = os.path.join(self.resources_dir, 'music')
         self.stories_dir = os.path.join(self.resources_dir, 'stories')
+        self.stories_file = os.path.join(self.stories_dir, 'sample_stories.json')
         
-        # Initialize music player
+        # Suggests stories and music for the mood of recent messages
+        self.recommender = Recommender()
+        self.matched_indicators = []  # (pattern, weight) found by the last analysis
+        
+        # Initialize music player; built once, by whichever of the warm-up
+        # thread and the Tk thread gets there first
         self.music_player = None
+        self.music_player_lock = threading.Lock()
+        self.resources_window = None
+        self.analytics_window = None
+        self.analytics_canvas = None
+        self.export_job = None
+        self.export_window = None
         
         # Load any existing chat history
         self.load_chat_history()
         
         self.setup_ui()
+        self.restore_session(session)
         self.add_disclaimer()
         self.root.bind(HOTKEY, self.toggle_listening)
         self.check_dependencies()
         
-        # Calculate initial depression score if history exists
-        if self.chat_history:
+        # Warm start: the meter comes straight from the snapshot. Rescore only
+        # when the history changed since it was written
+        if (self.chat_store.restored and self.score_store.restored
+                and session.get("meter_score") is not None):
+            self.ui.post(self.update_depression_meter, session["meter_score"], key="depression_meter")
+        elif self.chat_store:
             self.analyze_depression_level()
+        STARTUP.mark("session warm start" if self.chat_store.restored else "session full load")
+        
+        self.root.bind("<Map>", self.on_first_map, add="+")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def restore_session(self, session):
+        """Apply the UI settings saved with the last session"""
+        if self.current_language != "English":
+            self.text_input.delete(0, tk.END)
+            self.text_input.insert(0, SUPPORTED_LANGUAGES[self.current_language]["ui_strings"]["type_placeholder"])
+        theme = session.get("theme")
+        if theme in THEMES and theme != self.theme_manager.current_theme:
+            self.theme_manager.apply_theme(theme)
+
+    def save_session(self):
+        """Snapshot settings, the chat working set and the analytics caches"""
+        save_snapshot(self.snapshot_path, {
+            "session": {
+                "personality": self.personality,
+                "voice": self.voice_key,
+                "language": self.current_language,
+                "theme": self.theme_manager.current_theme,
+                "meter_score": self.meter_score,
+            },
+            "chat": self.chat_store.state(),
+            "scores": self.score_store.state(),
+            "analytics": self.analytics.state(),
+        })
+
+    def on_close(self):
+        """Clean shutdown: stop background work and write the session snapshot"""
+        self.listening = False
+        if self.export_job is not None:
+            self.export_job.cancel()
+        try:
+            self.save_session()
+        finally:
+            self.ui.stop()
+            self.root.destroy()
+
+    def on_first_map(self, event):
+        """Record time-to-first-window and start warming up heavy imports"""
+        if event.widget is not self.root or STARTUP.elapsed_ms("window mapped") is not None:
+            return
+        STARTUP.mark("window mapped")
+        STARTUP.emit()
+        self.start_warm_up()
+
+    def start_warm_up(self):
+        """Import the subsystems most likely needed next, off the Tk thread"""
+        warm_up([genai, elevenlabs, sr, speech, analytics_canvas])
 
     def check_dependencies(self):
         if not GEMINI_API_KEY:
@@ -390,7 +294,7 @@ class TherapyApp:
         top_frame.pack(fill=tk.X, padx=10, pady=5, anchor=tk.NW)
 
         # Personality Selection
-        self.personality_var = tk.StringVar(value="Therapist")
+        self.personality_var = tk.StringVar(value=self.personality)
         personality_selector = ttk.Combobox(
             top_frame,
             textvariable=self.personality_var,
@@ -403,7 +307,7 @@ class TherapyApp:
         personality_selector.bind("<<ComboboxSelected>>", self.update_personality)
 
         # Voice Selection
-        self.voice_var = tk.StringVar(value="Lily(F)")
+        self.voice_var = tk.StringVar(value=self.voice_key)
         voice_selector = ttk.Combobox(
             top_frame,
             textvariable=self.voice_var,
@@ -416,7 +320,7 @@ class TherapyApp:
         voice_selector.bind("<<ComboboxSelected>>", self.update_voice)
 
         # Add Language Selection
-        self.language_var = tk.StringVar(value="English")
+        self.language_var = tk.StringVar(value=self.current_language)
         language_selector = ttk.Combobox(
             top_frame,
             textvariable=self.language_var,
@@ -458,10 +362,22 @@ class TherapyApp:
                  fieldbackground=[('readonly', '#4a4a4a')],
                  selectbackground=[('readonly', '#4a4a4a')],
                  selectforeground=[('readonly', 'white')])
+        
+        # Named label styles for secondary text and chat bubbles, so a theme
+        # switch restyles every History window through ttk instead of
+        # per-widget configure()
+        style.configure('Caption.TLabel', font=("Arial", 8),
+                        foreground="#95a5a6", background="#2c3e50")
+        style.configure('HistoryDate.TLabel', font=("Arial", 10, "bold"),
+                        foreground="#f39c12", background="#2c3e50")
+        for bubble_style, bubble_bg in BUBBLE_STYLES.items():
+            style.configure(bubble_style, font=("Arial", 12), padding=(15, 10),
+                            foreground="white", background=bubble_bg)
 
         # Recent Chat Frame
         self.recent_chat_frame = ttk.Frame(main_container, height=150)
         self.recent_chat_frame.pack(fill=tk.X, pady=10)
+        self.recent_chat = RecentChatPanel(self.recent_chat_frame, size=RECENT_MESSAGE_COUNT)
         
         # Depression Meter Frame
         meter_frame = ttk.Frame(main_container)
@@ -494,6 +410,7 @@ class TherapyApp:
         self.canvas = tk.Canvas(main_container, width=400, height=200, 
                                bg="#2c3e50", highlightthickness=0)
         self.canvas.pack(expand=True)
+        register_themed(self.canvas, "canvas")
         
         # Create breathing circle
         center_x = 200  # Center of canvas
@@ -506,7 +423,7 @@ class TherapyApp:
         
         # Initialize animation variables
         self.is_animating = False
-        self.animation_id = None
+        self.animation = None
         self.circle_radius = CIRCLE_MIN_RADIUS
         self.growing = True
 
@@ -547,6 +464,7 @@ class TherapyApp:
         # Create circular menu button first (switched position)
         self.menu_button = tk.Canvas(voice_frame, width=40, height=40, bg="#2c3e50", highlightthickness=0)
         self.menu_button.pack(side=tk.LEFT, padx=5)
+        register_themed(self.menu_button, "canvas")
         
         # Draw yellow circle
         self.menu_circle = self.menu_button.create_oval(5, 5, 35, 35, fill=CIRCLE_COLOR, outline=CIRCLE_COLOR)
@@ -567,17 +485,18 @@ class TherapyApp:
         self.add_message(f"Switched to {self.personality} mode", is_user=False)
 
     def update_voice(self, event=None):
-        selected_voice = self.voice_var.get()
-        self.voice_name = VOICE_OPTIONS[selected_voice]
+        self.voice_key = self.voice_var.get()
+        self.voice_name = VOICE_OPTIONS[self.voice_key]
 
     def update_language(self, event=None):
         """Update the UI language and recognition settings"""
         self.current_language = self.language_var.get()
+        self.stt_language = self.current_language
         # Update UI strings
         self.text_input.delete(0, tk.END)
         self.text_input.insert(0, SUPPORTED_LANGUAGES[self.current_language]["ui_strings"]["type_placeholder"])
-        # Clear and update chat with new language disclaimer
-        self.chat_history = []
+        # Show the disclaimer in the new language; history is kept, since
+        # scoring now detects the language of every message on its own
         self.add_message(SUPPORTED_LANGUAGES[self.current_language]["ui_strings"]["disclaimer"], is_user=False)
         self.add_message(SUPPORTED_LANGUAGES[self.current_language]["ui_strings"]["welcome"], is_user=False)
 
@@ -604,50 +523,40 @@ class TherapyApp:
             self.listening = False
             self.mic_button.config(style='success.TButton')
     
-    def add_message(self, text, is_user=False):
-        for widget in self.recent_chat_frame.winfo_children():
-            widget.destroy()
-        
-        message = {
-            "text": text,
-            "is_user": is_user,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "personality": self.personality if not is_user else None
-        }
-        
-        self.chat_history.append(message)
+    def add_message(self, text, is_user=False, spoken=False):
+        language = None
+        if is_user:
+            # Tag the message and let it pick the STT locale for the next
+            # utterance. Typed English is common from users who speak Hindi or
+            # Marathi, so only speech or a typed Devanagari-only message moves
+            # recognition; otherwise one English line would lock it to en-US
+            tag = self.language_detector.classify(text, fallback=self.current_language)
+            language = tag.language
+            typed_indic = tag.language != "English" and tag.languages == (tag.language,)
+            if spoken or typed_indic:
+                self.stt_language = tag.language
+        
+        message = ChatMessage(
+            text, is_user, int(time.time()),
+            personality=self.personality if not is_user else None,
+            language=language
+        )
         
-        # Save the updated chat history
-        self.save_chat_history()
+        # Appends one line to the log on disk; no rewrite of the whole history
+        self.chat_store.append(message)
         
         # If this is user input, analyze for depression indicators
         if is_user:
             self.analyze_depression_level()
 
-        bg_color = "#3498db" if is_user else "#e74c3c"
-        msg_frame = ttk.Frame(self.recent_chat_frame)
-        
-        msg_label = tk.Label(
-            msg_frame,
-            text=text,
-            wraplength=600,
-            font=("Arial", 12),
-            bg=bg_color,
-            fg="white",
-            padx=15,
-            pady=10,
-            relief=tk.FLAT,
-            borderwidth=0,
-            border=0
-        )
-        msg_label.pack()
-        msg_frame.place(relx=0.5, rely=0, anchor=tk.N)
-        msg_frame.after(10, lambda: msg_frame.pack(pady=5))
+        # Reuses the pooled bubbles in place: no destroy, no extra layout pass
+        self.recent_chat.add(text, is_user)
 
     def show_history(self):
         history_window = tk.Toplevel(self.root)
         history_window.title("Chat History")
         history_window.geometry("800x600")
+        register_themed(history_window, "window")
         
         main_frame = ttk.Frame(history_window)
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -662,6 +571,7 @@ class TherapyApp:
         export_btn.pack(anchor=tk.NE, padx=10, pady=10)
 
         canvas = tk.Canvas(main_frame, bg="#2c3e50", highlightthickness=0)
+        register_themed(canvas, "canvas")
         scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas)
 
@@ -676,97 +586,116 @@ class TherapyApp:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        # Group messages by date
-        messages_by_date = {}
-        for msg in reversed(self.chat_history):
-            date = msg['timestamp'].split()[0]  # Extract date part
-            if date not in messages_by_date:
-                messages_by_date[date] = []
-            messages_by_date[date].append(msg)
-        
-        # Display messages grouped by date
-        for date, messages in messages_by_date.items():
-            date_frame = ttk.Frame(scrollable_frame)
-            date_frame.pack(fill=tk.X, pady=(20, 10), padx=10)
-            
-            date_label = tk.Label(
-                date_frame,
-                text=date,
-                font=("Arial", 10, "bold"),
-                fg="#f39c12",
-                bg="#2c3e50"
+        # Newest page first; older pages are read from disk on request
+        state = {"before": len(self.chat_store), "last_date": None}
+        load_more_btn = ttk.Button(
+            scrollable_frame,
+            text="Load older messages",
+            style='secondary.TButton'
+        )
+
+        def show_page():
+            start = max(0, state["before"] - HISTORY_PAGE_SIZE)
+            page = self.chat_store.read(start, state["before"])
+            state["before"] = start
+            load_more_btn.pack_forget()
+            state["last_date"] = self._render_history_page(
+                scrollable_frame, reversed(page), state["last_date"]
             )
-            date_label.pack()
-            
-            # Display messages for this date
-            for msg in messages:
-                bg_color = "#3498db" if msg['is_user'] else "#e74c3c"
-                msg_frame = ttk.Frame(scrollable_frame)
-                msg_frame.pack(fill=tk.X, pady=5, padx=10)
-
-                header = f"{msg['timestamp']} - {msg['personality']}" if not msg['is_user'] else msg['timestamp']
-                timestamp_label = tk.Label(
-                    msg_frame,
-                    text=header,
-                    font=("Arial", 8),
-                    fg="#95a5a6",
-                    bg="#2c3e50"
-                )
-                timestamp_label.pack(anchor="ne" if msg['is_user'] else "nw")
-
-                content_frame = ttk.Frame(msg_frame)
-                content_frame.pack(fill=tk.X)
-
-                msg_label = tk.Label(
-                    content_frame,
-                    text=msg['text'],
-                    wraplength=600,
-                    font=("Arial", 12),
-                    bg=bg_color,
-                    fg="white",
-                    padx=15,
-                    pady=10,
-                    relief=tk.FLAT
+            if start > 0:
+                load_more_btn.pack(pady=10)
+
+        load_more_btn.configure(command=show_page)
+        show_page()
+
+    def _render_history_page(self, scrollable_frame, messages, last_date):
+        """Add messages (newest first) under date headers; returns the last date shown"""
+        for msg in messages:
+            timestamp = msg.timestamp
+            date = timestamp.split()[0]  # Extract date part
+            if date != last_date:
+                last_date = date
+                date_frame = ttk.Frame(scrollable_frame)
+                date_frame.pack(fill=tk.X, pady=(20, 10), padx=10)
+                
+                date_label = ttk.Label(
+                    date_frame,
+                    text=date,
+                    style='HistoryDate.TLabel'
                 )
-                msg_label.pack(side=tk.RIGHT if msg['is_user'] else tk.LEFT, fill=tk.X, expand=True)
+                date_label.pack()
+            
+            msg_frame = ttk.Frame(scrollable_frame)
+            msg_frame.pack(fill=tk.X, pady=5, padx=10)
+
+            header = f"{timestamp} - {msg.personality}" if not msg.is_user else timestamp
+            timestamp_label = ttk.Label(
+                msg_frame,
+                text=header,
+                style='Caption.TLabel'
+            )
+            timestamp_label.pack(anchor="ne" if msg.is_user else "nw")
+
+            content_frame = ttk.Frame(msg_frame)
+            content_frame.pack(fill=tk.X)
+
+            msg_label = ttk.Label(
+                content_frame,
+                text=msg.text,
+                wraplength=600,
+                style='UserBubble.TLabel' if msg.is_user else 'AIBubble.TLabel'
+            )
+            msg_label.pack(side=tk.RIGHT if msg.is_user else tk.LEFT, fill=tk.X, expand=True)
+        return last_date
 
     def send_text_message(self):
         user_input = self.text_input.get().strip()
         if user_input and user_input != "Type your message here...":
             self.text_input.delete(0, tk.END)
+            # Crisis check runs before anything else touches the message
+            crisis = self.check_crisis(user_input)
             self.add_message(user_input, is_user=True)
-            threading.Thread(target=self.process_text_input, args=(user_input,)).start()
-
-    def process_text_input(self, user_input):
-        response = self.generate_response(user_input)
-        self.root.after(0, self.add_message, response, False)
-        self.root.after(0, self.start_animation)
+            threading.Thread(target=self.process_text_input, args=(user_input, crisis)).start()
+
+    def check_crisis(self, text):
+        """Run the crisis fast path and surface support resources immediately"""
+        match = self.crisis_detector.check(text)
+        if not match:
+            return False
+        logging.warning("Crisis language detected in user message")
+        self.ui.call(self.show_support_resources, key="support_resources")
+        return True
+
+    def process_text_input(self, user_input, crisis=False):
+        response = self.generate_response(user_input, crisis=crisis)
+        self.ui.post(self.add_message, response, False)
         self.speak(response)
-        self.root.after(0, self.stop_animation)
 
-    def animate_circle(self):
-        if self.is_animating:
-            center_x = 200
-            center_y = 100
-            
-            # Update radius based on breathing direction with faster speed
-            if self.growing:
-                self.circle_radius += CIRCLE_ANIMATION_SPEED
-                if self.circle_radius >= CIRCLE_MAX_RADIUS:
-                    self.growing = False
-            else:
-                self.circle_radius -= CIRCLE_ANIMATION_SPEED
-                if self.circle_radius <= CIRCLE_MIN_RADIUS:
-                    self.growing = True
-            
-            # Update circle position
-            self.canvas.coords(self.circle,
-                center_x - self.circle_radius, center_y - self.circle_radius,
-                center_x + self.circle_radius, center_y + self.circle_radius
-            )
-            
-            # Schedule next animation frame
-            self.animation_id = self.root.after(ANIMATION_INTERVAL, self.animate_circle)
+    def animate_circle(self, dt):
+        """Frame clock callback: advance the breathing circle by elapsed time"""
+        if not self.is_animating:
+            return False
+        center_x = 200
+        center_y = 100
+        
+        # Same speed as the old fixed step at ANIMATION_INTERVAL, scaled by dt
+        step = CIRCLE_ANIMATION_SPEED * dt * 1000 / ANIMATION_INTERVAL
+        if self.growing:
+            self.circle_radius += step
+            if self.circle_radius >= CIRCLE_MAX_RADIUS:
+                self.circle_radius = CIRCLE_MAX_RADIUS
+                self.growing = False
+        else:
+            self.circle_radius -= step
+            if self.circle_radius <= CIRCLE_MIN_RADIUS:
+                self.circle_radius = CIRCLE_MIN_RADIUS
+                self.growing = True
+        
+        # Update circle position
+        self.canvas.coords(self.circle,
+            center_x - self.circle_radius, center_y - self.circle_radius,
+            center_x + self.circle_radius, center_y + self.circle_radius
+        )
 
     def start_animation(self):
         # Reset state and start fresh animation
@@ -774,13 +703,13 @@ class TherapyApp:
         self.is_animating = True
         self.growing = True
         self.circle_radius = CIRCLE_MIN_RADIUS
-        self.animate_circle()
+        self.animation = FrameClock.for_widget(self.root).register(self.animate_circle, self.root)
 
     def stop_animation(self):
         self.is_animating = False
-        if self.animation_id:
-            self.root.after_cancel(self.animation_id)
-            self.animation_id = None
+        if self.animation:
+            self.animation.stop()
+            self.animation = None
         
         # Reset circle to minimum size immediately
         center_x = 200
@@ -802,29 +731,30 @@ class TherapyApp:
         
         with sr.Microphone() as source:
             try:
-                print("Adjusting for ambient noise...")  # Debug print
                 recognizer.adjust_for_ambient_noise(source, duration=1)
-                print("Energy threshold:", recognizer.energy_threshold)  # Debug print
+                log_event(logging.INFO, "Microphone calibrated",
+                          energy_threshold=round(recognizer.energy_threshold))
                 
                 while self.listening:
                     if not self.pause_event.is_set():
-                        print("Listening...")  # Debug print
+                        log_event(logging.DEBUG, "Listening", every=20)
                         try:
                             audio = recognizer.listen(source, timeout=10, phrase_time_limit=30)
-                            print("Audio captured, transcribing...")  # Debug print
+                            log_event(logging.DEBUG, "Audio captured, transcribing", every=5)
                             
                             text = self.transcribe_audio(audio)
                             if text:
-                                print("Transcribed:", text)  # Debug print
-                                self.root.after(0, self.add_message, text, True)
-                                response = self.generate_response(text)
-                                self.root.after(0, self.add_message, response, False)
+                                # Length only; the transcript itself stays out of the log
+                                log_event(logging.DEBUG, "Transcribed", every=5,
+                                          chars=len(text), language=self.stt_language)
+                                crisis = self.check_crisis(text)
+                                self.ui.post(self.add_message, text, True, True)
+                                response = self.generate_response(text, crisis=crisis)
+                                self.ui.post(self.add_message, response, False)
                                 
-                                self.root.after(0, self.start_animation)
                                 self.speak(response)
-                                self.root.after(0, self.stop_animation)
                         except sr.WaitTimeoutError:
-                            print("Timeout occurred, continuing to listen...")  # Debug print
+                            log_event(logging.DEBUG, "Listen timeout, continuing", every=20)
                             continue  # Continue listening even if timeout occurs
                             
             except Exception as e:
@@ -832,7 +762,7 @@ class TherapyApp:
                 self.show_error("Audio processing error. Please try again.")
             finally:
                 self.listening = False
-                self.root.after(0, self.mic_button.config, {'style': 'success.TButton'})
+                self.ui.post(self.mic_button.config, {'style': 'success.TButton'}, key="mic_style")
 
     def transcribe_audio(self, audio):
         client = speech.SpeechClient()
@@ -843,7 +773,7 @@ class TherapyApp:
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
             sample_rate_hertz=44100,  # Changed from 48000 to 44100 to match WAV header
-            language_code=SUPPORTED_LANGUAGES[self.current_language]["code"],
+            language_code=SUPPORTED_LANGUAGES[self.stt_language]["code"],
             enable_automatic_punctuation=True
         )
 
@@ -853,13 +783,13 @@ class TherapyApp:
             return result.alternatives[0].transcript.strip()
         return ""
 
-    def generate_response(self, user_input):
+    def generate_response(self, user_input, crisis=False):
         try:
             # Collect last few messages for context
             context_window = []
-            for msg in self.chat_history[-6:]:  # Last 3 exchanges (6 messages)
-                role = "User: " if msg['is_user'] else f"AI: "
-                context_window.append(f"{role}{msg['text']}")
+            for msg in self.chat_store.last(6):  # Last 3 exchanges (6 messages)
+                role = "User: " if msg.is_user else f"AI: "
+                context_window.append(f"{role}{msg.text}")
             
             # Join context with newlines
             conversation_history = "\n".join(context_window)
@@ -869,27 +799,33 @@ class TherapyApp:
             # Add language prompt to personality prompt
             language_prompt = SUPPORTED_LANGUAGES[self.current_language]["gemini_prompt"]
             
+            # A crisis turn overrides the personality's brevity and tone
+            priority_prompt = f"{CRISIS_PROMPT}\n" if crisis else ""
+            
             response = model.generate_content(
+                f"{priority_prompt}"
                 f"{PERSONALITIES[self.personality]}\n"
                 f"{language_prompt}\n\n"
                 f"Previous conversation:\n{conversation_history}\n\n"
                 f"User: {user_input}",
                 generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=100
+                    temperature=0.3 if crisis else 0.7,
+                    max_output_tokens=200 if crisis else 100
                 )
             )
             return response.text
         except Exception as e:
             logging.error(f"Gemini API Error: {str(e)}")
+            if crisis:
+                return CRISIS_FALLBACK_RESPONSE
             return "I'm having trouble understanding. Could you rephrase that?"
 
     def speak(self, text):
         try:
             # Start animation before generating audio
-            self.root.after(0, self.start_animation)
+            self.ui.post(self.start_animation, key="animation")
             
-            audio_stream = generate(
+            audio_stream = elevenlabs.generate(
                 api_key=ELEVENLABS_API_KEY,
                 text=text,
                 voice=self.voice_name,
@@ -902,108 +838,72 @@ class TherapyApp:
                 if chunk:
                     audio_data += chunk
             
-            play(audio_data)
+            elevenlabs.play(audio_data)
             
             # Stop animation after playing audio
-            self.root.after(0, self.stop_animation)
+            self.ui.post(self.stop_animation, key="animation")
             
         except Exception as e:
             logging.error(f"TTS Error: {str(e)}")
-            self.stop_animation()  # Make sure to stop animation if there's an error
+            self.ui.post(self.stop_animation, key="animation")  # Make sure to stop animation if there's an error
             self.show_error("Speech generation failed. Check API key and internet connection")
 
     def show_error(self, message):
-        messagebox.showerror("Error", message)
-
-    def save_chat_history(self):
-        """Save chat history to a JSON file"""
-        # Create directory if it doesn't exist
-        os.makedirs('chat_history', exist_ok=True)
-        
-        # Save to a file specific to the user
-        filename = os.path.join('chat_history', f"{self.user_id}_chat_history.json")
-        
-        try:
-            with open(filename, 'w') as f:
-                json.dump({
-                    'chat_history': self.chat_history,
-                    'depression_scores': self.depression_scores
-                }, f, indent=2)
-        except Exception as e:
-            logging.error(f"Failed to save chat history: {str(e)}")
+        # Safe to call from worker threads: the dialog always opens on the Tk thread
+        self.ui.call(messagebox.showerror, "Error", message)
 
     def load_chat_history(self):
-        """Load chat history from JSON file"""
+        """Move the old chat_history.json into the chat and score stores, once"""
         filename = os.path.join('chat_history', f"{self.user_id}_chat_history.json")
-        
-        if not os.path.exists(filename):
-            return
-            
-        try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                self.chat_history = data.get('chat_history', [])
-                self.depression_scores = data.get('depression_scores', [])
-        except Exception as e:
-            logging.error(f"Failed to load chat history: {str(e)}")
+        migrate_legacy(filename, self.chat_store, self.score_store)
 
     def analyze_depression_level(self):
         """Analyze the chat history to determine depression level"""
-        recent_messages = [msg for msg in self.chat_history[-20:] if msg['is_user']]
+        recent_messages = [msg for msg in self.chat_store.last(20) if msg.is_user]
         
         if not recent_messages:
             return
         
         depression_score = 0
-        
-        # Select the appropriate depression indicators based on current language
-        if self.current_language == "Hindi":
-            indicators = HINDI_DEPRESSION_INDICATORS
-        elif self.current_language == "Marathi":
-            indicators = MARATHI_DEPRESSION_INDICATORS
-        else:  # Default to English
-            indicators = DEPRESSION_INDICATORS
+        matched = []
         
         for message in recent_messages:
-            text = message['text'].lower()
+            text = message.text.lower()
             
-            # Check for each depression indicator in the selected language
-            for pattern, weight in indicators.items():
-                if re.search(pattern, text):
-                    depression_score += weight
+            # Pick the indicator tables from the message itself, so code-mixed
+            # and older messages in another language are scored correctly
+            tag = self.language_detector.classify(text, fallback=self.current_language)
+            for language in tag.languages:
+                for pattern, weight in COMPILED_INDICATORS[language]:
+                    if pattern.search(text):
+                        depression_score += weight
+                        matched.append((pattern.pattern, weight))
+        self.matched_indicators = matched
         
         # Normalize by number of messages
         normalized_score = depression_score / max(1, len(recent_messages))
         
-        # Add timestamp and score to history
-        self.depression_scores.append({
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'score': normalized_score
-        })
+        # Add timestamp and score to history (appended to disk by the store)
+        self.score_store.append(normalized_score)
+        if self.analytics_canvas:
+            self.analytics_canvas.update()
         
-        # Save updated scores
-        self.save_chat_history()
-        
-        # Update UI if depression meter exists
+        # Update UI if depression meter exists; scores that arrive within one
+        # frame collapse into a single meter update
         if hasattr(self, 'depression_meter'):
-            self.update_depression_meter(normalized_score)
+            self.ui.post(self.update_depression_meter, normalized_score, key="depression_meter")
             
         return normalized_score
 
     def update_depression_meter(self, score):
         """Update the depression meter UI based on current score"""
+        self.meter_score = score
         # Convert score to a percentage for the meter (max score is around 8-10)
         percentage = min(100, score * 10)
         self.depression_meter['value'] = percentage
         
         # Update the label with current level
-        level_text = "Low concern"
-        for min_val, max_val, label in DEPRESSION_LEVELS:
-            if min_val <= score < max_val:
-                level_text = label
-                break
-        
-        self.meter_value_label.config(text=level_text)
+        self.meter_value_label.config(text=level_label(score))
         
         # Update color based on severity
         style = ttk.Style()
@@ -1014,15 +914,33 @@ class TherapyApp:
         else:
             style.configure("depression.Horizontal.TProgressbar", background="#e74c3c")  # Red - high
 
+        # Get the likely next modules ready before the user asks for them
+        self.warm_up_resources(score)
+
         # Suggest resources if concern level is high or severe
         self.suggest_resources(score)
 
     def show_analytics(self):
         """Show depression score analytics window with graph"""
+        # Reuse the open window instead of building another figure
+        if (self.analytics_window is not None and self.analytics_canvas is None
+                and len(self.score_store)):
+            # Opened before there was any data: rebuild with the graph
+            self.analytics_window.destroy()
+        if self.analytics_window is not None and self.analytics_window.winfo_exists():
+            self.analytics_window.deiconify()
+            self.analytics_window.lift()
+            if self.analytics_canvas:
+                self.analytics_canvas.update()
+            return
+        
         analytics_window = tk.Toplevel(self.root)
+        self.analytics_window = analytics_window
+        analytics_window.bind("<Destroy>", self._on_analytics_closed, add="+")
         analytics_window.title("Emotional Health Analytics")
-        analytics_window.geometry("800x600")
+        analytics_window.geometry("900x800")
         analytics_window.configure(bg="#2c3e50")
+        register_themed(analytics_window, "window")
         
         # Create main frame
         main_frame = ttk.Frame(analytics_window)
@@ -1036,7 +954,7 @@ class TherapyApp:
         )
         title_label.pack(pady=(0, 20))
         
-        if not self.depression_scores:
+        if not len(self.score_store):
             no_data_label = ttk.Label(
                 main_frame,
                 text="No data available yet. Continue conversations to generate analytics.",
@@ -1045,63 +963,9 @@ class TherapyApp:
             no_data_label.pack(expand=True)
             return
             
-        # Extract data
-        timestamps = []
-        scores = []
-        for score in self.depression_scores[-20:]:  # Last 20 scores
-            if score['timestamp'].strip():  # Check if timestamp is not empty
-                try:
-                    timestamp = datetime.strptime(score['timestamp'], "%Y-%m-%d %H:%M:%S")
-                    timestamps.append(timestamp)
-                    scores.append(score['score'])
-                except ValueError:
-                    # Skip invalid timestamps
-                    continue
-        
-        # Make sure we have data to plot
-        if not timestamps:
-            no_data_label = ttk.Label(
-                main_frame,
-                text="No valid timestamp data available yet.",
-                font=("Arial", 12)
-            )
-            no_data_label.pack(expand=True)
-            return
-            
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        fig.patch.set_facecolor('#2c3e50')
-        ax.set_facecolor('#2c3e50')
-        
-        # Extract data
-        timestamps = [datetime.strptime(score['timestamp'], "%Y-%m-%d %H:%M:%S") 
-                     for score in self.depression_scores[-20:]]  # Last 20 scores
-        scores = [score['score'] for score in self.depression_scores[-20:]]
-        
-        # Plot data
-        ax.plot(timestamps, scores, marker='o', linestyle='-', color='#3498db', linewidth=2)
-        
-        # Add reference lines for different levels
-        for min_val, _, label in DEPRESSION_LEVELS[1:]:  # Skip the lowest level
-            ax.axhline(y=min_val, color='#95a5a6', linestyle='--', alpha=0.5)
-            ax.text(timestamps[0], min_val + 0.1, label, color='#95a5a6')
-        
-        # Customize the plot
-        ax.set_xlabel('Date & Time', color='white')
-        ax.set_ylabel('Concern Level', color='white')
-        ax.tick_params(axis='x', colors='white', rotation=45)
-        ax.tick_params(axis='y', colors='white')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('white') 
-        ax.spines['right'].set_color('white')
-        ax.spines['left'].set_color('white')
-        
-        plt.tight_layout()
-        
-        # Embed plot in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=main_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # One persistent canvas per window; later scores update it in place
+        self.analytics_canvas = analytics_canvas.AnalyticsCanvas(main_frame, self.score_store, self.analytics)
+        self.analytics_canvas.pack(fill=tk.BOTH, expand=True)
         
         # Add explanation section
         explanation_frame = ttk.Frame(main_frame)
@@ -1123,38 +987,81 @@ class TherapyApp:
         )
         explanation_label.pack(fill=tk.X)
 
+    def _on_analytics_closed(self, event):
+        if event.widget is self.analytics_window:
+            if self.analytics_canvas:
+                self.analytics_canvas.close()
+            self.analytics_canvas = None
+            self.analytics_window = None
+
     def export_chat_history(self):
-        """Export chat history to a text file"""
+        """Export chat history and scores (TXT, CSV, JSONL or Parquet) in the background"""
+        if self.export_job is not None:
+            self.export_window.lift()
+            return
+        
         filename = filedialog.asksaveasfilename(
             initialfile=f"{self.user_id}_chat_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=exporter.FILETYPES
         )
         
         if not filename:  # User cancelled the dialog
             return
         
-        try:
-            with open(filename, 'w') as f:
-                f.write("=== AI Companion Chat History ===\n\n")
-                
-                for msg in self.chat_history:
-                    speaker = "User" if msg['is_user'] else f"AI ({msg['personality']})"
-                    f.write(f"[{msg['timestamp']}] {speaker}:\n{msg['text']}\n\n")
-                
-                f.write("\n=== Emotional Health Indicators ===\n")
-                for score in self.depression_scores:
-                    level_text = "Low concern"
-                    for min_val, max_val, label in DEPRESSION_LEVELS:
-                        if min_val <= score['score'] < max_val:
-                            level_text = label
-                            break
-                    
-                    f.write(f"[{score['timestamp']}] Score: {score['score']:.2f} - {level_text}\n")
-                
+        # Fix the range on the Tk thread; the worker streams it from disk and
+        # never sees messages added later
+        message_count = len(self.chat_store)
+        self.export_job = exporter.ExportJob(
+            filename,
+            self.chat_store.iter_range(0, message_count),
+            self.score_store.snapshot(),
+            message_count,
+            on_progress=lambda done, total: self.ui.post(
+                self._update_export_progress, done, total, key="export_progress"),
+            on_done=lambda error: self.ui.post(self._finish_export, filename, error)
+        )
+        self._show_export_progress()
+        self.export_job.start()
+
+    def _show_export_progress(self):
+        window = tk.Toplevel(self.root)
+        window.title("Exporting")
+        window.geometry("360x130")
+        window.transient(self.root)
+        window.protocol("WM_DELETE_WINDOW", self._cancel_export)
+        register_themed(window, "window")
+        self.export_window = window
+        
+        self.export_label = ttk.Label(window, text="Preparing export...")
+        self.export_label.pack(pady=(15, 5))
+        self.export_progress = ttk.Progressbar(
+            window, mode="determinate", length=300, maximum=max(1, self.export_job.total)
+        )
+        self.export_progress.pack(pady=5)
+        ttk.Button(window, text="Cancel", command=self._cancel_export).pack(pady=5)
+
+    def _update_export_progress(self, done, total):
+        if self.export_job is None:
+            return
+        self.export_progress['value'] = done
+        self.export_label.config(text=f"Exported {done:,} of {total:,} entries")
+
+    def _cancel_export(self):
+        if self.export_job is not None:
+            self.export_job.cancel()
+            self.export_label.config(text="Cancelling...")
+
+    def _finish_export(self, filename, error):
+        self.export_job = None
+        if self.export_window is not None:
+            self.export_window.destroy()
+            self.export_window = None
+        
+        if error is None:
             messagebox.showinfo("Export Successful", f"Chat history exported to {filename}")
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"Failed to export chat history: {str(e)}")
+        elif not isinstance(error, exporter.ExportCancelled):
+            messagebox.showerror("Export Failed", f"Failed to export chat history: {str(error)}")
 
     def suggest_resources(self, concern_level):
         """Show emergency resources when high concern levels are detected"""
@@ -1186,67 +1093,94 @@ class TherapyApp:
                         pass
         
         if should_show:
-            # Record that we're showing resources now
-            os.makedirs('chat_history', exist_ok=True)
-            with open(resources_shown_file, 'w') as f:
-                f.write(current_time.strftime("%Y-%m-%d %H:%M:%S"))
-                
-            # Create resources window
-            resources_window = tk.Toplevel(self.root)
-            resources_window.title("Support Resources")
-            resources_window.geometry("600x500")
-            resources_window.configure(bg="#2c3e50")
-            
-            # Add content to the window
-            frame = ttk.Frame(resources_window, padding=20)
-            frame.pack(fill=tk.BOTH, expand=True)
-            
-            ttk.Label(
-                frame, 
-                text="🧡 Support Resources", 
-                font=("Arial", 16, "bold")
-            ).pack(pady=(0, 20))
-            
+            self.show_support_resources()
+
+    def show_support_resources(self):
+        """Open the support resources window and record when it was shown"""
+        resources_shown_file = os.path.join('chat_history', f"{self.user_id}_resources_shown.txt")
+        
+        # Record that we're showing resources now
+        os.makedirs('chat_history', exist_ok=True)
+        with open(resources_shown_file, 'w') as f:
+            f.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        
+        # Reuse the window if it is already open
+        if self.resources_window is not None and self.resources_window.winfo_exists():
+            self.resources_window.deiconify()
+            self.resources_window.lift()
+            return
+        
+        # Create resources window
+        resources_window = tk.Toplevel(self.root)
+        self.resources_window = resources_window
+        resources_window.title("Support Resources")
+        resources_window.geometry("600x500")
+        resources_window.configure(bg="#2c3e50")
+        register_themed(resources_window, "window")
+        
+        # Add content to the window
+        frame = ttk.Frame(resources_window, padding=20)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(
+            frame, 
+            text="🧡 Support Resources", 
+            font=("Arial", 16, "bold")
+        ).pack(pady=(0, 20))
+        
+        ttk.Label(
+            frame,
+            text="We've noticed some concerning patterns in your conversation.\n"
+                 "Here are some resources that might help:",
+            font=("Arial", 12),
+            wraplength=550
+        ).pack(pady=(0, 20))
+        
+        # Calming content picked for the conversation so far
+        stories, tracks = self.recommendations()
+        if stories or tracks:
             ttk.Label(
                 frame,
-                text="We've noticed some concerning patterns in your conversation.\n"
-                     "Here are some resources that might help:",
-                font=("Arial", 12),
-                wraplength=550
-            ).pack(pady=(0, 20))
+                text="Something that might help right now:",
+                font=("Arial", 12, "bold")
+            ).pack(anchor=tk.W)
+            picks_frame = ttk.Frame(frame)
+            picks_frame.pack(fill=tk.X, pady=(5, 15))
+            for label, command in self._recommendation_entries(stories, tracks):
+                ttk.Button(picks_frame, text=label, command=command).pack(side=tk.LEFT, padx=(0, 5))
+        
+        # Crisis resources
+        resources = [
+            ("988 Suicide & Crisis Lifeline", "Call or text 988"),
+            ("Crisis Text Line", "Text HOME to 741741"),
+            ("National Alliance on Mental Illness", "1-800-950-NAMI (6264)"),
+            ("Substance Abuse and Mental Health Services Administration", "1-800-662-HELP (4357)")
+        ]
+        
+        for title, contact in resources:
+            resource_frame = ttk.Frame(frame)
+            resource_frame.pack(fill=tk.X, pady=5)
             
-            # Crisis resources
-            resources = [
-                ("988 Suicide & Crisis Lifeline", "Call or text 988"),
-                ("Crisis Text Line", "Text HOME to 741741"),
-                ("National Alliance on Mental Illness", "1-800-950-NAMI (6264)"),
-                ("Substance Abuse and Mental Health Services Administration", "1-800-662-HELP (4357)")
-            ]
-            
-            for title, contact in resources:
-                resource_frame = ttk.Frame(frame)
-                resource_frame.pack(fill=tk.X, pady=5)
-                
-                ttk.Label(
-                    resource_frame,
-                    text=title,
-                    font=("Arial", 12, "bold")
-                ).pack(anchor=tk.W)
-                
-                ttk.Label(
-                    resource_frame,
-                    text=contact,
-                    font=("Arial", 11)
-                ).pack(anchor=tk.W)
+            ttk.Label(
+                resource_frame,
+                text=title,
+                font=("Arial", 12, "bold")
+            ).pack(anchor=tk.W)
             
-            # Disclaimer
             ttk.Label(
-                frame,
-                text="\nRemember: This app is not a diagnostic tool or substitute for professional help.\n"
-                     "If you're experiencing a medical emergency, please call emergency services.",
-                font=("Arial", 10),
-                wraplength=550
-            ).pack(pady=20)
+                resource_frame,
+                text=contact,
+                font=("Arial", 11)
+            ).pack(anchor=tk.W)
+        
+        # Disclaimer
+        ttk.Label(
+            frame,
+            text="\nRemember: This app is not a diagnostic tool or substitute for professional help.\n"
+                 "If you're experiencing a medical emergency, please call emergency services.",
+            font=("Arial", 10),
+            wraplength=550
+        ).pack(pady=20)
 
     def show_stress_relief_menu(self, event):
         menu = tk.Menu(
@@ -1262,9 +1196,23 @@ class TherapyApp:
         menu.add_command(label="🎨 Theme Selector", command=self.show_theme_selector)
         menu.add_separator()
         
-        # Add other stress relief options
-        for option, command in self.stress_relief_options.items():
-            menu.add_command(label=option, command=command)
+        # Add other stress relief options; missing modules stay listed but disabled
+        for plugin in self.plugins:
+            command = self.stress_relief_options.get(plugin.name)
+            if command is None:
+                continue
+            if plugin.available:
+                menu.add_command(label=plugin.label, command=command)
+            else:
+                menu.add_command(label=f"{plugin.label} (not installed)", state=tk.DISABLED)
+        
+        # Picks for the current mood, when there is anything to go on
+        stories, tracks = self.recommendations()
+        if stories or tracks:
+            menu.add_separator()
+            menu.add_command(label="✨ Suggested for you", state=tk.DISABLED)
+            for label, command in self._recommendation_entries(stories, tracks):
+                menu.add_command(label=label, command=command)
         
         try:
             menu.tk_popup(
@@ -1279,6 +1227,7 @@ class TherapyApp:
         theme_window.title("Choose Theme")
         theme_window.geometry("400x500")
         theme_window.configure(bg=THEMES[self.theme_manager.current_theme]["bg"])
+        register_themed(theme_window, "window")
         
         ttk.Label(
             theme_window,
@@ -1299,38 +1248,101 @@ class TherapyApp:
         if theme_window:
             theme_window.destroy()
 
-    def show_music_section(self):
-        """Show the music player window"""
-        from resources.music.music_player import MusicPlayer, MusicPlayerUI
-        
-        if not self.music_player:
-            self.music_player = MusicPlayer(self.music_dir)
+    def _load_plugin(self, name):
+        """Import a stress relief module, telling the user if it is unavailable"""
+        module = self.plugins.load(name)
+        if module is None:
+            plugin = self.plugins.get(name)
+            reason = plugin.error if plugin and plugin.error else "it is not installed"
+            messagebox.showinfo(
+                "Not Available",
+                f"{plugin.label if plugin else name} can't be opened because {reason}."
+            )
+        return module
+
+    def recommendations(self):
+        """(stories, tracks) suited to the recent user messages"""
+        messages = [msg.text for msg in self.chat_store.last(20) if msg.is_user]
+        if not messages:
+            return [], []
+        if not self.recommender.stories_ready:
+            # Indexed on the warm-up thread; suggestions appear once it is done
+            self.plugins.warm_up(["stories"])
+        mood = self.recommender.mood(messages, self.matched_indicators)
+        stories = self.recommender.stories(messages, mood, limit=2)
+        tracks = self.recommender.tracks(self.music_player, mood, limit=2) if self.music_player else []
+        return stories, tracks
+
+    def _recommendation_entries(self, stories, tracks):
+        """(label, command) for each recommended story and track"""
+        entries = []
+        for story_id, title in stories:
+            entries.append((f"📖 {title}", lambda story_id=story_id: self.show_stories_section(story_id)))
+        for category, track in tracks:
+            entries.append((f"🎵 {track['name']}",
+                            lambda category=category, track=track: self.show_music_section(category, track)))
+        return entries
+
+    def _warm_stories(self, module):
+        """Index the stories and build their recommendation vectors on the warm-up thread"""
+        self.recommender.set_stories(module.open_store(self.stories_file))
+
+    def _warm_music_player(self, module):
+        """Create the player (and pygame.mixer) ahead of time on the warm-up thread"""
+        self._ensure_music_player(module)
+
+    def _ensure_music_player(self, module):
+        """The one MusicPlayer, built under a lock so two threads can't each start a mixer"""
+        with self.music_player_lock:
+            if not self.music_player:
+                self.music_player = module.MusicPlayer(self.music_dir)
+        return self.music_player
+
+    def warm_up_resources(self, score):
+        """Preload the stress relief modules likely to be opened at this concern level"""
+        if score >= 3.0:  # Moderate concern and above
+            self.plugins.warm_up(["music", "stories", "games", "breathing"])
+        elif score >= 1.5:  # Mild concern
+            self.plugins.warm_up(["music", "stories"])
+
+    def show_music_section(self, category=None, track=None):
+        """Show the music player window, optionally playing `track` from `category`"""
+        module = self._load_plugin("music")
+        if module is None:
+            return
         
-        MusicPlayerUI(self.root, self.music_player)
+        player_ui = module.MusicPlayerUI(self.root, self._ensure_music_player(module))
+        if track is not None:
+            player_ui.play_from(category, track)
 
-    def show_stories_section(self):
-        """Show the stories viewer window"""
-        from resources.stories.stories_viewer import StoriesViewer
+    def show_stories_section(self, story_id=None):
+        """Show the stories viewer window, optionally opened at one story"""
+        module = self._load_plugin("stories")
+        if module is None:
+            return
         
-        stories_file = os.path.join(self.stories_dir, 'sample_stories.json')
-        StoriesViewer(self.root, stories_file)
+        module.StoriesViewer(self.root, self.stories_file, story_id)
 
     def show_games_section(self):
         """Show the games hub window"""
-        from resources.games.games_module import GamesHub
-        GamesHub(self.root)
+        module = self._load_plugin("games")
+        if module is not None:
+            module.GamesHub(self.root)
 
     def show_breathing_section(self):
         """Show the breathing exercises window"""
-        from resources.breathing.breathing_exercises import BreathingExercises
-        BreathingExercises(self.root)
+        module = self._load_plugin("breathing")
+        if module is not None:
+            module.BreathingExercises(self.root)
 
 if __name__ == "__main__":
     style = Style(theme='darkly')
     root = style.master
+    install_thread_guard(root)
     try:
-        logging.basicConfig(level=logging.ERROR)
+        configure_logging(logging.DEBUG if os.getenv("HELIO_DEBUG") == "1" else logging.INFO)
         app = TherapyApp(root)
+        STARTUP.mark("TherapyApp ready")
         root.mainloop()
     except Exception as e:
         messagebox.showerror("Fatal Error", str(e))
\ No newline at end of file
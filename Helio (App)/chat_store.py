@@ -0,0 +1,238 @@
+import collections
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from score_store import TIMESTAMP_FORMAT
+
+# Messages kept in memory; everything older is read from disk when asked for
+WORKING_SET = 200
+
+# One int64 per message: byte offset of its line in the log
+OFFSET_DTYPE = np.dtype("<i8")
+
+
+class ChatMessage:
+    """One chat message, with the personality and language strings interned"""
+
+    __slots__ = ("text", "is_user", "t", "personality", "language")
+
+    def __init__(self, text, is_user, t, personality=None, language=None):
+        self.text = text
+        self.is_user = is_user
+        self.t = t  # epoch seconds
+        self.personality = sys.intern(personality) if personality else None
+        self.language = sys.intern(language) if language else None
+
+    @property
+    def timestamp(self):
+        return time.strftime(TIMESTAMP_FORMAT, time.localtime(self.t))
+
+    def to_json(self):
+        record = {"t": self.t, "u": self.is_user, "x": self.text}
+        if self.personality:
+            record["p"] = self.personality
+        if self.language:
+            record["l"] = self.language
+        return json.dumps(record, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line):
+        record = json.loads(line)
+        return cls(record["x"], record["u"], record["t"], record.get("p"), record.get("l"))
+
+
+class ChatStore:
+    """Chat history as an append-only JSON-lines log plus a binary offset index.
+
+    Only the last WORKING_SET messages are held in memory, so startup reads
+    the tail of the log instead of the whole history. Older messages are
+    fetched by index through the offset file, one seek per page. A `state`
+    from a session snapshot skips even that, if the log has not changed.
+    """
+
+    def __init__(self, log_path, capacity=WORKING_SET, state=None):
+        self.log_path = log_path
+        self.index_path = os.path.splitext(log_path)[0] + ".idx"
+        self.recent = collections.deque(maxlen=capacity)
+        self._count = 0
+        self._size = 0  # bytes in the log
+        self.restored = bool(state) and self._restore(state)
+        if not self.restored:
+            self._load()
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def _load(self):
+        if not os.path.exists(self.log_path):
+            return
+        self._size = os.path.getsize(self.log_path)
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        self._count = index_size // OFFSET_DTYPE.itemsize
+        if not self._index_matches_log():
+            self._rebuild_index()
+        self.recent.extend(self.read(max(0, self._count - self.recent.maxlen), self._count))
+
+    def state(self):
+        """Working set and log position, for the session snapshot"""
+        lines = "".join(message.to_json() + "\n" for message in self.recent)
+        return {
+            "count": self._count,
+            "size": self._size,
+            "messages": np.frombuffer(lines.encode("utf-8"), dtype=np.uint8),
+        }
+
+    def _restore(self, state):
+        # Valid only if neither the log nor the index moved since the snapshot
+        try:
+            index_size = os.path.getsize(self.index_path)
+            if (os.path.getsize(self.log_path) != state["size"]
+                    or index_size != state["count"] * OFFSET_DTYPE.itemsize):
+                return False
+            # Split on newlines only: to_json leaves U+2028, U+2029 and U+0085
+            # unescaped, and str.splitlines() would break messages on them
+            lines = state["messages"].tobytes().split(b"\n")
+            messages = [ChatMessage.from_json(line) for line in lines if line]
+        except (OSError, KeyError, ValueError):
+            return False
+        self._count = state["count"]
+        self._size = state["size"]
+        self.recent.extend(messages)
+        return True
+
+    def _offset(self, i):
+        with open(self.index_path, "rb") as f:
+            f.seek(i * OFFSET_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(OFFSET_DTYPE.itemsize), dtype=OFFSET_DTYPE)[0])
+
+    def _index_matches_log(self):
+        # The last indexed line must end exactly where the log ends
+        if self._count == 0:
+            return self._size == 0
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._offset(self._count - 1))
+                f.readline()
+                return f.tell() == self._size
+        except (OSError, IndexError):
+            return False
+
+    def _rebuild_index(self):
+        """Recreate the index after a crash between the log and index writes"""
+        logging.warning("Chat index out of date, rebuilding")
+        offsets = []
+        end = 0  # end of the last complete line
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offsets.append(end)
+                end += len(line)
+        if end < self._size:
+            # Drop a half-written last line so new appends start cleanly
+            os.truncate(self.log_path, end)
+            self._size = end
+        np.array(offsets, dtype=OFFSET_DTYPE).tofile(self.index_path)
+        self._count = len(offsets)
+
+    def append(self, message):
+        self.extend([message])
+
+    def extend(self, messages):
+        """Append messages to the log and index in one write each"""
+        if not messages:
+            return
+        lines = [(message.to_json() + "\n").encode("utf-8") for message in messages]
+        offsets = self._size + np.cumsum([0] + [len(line) for line in lines[:-1]], dtype=OFFSET_DTYPE)
+        self.recent.extend(messages)
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "ab") as f:
+                f.write(b"".join(lines))
+                size = f.tell()
+            with open(self.index_path, "ab") as f:
+                f.write(offsets.tobytes())
+        except OSError as e:
+            logging.error(f"Failed to save chat message: {str(e)}")
+            # Pages are read line by line from an indexed offset, so roll the
+            # log back to its last indexed line; if even that fails, later
+            # offsets at least follow the real end of the log
+            try:
+                if os.path.getsize(self.log_path) > self._size:
+                    os.truncate(self.log_path, self._size)
+            except OSError:
+                if os.path.exists(self.log_path):
+                    self._size = os.path.getsize(self.log_path)
+            return
+        self._size = size
+        self._count += len(lines)
+
+    def last(self, n):
+        """The last n messages, oldest first, from memory when possible"""
+        if n <= len(self.recent) or len(self.recent) == self._count:
+            return list(self.recent)[len(self.recent) - n:]
+        return self.read(max(0, self._count - n), self._count)
+
+    def read(self, start, stop):
+        """Messages start..stop-1, read from disk"""
+        stop = min(stop, self._count)
+        if start >= stop:
+            return []
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset(start))
+            return [ChatMessage.from_json(f.readline()) for _ in range(stop - start)]
+
+    def iter_range(self, start, stop, chunk_size=1000):
+        """Stream messages start..stop-1 from disk, one chunk in memory at a time"""
+        for chunk_start in range(start, stop, chunk_size):
+            yield from self.read(chunk_start, min(chunk_start + chunk_size, stop))
+
+    def import_legacy(self, chat_history):
+        """Append the old list of message dicts from chat_history.json"""
+        messages = []
+        for msg in chat_history:
+            try:
+                t = int(datetime.strptime(msg["timestamp"], TIMESTAMP_FORMAT).timestamp())
+                messages.append(ChatMessage(
+                    msg["text"], msg["is_user"], t, msg.get("personality"), msg.get("language")
+                ))
+            except (KeyError, TypeError, ValueError):
+                continue
+        self.extend(messages)
+        return len(messages)
+
+
+def migrate_legacy(legacy_path, chat_store, score_store):
+    """Move an old chat_history.json into the chat and score stores, once.
+
+    Each store only takes the legacy data while it is still empty, and the
+    file is renamed to *.migrated.json afterwards so it is never read again.
+    Returns whether a file was migrated.
+    """
+    if not os.path.exists(legacy_path):
+        return False
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Failed to load chat history: {str(e)}")
+        return False
+
+    if not chat_store:
+        chat_store.import_legacy(data.get("chat_history", []))
+    legacy_scores = data.get("depression_scores", [])
+    if legacy_scores and not len(score_store):
+        score_store.import_legacy(legacy_scores)
+
+    # Kept for reference, but never read again
+    os.replace(legacy_path, os.path.splitext(legacy_path)[0] + ".migrated.json")
+    return True
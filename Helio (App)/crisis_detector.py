@@ -0,0 +1,155 @@
+import re
+import time
+
+# Weight at which an indicator means "immediate intervention needed"
+CRISIS_WEIGHT = 5.0
+
+# Latency budget for a single check, in milliseconds
+CRISIS_LATENCY_BUDGET_MS = 1.0
+
+# Single words inside the 5.0 patterns that are far too common on their own
+# ("I did it myself", "at the end of the day", "kill some time", "I could
+# die laughing", a grandparent's death) to force the resources window. They
+# still count towards the averaged depression score, and their self-directed
+# phrasings are listed below.
+AMBIGUOUS_TERMS = {"end", "myself", "die", "kill", "समाप्त", "मौत", "मृत्यू"}
+
+# Extra phrasings that always go through the fast path
+EXTRA_CRISIS_TERMS = {
+    "English": ["suicidal", "kill myself", "killing myself", "end my life", "end it all",
+                "take my own life", "hurt myself", "want to die", "wanna die",
+                "wish i was dead", "wish i were dead", "better off dead"],
+    "Hindi": ["खुद को मार", "जान दे दूं", "मर जाना चाहता", "मर जाना चाहती", "मरना चाहता",
+              "मरना चाहती", "मुझे मौत चाहिए", "मौत आ जाए", "जीना नहीं चाहता", "जीना नहीं चाहती"],
+    "Marathi": ["स्वतःला संपव", "जीव देईन", "मरायचे आहे", "मरायचं आहे", "मला मृत्यू हवा",
+                "मृत्यू यावा", "जगायचं नाही", "जगायचे नाही"],
+}
+
+
+class CrisisDetector:
+    """Precompiled check for crisis language, run before any network call"""
+
+    def __init__(self, indicator_tables):
+        # indicator_tables maps a language name to its indicator dict
+        self.patterns = {}
+        for language, indicators in indicator_tables.items():
+            terms = []
+            for pattern, weight in indicators.items():
+                if weight < CRISIS_WEIGHT:
+                    continue
+                for term in pattern.split("|"):
+                    term = term.strip().lower()
+                    if term and term not in AMBIGUOUS_TERMS:
+                        terms.append(term)
+            terms.extend(EXTRA_CRISIS_TERMS.get(language, []))
+            self.patterns[language] = self._compile(terms)
+
+        # One combined pattern so code-mixed messages need a single scan
+        self.combined = re.compile(
+            "|".join(p.pattern for p in self.patterns.values() if p is not None)
+        )
+
+    @staticmethod
+    def _compile(terms):
+        if not terms:
+            return None
+        # Longest first so "ending my life" wins over shorter overlaps
+        terms = sorted(set(terms), key=len, reverse=True)
+        parts = []
+        for term in terms:
+            escaped = re.escape(term)
+            # Word boundaries only make sense for Latin script; Devanagari
+            # vowel signs are not \w and would break the boundary check
+            if term.isascii():
+                escaped = rf"\b{escaped}\b"
+            parts.append(escaped)
+        return re.compile("|".join(parts))
+
+    def check(self, text):
+        """Return the matched crisis phrase, or None"""
+        if not text:
+            return None
+        match = self.combined.search(text.lower())
+        return match.group(0) if match else None
+
+
+def benchmark(detector=None, iterations=2000):
+    """Time the detector on sample messages in all three languages.
+
+    Returns a dict of per-language p99 latencies in milliseconds and raises
+    AssertionError if any exceeds CRISIS_LATENCY_BUDGET_MS.
+    """
+    if detector is None:
+        from indicators import INDICATOR_TABLES
+        detector = CrisisDetector(INDICATOR_TABLES)
+
+    # language -> (safe messages, crisis messages); the first of each is timed
+    samples = {
+        "English": (
+            [
+                "I had a long day at work and my friend cancelled our weekend plans " * 4,
+                "I need to kill some time before the bus",
+                "This homework will kill me",
+                "That video was so funny I could die laughing",
+            ],
+            [
+                "Sometimes I think about ending my life",
+                "I am suicidal",
+                "I want to end it all",
+                "I want to die",
+            ],
+        ),
+        "Hindi": (
+            [
+                "आज काम पर बहुत लंबा दिन था और मेरे दोस्त ने सप्ताहांत की योजना रद्द कर दी " * 4,
+                "मेरे दादा की मौत हो गई",
+                "पिछले साल माँ की मौत के बाद घर सूना लगता है",
+                "इतनी गर्मी में तो मौत ही आ गई",
+            ],
+            [
+                "मुझे जीने की इच्छा नहीं है",
+                "मैं मरना चाहता हूं",
+                "बस मौत आ जाए",
+            ],
+        ),
+        "Marathi": (
+            [
+                "आज कामावर खूप मोठा दिवस होता आणि माझ्या मित्राने योजना रद्द केली " * 4,
+                "माझ्या आजोबांचा मृत्यू झाला",
+                "आईच्या मृत्यूनंतर घर रिकामं वाटतं",
+                "हसून हसून मेलो",
+            ],
+            [
+                "मला जगण्याची इच्छा नाही",
+                "मला आता जगायचं नाही",
+                "मला मृत्यू हवा आहे",
+            ],
+        ),
+    }
+
+    results = {}
+    for language, (safe_texts, crisis_texts) in samples.items():
+        for text in safe_texts:
+            assert detector.check(text) is None, f"False positive for {language}: {text[:40]!r}"
+        for text in crisis_texts:
+            assert detector.check(text), f"Missed crisis message for {language}: {text!r}"
+        safe_text, crisis_text = safe_texts[0], crisis_texts[0]
+
+        timings = []
+        for i in range(iterations):
+            text = crisis_text if i % 2 else safe_text
+            start = time.perf_counter()
+            detector.check(text)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        results[language] = p99
+        assert p99 < CRISIS_LATENCY_BUDGET_MS, (
+            f"{language} crisis check took {p99:.3f} ms (budget {CRISIS_LATENCY_BUDGET_MS} ms)"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for language, p99 in benchmark().items():
+        print(f"{language}: p99 {p99 * 1000:.1f} µs")
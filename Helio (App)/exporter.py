@@ -0,0 +1,213 @@
+import csv
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from indicators import LEVEL_FLOORS, LEVEL_LABELS
+
+CHUNK_SIZE = 2000  # rows written between progress reports / cancel checks
+
+# Parquet is only offered when pyarrow is installed
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# File extension -> format name
+FORMATS = {
+    ".txt": "txt",
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+}
+FILETYPES = [
+    ("Text files", "*.txt"),
+    ("CSV files", "*.csv"),
+    ("JSON Lines", "*.jsonl"),
+]
+if HAS_PYARROW:
+    FORMATS[".parquet"] = "parquet"
+    FILETYPES.append(("Parquet files", "*.parquet"))
+FILETYPES.append(("All files", "*.*"))
+
+# Columns shared by the CSV, JSONL and Parquet exports; messages and scores
+# are both rows, told apart by `type`
+COLUMNS = ["type", "timestamp", "speaker", "personality", "text", "score", "level"]
+
+
+def format_for(filename):
+    return FORMATS.get(os.path.splitext(filename)[1].lower(), "txt")
+
+
+def score_levels(scores):
+    """Level label for every score in an array, via one searchsorted"""
+    index = np.searchsorted(LEVEL_FLOORS, scores, side="right") - 1
+    return np.asarray(LEVEL_LABELS, dtype=object)[np.maximum(index, 0)]
+
+
+def message_rows(messages):
+    for msg in messages:
+        yield {
+            "type": "message",
+            "timestamp": msg.timestamp,
+            "speaker": "User" if msg.is_user else "AI",
+            "personality": msg.personality,
+            "text": msg.text,
+            "score": None,
+            "level": None,
+        }
+
+
+def score_rows(records):
+    labels = score_levels(records["score"])
+    for t, score, level in zip(records["t"].tolist(), records["score"].tolist(), labels):
+        yield {
+            "type": "score",
+            "timestamp": datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S"),
+            "speaker": None,
+            "personality": None,
+            "text": None,
+            "score": round(score, 4),
+            "level": level,
+        }
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """Writes chat history and scores to a file on a background thread.
+
+    `messages` can be any iterable of ChatMessage objects and `records` a score
+    store snapshot; both are consumed CHUNK_SIZE rows at a time. The output
+    goes to a temporary file that replaces `path` only on success, so a
+    cancelled or failed export leaves nothing half-written behind.
+    Callbacks run on the worker thread: on_progress(done, total) after each
+    chunk and on_done(error) at the end, where error is None, an exception,
+    or ExportCancelled.
+    """
+
+    def __init__(self, path, messages, records, message_count,
+                 on_progress=None, on_done=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.format = format_for(path)
+        self.messages = messages
+        self.records = records
+        self.total = message_count + len(records)
+        self.done = 0
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.chunk_size = chunk_size
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="export", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _chunks(self):
+        """(kind, rows) chunks: messages first, then scores"""
+        messages = iter(self.messages)
+        while True:
+            chunk = list(itertools.islice(messages, self.chunk_size))
+            if not chunk:
+                break
+            yield "message", chunk
+        for start in range(0, len(self.records), self.chunk_size):
+            yield "score", self.records[start:start + self.chunk_size]
+
+    def _advance(self, count):
+        if self._cancel.is_set():
+            raise ExportCancelled()
+        self.done += count
+        if self.on_progress:
+            self.on_progress(self.done, self.total)
+
+    def _run(self):
+        temp_path = self.path + ".part"
+        error = None
+        try:
+            writer = getattr(self, f"_write_{self.format}")
+            writer(temp_path)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            error = e
+            if not isinstance(e, ExportCancelled):
+                logging.error(f"Export failed: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        if self.on_done:
+            self.on_done(error)
+
+    def _write_txt(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("=== AI Companion Chat History ===\n\n")
+            header_written = False
+            for kind, chunk in self._chunks():
+                if kind == "message":
+                    f.write("".join(
+                        f"[{msg.timestamp}] "
+                        f"{'User' if msg.is_user else f'AI ({msg.personality})'}:"
+                        f"\n{msg.text}\n\n"
+                        for msg in chunk
+                    ))
+                else:
+                    if not header_written:
+                        f.write("\n=== Emotional Health Indicators ===\n")
+                        header_written = True
+                    f.write("".join(
+                        f"[{row['timestamp']}] Score: {row['score']:.2f} - {row['level']}\n"
+                        for row in score_rows(chunk)
+                    ))
+                self._advance(len(chunk))
+            if not header_written:
+                f.write("\n=== Emotional Health Indicators ===\n")
+
+    def _rows(self, kind, chunk):
+        return list(message_rows(chunk) if kind == "message" else score_rows(chunk))
+
+    def _write_csv(self, path):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            for kind, chunk in self._chunks():
+                writer.writerows(self._rows(kind, chunk))
+                self._advance(len(chunk))
+
+    def _write_jsonl(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for kind, chunk in self._chunks():
+                f.write("".join(
+                    json.dumps(row, ensure_ascii=False) + "\n" for row in self._rows(kind, chunk)
+                ))
+                self._advance(len(chunk))
+
+    def _write_parquet(self, path):
+        # Imported here: only Parquet exports pay for pandas and pyarrow
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("type", pa.string()),
+            ("timestamp", pa.string()),
+            ("speaker", pa.string()),
+            ("personality", pa.string()),
+            ("text", pa.string()),
+            ("score", pa.float64()),
+            ("level", pa.string()),
+        ])
+        with pq.ParquetWriter(path, schema) as writer:
+            for kind, chunk in self._chunks():
+                frame = pd.DataFrame(self._rows(kind, chunk), columns=COLUMNS)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                self._advance(len(chunk))
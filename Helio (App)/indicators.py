@@ -0,0 +1,245 @@
+import bisect
+import re
+
+# Depression keywords and their weights
+DEPRESSION_INDICATORS = {
+    # 0.5 - Mild Symptoms
+    "bored|unmotivated|blah": 0.5,
+    "slightly sad|down day": 0.5,
+    "unfocused|distracted": 0.5,
+    "mood swings|irritable": 0.5,
+    "occasionally tearful|mild sadness": 0.5,
+    "disinterested|low motivation": 0.5,
+    "temporarily lonely|missing friends": 0.5,
+    "minor stress|daily worries": 0.5,
+    "low appetite|eating changes": 0.5,
+    "sleep changes|restless nights": 0.5,
+
+    # 1.0 - Noticeable Distress
+    "tired|exhausted|fatigue|no energy": 1.0,
+    "can't sleep|insomnia|nightmares": 1.0,
+    "anxious|worried|afraid|fear": 1.0,
+    "low energy|drained|lethargic": 1.0,
+    "sleep issues|restlessness": 1.0,
+    "nervous|apprehensive|on edge": 1.0,
+    "overwhelmed|stressed|burdened": 1.0,
+    "difficulty concentrating": 1.0,
+    "headaches|body aches": 1.0,
+    "social withdrawal": 1.0,
+
+    # 1.5 - Early Warning Signs
+    "no interest|don't care|apathy": 1.5,
+    "lack of enjoyment|indifference": 1.5,
+    "not motivated|can't be bothered": 1.5,
+    "stopped hobbies|no passion": 1.5,
+    "disengaged|detached": 1.5,
+    "nothing matters|mechanical living": 1.5,
+    "emotional numbness": 1.5,
+    "can't feel happy|flat affect": 1.5,
+    "no desires|apathetic": 1.5,
+    "uninterested|withdrawn": 1.5,
+
+    # 2.0 - Moderate Symptoms
+    "hopeless|worthless|useless": 2.0,
+    "crying|tears": 2.0,
+    "guilt|failure|mistake|fault": 2.0,
+    "self-blame|self-critical": 2.0,
+    "shame|embarrassed|humiliated": 2.0,
+    "feeling like a burden": 2.0,
+    "regret|remorse": 2.0,
+    "no self-worth|self-loathing": 2.0,
+    "worthlessness|undeserving": 2.0,
+    "dwelling on past mistakes": 2.0,
+
+    # 2.5 - Developing Severity
+    "persistent sadness": 2.5,
+    "feeling stuck|trapped": 2.5,
+    "loss of hope|pessimism": 2.5,
+    "questioning purpose": 2.5,
+    "chronic fatigue": 2.5,
+    "emotional pain|heartache": 2.5,
+    "feeling hollow|empty": 2.5,
+    "prolonged grief": 2.5,
+    "neglecting self-care": 2.5,
+    "avoiding family": 2.5,
+
+    # 3.0 - Severe Isolation
+    "alone|lonely|isolated": 3.0,
+    "social isolation": 3.0,
+    "feeling unloved|unwanted": 3.0,
+    "no one understands": 3.0,
+    "abandoned|rejected": 3.0,
+    "isolating self": 3.0,
+    "friendless|no support": 3.0,
+    "feeling like an outcast": 3.0,
+    "disconnected|estranged": 3.0,
+    "self-imposed isolation": 3.0,
+
+    # 3.5 - Crisis Development
+    "intense despair": 3.5,
+    "constant crying spells": 3.5,
+    "paralyzing insecurity": 3.5,
+    "feeling trapped": 3.5,
+    "mental anguish": 3.5,
+    "can't see a future": 3.5,
+    "debilitating guilt": 3.5,
+    "physical pain from sadness": 3.5,
+    "unbearable loneliness": 3.5,
+    "neglecting responsibilities": 3.5,
+
+    # 4.0 - Critical State
+    "sad|unhappy|miserable|depressed": 4.0,
+    "deep sorrow|grief-stricken": 4.0,
+    "paralyzing depression": 4.0,
+    "unbearable pain": 4.0,
+    "emptiness|numbness": 4.0,
+    "constant despair": 4.0,
+    "completely hopeless": 4.0,
+    "major depressive episode": 4.0,
+    "unable to function": 4.0,
+    "utter despair": 4.0,
+
+    # 4.5 - Emergency Level
+    "suicidal thoughts|self-harm": 4.5,
+    "planning death": 4.5,
+    "feeling beyond help": 4.5,
+    "giving up on recovery": 4.5,
+    "psychotic depression": 4.5,
+    "extreme withdrawal": 4.5,
+    "severe detachment": 4.5,
+    "mental collapse": 4.5,
+    "can't get out of bed": 4.5,
+    "total isolation": 4.5,
+
+    # 5.0 - Immediate Intervention Needed
+    "suicide|die|end|kill|myself": 5.0,
+    "ending my life": 5.0,
+    "no will to live": 5.0,
+    "want to disappear": 5.0,
+    "life is pointless": 5.0,
+    "self-harm urges": 5.0,
+    "death wishes": 5.0,
+    "ending it all": 5.0,
+    "wishing to die": 5.0,
+    "suicidal plans": 5.0
+}
+
+# Depression keywords and their weights for Hindi
+HINDI_DEPRESSION_INDICATORS = {
+    # 0.5 - Mild Symptoms
+    "बोर|अप्रेरित|थका हुआ": 0.5,
+    "थोड़ा दुखी|उदास दिन": 0.5,
+    "ध्यान नहीं लग रहा|विचलित": 0.5,
+    "मूड स्विंग्स|चिड़चिड़ा": 0.5,
+    "कभी-कभी रोना|हल्का दुख": 0.5,
+
+    # 1.0 - Noticeable Distress
+    "थका हुआ|थकान|ऊर्जा नहीं": 1.0,
+    "नींद नहीं आती|बुरे सपने": 1.0,
+    "चिंतित|परेशान|डर": 1.0,
+    "एकाग्रता में कठिनाई": 1.0,
+    "सिरदर्द|शारीरिक दर्द": 1.0,
+
+    # 2.0 - Moderate Symptoms
+    "निराशा|बेकार|व्यर्थ": 2.0,
+    "रोना|आंसू": 2.0,
+    "अपराध|गलती|दोष": 2.0,
+    "शर्म|शर्मिंदगी": 2.0,
+    "बोझ महसूस करना": 2.0,
+
+    # 3.0 - Severe Symptoms
+    "अकेला|एकाकी|अलग-थलग": 3.0,
+    "कोई नहीं समझता": 3.0,
+    "त्यागा हुआ|अस्वीकृत": 3.0,
+    "सामाजिक अलगाव": 3.0,
+    "दोस्त नहीं|सहारा नहीं": 3.0,
+
+    # 4.0 - Critical State
+    "बहुत दुखी|बेहद दुखी": 4.0,
+    "गहरा दुख|शोक": 4.0,
+    "असहनीय दर्द": 4.0,
+    "खालीपन|सुन्नता": 4.0,
+    "कार्य नहीं कर पाना": 4.0,
+
+    # 5.0 - Emergency Level
+    "आत्महत्या|मौत": 5.0,
+    "जीने की इच्छा नहीं": 5.0,
+    "खत्म कर दूं|समाप्त": 5.0,
+    "मरने की इच्छा": 5.0,
+    "जीवन बेकार है": 5.0
+}
+
+# Depression keywords and their weights for Marathi
+MARATHI_DEPRESSION_INDICATORS = {
+    # 0.5 - Mild Symptoms
+    "कंटाळा|अप्रेरित|थकलेला": 0.5,
+    "थोडे दुःखी|उदास दिवस": 0.5,
+    "लक्ष लागत नाही|विचलित": 0.5,
+    "मूड स्विंग्स|चिडचिड": 0.5,
+    "कधीकधी रडणे|हलके दुःख": 0.5,
+
+    # 1.0 - Noticeable Distress
+    "थकलेला|थकवा|ऊर्जा नाही": 1.0,
+    "झोप येत नाही|वाईट स्वप्ne": 1.0,
+    "काळजी|त्रास|भीती": 1.0,
+    "एकाग्रता कठीण": 1.0,
+    "डोकेदुखी|शारीरिक वेदना": 1.0,
+
+    # 2.0 - Moderate Symptoms
+    "निराशा|व्यर्थ|बेकार": 2.0,
+    "रडणे|अश्रू": 2.0,
+    "अपराध|चूक|दोष": 2.0,
+    "लाज|लज्जा": 2.0,
+    "ओझे वाटणे": 2.0,
+
+    # 3.0 - Severe Symptoms
+    "एकटा|एकाकी|वेगळा": 3.0,
+    "कोणीही समजत नाही": 3.0,
+    "त्यागलेला|नाकारलेला": 3.0,
+    "सामाजिक एकांत": 3.0,
+    "मित्र नाहीत|आधार नाही": 3.0,
+
+    # 4.0 - Critical State
+    "खूप दुःखी|अतिशय दुःखी": 4.0,
+    "खोल दुःख|शोक": 4.0,
+    "असह्य वेदना": 4.0,
+    "रिक्तता|शून्यता": 4.0,
+    "काम करू शकत नाही": 4.0,
+
+    # 5.0 - Emergency Level
+    "आत्महत्या|मृत्यू": 5.0,
+    "जगण्याची इच्छा नाही": 5.0,
+    "संपवून टाकू|समाप्त": 5.0,
+    "मरण्याची इच्छा": 5.0,
+    "जीवन व्यर्थ आहे": 5.0
+}
+
+# Indicator table for each supported language
+INDICATOR_TABLES = {
+    "English": DEPRESSION_INDICATORS,
+    "Hindi": HINDI_DEPRESSION_INDICATORS,
+    "Marathi": MARATHI_DEPRESSION_INDICATORS,
+}
+
+# Precompiled (pattern, weight) pairs per language, built once at import
+COMPILED_INDICATORS = {
+    language: [(re.compile(pattern), weight) for pattern, weight in indicators.items()]
+    for language, indicators in INDICATOR_TABLES.items()
+}
+
+DEPRESSION_LEVELS = [
+    (0, 1.5, "Low concern"),
+    (1.5, 3.0, "Mild concern"),
+    (3.0, 4.5, "Moderate concern"),
+    (4.5, 6.0, "High concern"),
+    (6.0, float('inf'), "Severe concern")
+]
+
+# Lower bound of each level, for bisect lookups
+LEVEL_FLOORS = [min_val for min_val, _, _ in DEPRESSION_LEVELS]
+LEVEL_LABELS = [label for _, _, label in DEPRESSION_LEVELS]
+
+
+def level_label(score):
+    """The DEPRESSION_LEVELS label for a score (below 0 counts as low)"""
+    return LEVEL_LABELS[max(0, bisect.bisect_right(LEVEL_FLOORS, score) - 1)]
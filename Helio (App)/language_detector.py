@@ -0,0 +1,100 @@
+import re
+import time
+from typing import NamedTuple
+
+DEVANAGARI_WORD_RE = re.compile(r"[ऀ-ॿ]+")
+LATIN_WORD_RE = re.compile(r"[A-Za-z]{2,}")
+
+# Frequent function words and suffixes that separate Hindi from Marathi.
+# Both languages share the script, so these carry almost all of the signal.
+HINDI_MARKERS = {
+    "है": 2, "हैं": 2, "हूं": 2, "हूँ": 2, "नहीं": 2, "और": 2, "मैं": 2, "मुझे": 2,
+    "मेरा": 2, "मेरी": 2, "मेरे": 1, "क्या": 2, "का": 1, "की": 1, "के": 1,
+    "को": 1, "से": 1, "था": 2, "थी": 2, "रहा": 1, "रही": 1, "कुछ": 1, "बहुत": 1,
+    "लगता": 2, "लग": 1, "हो": 1, "भी": 1, "यह": 1, "वह": 1, "में": 1,
+}
+MARATHI_MARKERS = {
+    "आहे": 2, "आहेत": 2, "नाही": 2, "नाहीत": 2, "आणि": 2, "मी": 2, "मला": 2,
+    "माझा": 2, "माझी": 2, "माझे": 2, "काय": 2, "होतो": 2, "होते": 1, "होता": 1,
+    "तुम्ही": 2, "खूप": 1, "वाटते": 2, "वाटतं": 2, "पण": 1, "कसे": 1, "कसा": 1,
+    "झाले": 2, "झालं": 2, "आता": 1, "मध्ये": 2,
+}
+# Genitive suffixes typical of Marathi inflection ("त्याच्या", "आईची")
+MARATHI_SUFFIXES = ("च्या", "ची", "चा", "चे")
+# The retroflex ळ is common in Marathi and rare in Hindi
+MARATHI_LETTER = "ळ"
+
+
+class LanguageTag(NamedTuple):
+    language: str      # dominant language, used for STT and the reply prompt
+    languages: tuple   # every language whose indicator table should be applied
+
+
+class LanguageDetector:
+    """Script- and n-gram-based language identification for user messages"""
+
+    def __init__(self, default="English"):
+        self.default = default
+
+    def classify(self, text, fallback=None):
+        fallback = fallback or self.default
+        if not text:
+            return LanguageTag(fallback, (fallback,))
+
+        # Word counts per script; matras make raw character counts misleading
+        devanagari_words = DEVANAGARI_WORD_RE.findall(text)
+        latin = len(LATIN_WORD_RE.findall(text))
+
+        if not devanagari_words:
+            if latin:
+                return LanguageTag("English", ("English",))
+            return LanguageTag(fallback, (fallback,))
+
+        indic = self._hindi_or_marathi(text, devanagari_words, fallback)
+        if latin:
+            # Code-mixed: score against both tables, report the majority script
+            primary = indic if len(devanagari_words) >= latin else "English"
+            secondary = "English" if primary == indic else indic
+            return LanguageTag(primary, (primary, secondary))
+        return LanguageTag(indic, (indic,))
+
+    @staticmethod
+    def _hindi_or_marathi(text, words, fallback):
+        hindi = 0
+        marathi = text.count(MARATHI_LETTER)
+        for word in words:
+            hindi += HINDI_MARKERS.get(word, 0)
+            weight = MARATHI_MARKERS.get(word, 0)
+            if not weight and len(word) > 3 and word.endswith(MARATHI_SUFFIXES):
+                weight = 1
+            marathi += weight
+
+        if marathi > hindi:
+            return "Marathi"
+        if hindi > marathi:
+            return "Hindi"
+        # No signal either way: keep the user's selection if it is Devanagari
+        return fallback if fallback in ("Hindi", "Marathi") else "Hindi"
+
+
+def benchmark(iterations=5000):
+    """Average classification cost per message in microseconds"""
+    detector = LanguageDetector()
+    samples = [
+        ("I have been feeling really tired and alone lately", "English"),
+        ("मुझे आजकल बहुत अकेलापन महसूस होता है", "Hindi"),
+        ("मला आजकाल खूप एकटं वाटतं आणि झोप येत नाही", "Marathi"),
+        ("आज office में बहुत stress था", "Hindi"),
+    ]
+    for text, expected in samples:
+        got = detector.classify(text).language
+        assert got == expected, f"{text!r}: expected {expected}, got {got}"
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        detector.classify(samples[i % len(samples)][0])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+if __name__ == "__main__":
+    print(f"Language classification: {benchmark():.1f} µs per message")
@@ -0,0 +1,138 @@
+import builtins
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+
+# Taken as early as possible so the report covers the eager imports too
+PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """Timeline of imports and startup milestones, relative to process start.
+
+    Enabled with `--startup-report` or HELIO_STARTUP_REPORT=1; the report is
+    printed once the main window has been mapped, in the spirit of
+    `python -X importtime`. Lazy imports are always timed; the eager import
+    block of app.py is timed per statement between trace_imports() and
+    stop_import_trace(). For the full nested tree of one of those imports,
+    run `python -X importtime app.py`.
+    """
+
+    def __init__(self):
+        self.enabled = "--startup-report" in sys.argv or os.getenv("HELIO_STARTUP_REPORT") == "1"
+        self.events = []  # (seconds since start, duration or None, label)
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    def trace_imports(self):
+        """Record how long each top-level import takes until stop_import_trace().
+
+        Only imports of modules not loaded yet are recorded, and the time of
+        anything they import in turn is included in theirs.
+        """
+        if not self.enabled or self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+        depth = 0
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            nonlocal depth
+            if depth or level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            depth += 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                depth -= 1
+                self.record(f"import {name}", time.perf_counter() - start)
+
+        builtins.__import__ = timed_import
+
+    def stop_import_trace(self, label="eager imports done"):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        self.mark(label)
+
+    def record(self, label, duration=None):
+        with self._lock:
+            self.events.append((time.perf_counter() - PROCESS_START, duration, label))
+
+    def mark(self, label):
+        self.record(label)
+
+    def elapsed_ms(self, label):
+        for at, _, name in self.events:
+            if name == label:
+                return at * 1000
+        return None
+
+    def format(self):
+        lines = ["helio startup:   at (ms) | took (ms) | event"]
+        for at, duration, label in sorted(self.events):
+            took = f"{duration * 1000:9.1f}" if duration is not None else " " * 9
+            lines.append(f"helio startup: {at * 1000:9.1f} | {took} | {label}")
+        return "\n".join(lines)
+
+    def emit(self):
+        if self.enabled:
+            print(self.format(), file=sys.stderr)
+        first_window = self.elapsed_ms("window mapped")
+        if first_window is not None:
+            logging.info(f"Time to first window: {first_window:.0f} ms")
+
+
+STARTUP = StartupReport()
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access.
+
+    `on_load` runs once, right after the import, for setup that used to
+    happen at module import time (e.g. genai.configure).
+    """
+
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_load:
+                        self._on_load(module)
+                    STARTUP.record(f"import {self._name}", time.perf_counter() - start)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def warm_up(modules):
+    """Import the given LazyModules on a daemon thread, in order"""
+    def run():
+        for module in modules:
+            try:
+                module.load()
+            except Exception as e:
+                # The feature will report the real error when it is used
+                logging.warning(f"Warm-up import of {module._name} failed: {str(e)}")
+        STARTUP.mark("warm-up finished")
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,93 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "therapy_app.log")
+MAX_BYTES = 1024 * 1024  # rotate once the log reaches 1 MB
+BACKUP_COUNT = 3         # therapy_app.log.1 .. .3 are kept
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every Nth record per call site for records logged with `every`.
+
+    Runs in the caller's thread before anything is queued, so a dropped
+    record costs one dict update. Kept records are tagged with the rate.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, "every", 1)
+        if every <= 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(site, 0)
+            self._counts[site] = count + 1
+        if count % every:
+            return False
+        record.fields = dict(getattr(record, "fields", {}), sampled=f"1/{every}")
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """LOG_FORMAT followed by the record's fields as key=value pairs"""
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return line
+
+
+def log_event(level, message, every=1, **fields):
+    """Log `message` with key=value fields, keeping 1 in `every` from this call site"""
+    logging.log(level, message, extra={"fields": fields, "every": every}, stacklevel=2)
+
+
+def configure_logging(level=logging.INFO, log_file=LOG_FILE):
+    """Route all logging through a queue to a rotating file on a listener thread.
+
+    Callers (the voice loop, API workers, the Tk thread) only put records on
+    an unbounded queue; formatting and file I/O happen on the listener's own
+    thread. Replaces logging.basicConfig.
+    """
+    log_queue = queue.SimpleQueue()
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8", delay=True
+    )
+    file_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+    handlers = [file_handler]
+    if os.getenv("HELIO_DEBUG") == "1":
+        console = logging.StreamHandler()
+        console.setFormatter(StructuredFormatter(LOG_FORMAT))
+        handlers.append(console)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    def flush_on_exit():
+        # Writes whatever is still queued; skipped if already stopped
+        if listener._thread is not None:
+            listener.stop()
+
+    atexit.register(flush_on_exit)
+    return listener
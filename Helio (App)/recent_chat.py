@@ -0,0 +1,53 @@
+import tkinter as tk
+
+USER_BUBBLE_BG = "#3498db"
+AI_BUBBLE_BG = "#e74c3c"
+
+
+class RecentChatPanel:
+    """Last few chat messages shown as a fixed pool of reused bubble labels.
+
+    The labels are created once and each is packed the first time it is
+    needed; after that a new message only reconfigures text and colors, so
+    the cost per message is constant and nothing is destroyed or re-laid out.
+    """
+
+    def __init__(self, master, size=3, wraplength=600):
+        self.master = master
+        self.size = size
+        self.messages = []  # (text, is_user), oldest first, at most `size`
+        self.bubbles = []
+        for _ in range(size):
+            bubble = tk.Label(
+                master,
+                wraplength=wraplength,
+                font=("Arial", 12),
+                fg="white",
+                padx=15,
+                pady=10,
+                relief=tk.FLAT,
+                borderwidth=0
+            )
+            self.bubbles.append(bubble)
+        self._shown = 0  # how many bubbles have been packed so far
+
+    def add(self, text, is_user=False):
+        self.messages.append((text, is_user))
+        if len(self.messages) > self.size:
+            del self.messages[0]
+
+        # Map one more bubble until the pool is full; otherwise just reuse
+        if self._shown < len(self.messages):
+            self.bubbles[self._shown].pack(pady=5)
+            self._shown += 1
+
+        for bubble, (msg_text, msg_is_user) in zip(self.bubbles, self.messages):
+            bg = USER_BUBBLE_BG if msg_is_user else AI_BUBBLE_BG
+            if bubble.cget("text") != msg_text or bubble.cget("bg") != bg:
+                bubble.configure(text=msg_text, bg=bg)
+
+    def clear(self):
+        self.messages = []
+        for bubble in self.bubbles[:self._shown]:
+            bubble.pack_forget()
+        self._shown = 0
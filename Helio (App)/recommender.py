@@ -0,0 +1,148 @@
+import re
+
+import numpy as np
+
+# Moods content is ranked against, each described by the words that show up
+# for it in indicator patterns, messages, story text and track names
+MOODS = {
+    "sleep": {"sleep", "insomnia", "nightmares", "restless", "restlessness", "tired", "exhausted",
+              "fatigue", "bed", "night", "rest", "rain", "noise", "lullaby"},
+    "anxiety": {"anxious", "anxiety", "worried", "worry", "afraid", "fear", "nervous", "panic",
+                "apprehensive", "edge", "insecurity", "calm", "breath", "breathe", "meditation"},
+    "stress": {"stress", "stressed", "overwhelmed", "burdened", "pressure", "unfocused", "distracted",
+               "concentrating", "worries", "busy", "peace", "nature", "forest", "ocean", "waves"},
+    "sadness": {"sad", "unhappy", "miserable", "depressed", "crying", "tears", "grief", "sorrow",
+                "heartache", "pain", "despair", "tearful", "sadness", "comfort", "piano"},
+    "loneliness": {"alone", "lonely", "isolated", "isolation", "unloved", "unwanted", "abandoned",
+                   "rejected", "friendless", "disconnected", "estranged", "outcast", "friends",
+                   "friendship", "together", "kindness"},
+    "hopelessness": {"hopeless", "worthless", "useless", "failure", "guilt", "shame", "burden",
+                     "pointless", "future", "purpose", "stuck", "trapped", "mistake", "mistakes",
+                     "hope", "courage", "strength", "chance", "again"},
+    "apathy": {"bored", "unmotivated", "motivation", "motivated", "interest", "numb", "numbness",
+               "empty", "emptiness", "hollow", "enjoyment", "detached", "apathy", "passion",
+               "joy", "growth", "small", "step"},
+}
+MOOD_WORDS = list(MOODS.values())
+
+# What each built-in music category is good for
+MUSIC_CATEGORY_MOODS = {
+    "Rain Sounds": {"sleep": 1.0, "anxiety": 0.6, "stress": 0.6},
+    "White Noise": {"sleep": 1.0, "stress": 0.7},
+    "Nature Sounds": {"stress": 1.0, "anxiety": 0.7, "loneliness": 0.3},
+    "Meditation Music": {"anxiety": 1.0, "stress": 0.8, "hopelessness": 0.4, "apathy": 0.3},
+    "Classical Music": {"sadness": 1.0, "apathy": 0.7, "loneliness": 0.5},
+}
+
+# Story columns beyond the mood vocabulary; caps the matrix at
+# stories x TFIDF_FEATURES floats however large the corpus's vocabulary is
+TFIDF_FEATURES = 1024
+
+_WORD = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")  # keeps Devanagari vowel signs in words
+
+
+def mood_vector(text):
+    """How many words of each mood appear in `text`"""
+    words = set(_WORD.findall(text.lower()))
+    return np.array([len(words & mood_words) for mood_words in MOOD_WORDS], dtype=np.float32)
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+class Recommender:
+    """Ranks stories and music tracks against the user's current mood.
+
+    Stories are rows of an L2-normalised TF-IDF matrix and tracks rows of a
+    mood-tag matrix, both built ahead of time (stories on the plugin warm-up
+    thread, tracks once per library version), so a ranking is one
+    matrix-vector product each and stays in the low milliseconds as the
+    libraries grow.
+    """
+
+    def __init__(self):
+        self._stories = None  # (store, term -> column, idf, matrix)
+        self._tracks = None   # (library version, [(category, track)], matrix)
+        self._indicator_moods = {}  # indicator pattern -> mood vector
+
+    @property
+    def stories_ready(self):
+        return self._stories is not None
+
+    def set_stories(self, store):
+        """Build the story matrix from a StoryStore; safe to call off the Tk thread"""
+        all_mood_words = set().union(*MOOD_WORDS)
+        terms, idf, matrix = store.tfidf(TFIDF_FEATURES, include=all_mood_words)
+        self._stories = (store, {term: i for i, term in enumerate(terms)}, idf, matrix)
+
+    def mood(self, messages, matched):
+        """Unit mood vector from recent user messages and the (pattern, weight)
+        indicators they matched; all zeros when nothing points anywhere"""
+        vector = np.zeros(len(MOODS), dtype=np.float32)
+        for pattern, weight in matched:
+            moods = self._indicator_moods.get(pattern)
+            if moods is None:
+                moods = self._indicator_moods[pattern] = mood_vector(pattern.replace("|", " "))
+            vector += weight * moods
+        for text in messages:
+            vector += mood_vector(text)
+        return _normalize(vector)
+
+    def stories(self, messages, mood, limit=3):
+        """[(story id, title)] most similar to the messages and the mood's vocabulary"""
+        if self._stories is None:
+            return []
+        store, columns, idf, matrix = self._stories
+        if not matrix.size:
+            return []
+        counts = np.zeros(matrix.shape[1], dtype=np.float32)
+        for text in messages:
+            for token in store.tokenize(text):
+                column = columns.get(token)
+                if column is not None:
+                    counts[column] += 1
+        # Each mood brings its own words, so "I can't sleep" also finds
+        # stories about rest that never use the word "sleep"
+        for weight, words in zip(mood.tolist(), MOOD_WORDS):
+            if weight > 0:
+                for word in words:
+                    column = columns.get(word)
+                    if column is not None:
+                        counts[column] += weight
+        query = np.log1p(counts) * idf
+        if not query.any():
+            return []
+        scores = matrix @ query
+        return [(story_id, store.titles[story_id]) for story_id in self._top(scores, limit)]
+
+    def tracks(self, music_player, mood, limit=2):
+        """[(category, track)] whose categories and names best fit the mood"""
+        version = music_player.library.version
+        if self._tracks is None or self._tracks[0] != version:
+            entries = [(category, track)
+                       for category, tracks in music_player.tracks.items() for track in tracks]
+            matrix = np.zeros((len(entries), len(MOODS)), dtype=np.float32)
+            mood_names = list(MOODS)
+            priors = {}
+            for row, (category, track) in enumerate(entries):
+                prior = priors.get(category)
+                if prior is None:
+                    weights = MUSIC_CATEGORY_MOODS.get(category, {})
+                    prior = np.array([weights.get(name, 0.0) for name in mood_names], dtype=np.float32)
+                    prior = priors[category] = prior + mood_vector(category)
+                matrix[row] = prior + 0.5 * mood_vector(f"{track['name']} {track.get('artist') or ''}")
+            self._tracks = (version, entries, _normalize(matrix))
+        _, entries, matrix = self._tracks
+        if not len(entries) or not mood.any():
+            return []
+        return [entries[row] for row in self._top(matrix @ mood, limit)]
+
+    @staticmethod
+    def _top(scores, limit):
+        """Indices of the `limit` highest positive scores, best first"""
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit)[:limit]]
+        return hits[np.argsort(-scores[hits], kind="stable")].tolist()
@@ -0,0 +1,263 @@
+import os
+import time
+import logging
+from datetime import datetime
+
+import numpy as np
+
+# On-disk record: epoch seconds and the normalized score
+RECORD_DTYPE = np.dtype([("t", "<i8"), ("score", "<f4")])
+
+# Rollup bucket: start of the bucket (epoch seconds) and running aggregates
+ROLLUP_DTYPE = np.dtype([
+    ("t", "<i8"),
+    ("min", "<f4"),
+    ("max", "<f4"),
+    ("sum", "<f8"),
+    ("count", "<i8"),
+])
+
+# Downsampled tiers and their bucket width in seconds
+TIERS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class _GrowableArray:
+    """Structured NumPy array with amortised O(1) append"""
+
+    def __init__(self, dtype, capacity=256):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def adopt(cls, array):
+        """Wrap an existing array without copying; the first append grows it"""
+        grown = cls(array.dtype, capacity=0)
+        grown._data = array
+        grown._size = len(array)
+        return grown
+
+    def view(self):
+        return self._data[:self._size]
+
+    def extend(self, values):
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            capacity = max(needed, len(self._data) * 2, 256)
+            grown = np.empty(capacity, dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def append(self, value):
+        self.extend(np.array([value], dtype=self._data.dtype))
+
+
+class Rollup:
+    """Min/max/mean/count per fixed-width bucket, maintained incrementally"""
+
+    def __init__(self, width, utc_offset=0):
+        self.width = width
+        # Buckets are aligned to local time so a "day" is the user's day
+        self.utc_offset = utc_offset
+        self._buckets = _GrowableArray(ROLLUP_DTYPE)
+
+    def bucket_start(self, t):
+        return (t + self.utc_offset) // self.width * self.width - self.utc_offset
+
+    def build(self, times, scores):
+        """Rebuild every bucket from sorted raw data in one vectorized pass"""
+        self._buckets = _GrowableArray(ROLLUP_DTYPE, capacity=max(256, len(times)))
+        if not len(times):
+            return
+        keys = self.bucket_start(times)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        buckets = np.empty(len(starts), dtype=ROLLUP_DTYPE)
+        buckets["t"] = keys[starts]
+        buckets["min"] = np.minimum.reduceat(scores, starts)
+        buckets["max"] = np.maximum.reduceat(scores, starts)
+        buckets["sum"] = np.add.reduceat(scores.astype(np.float64), starts)
+        buckets["count"] = np.diff(np.r_[starts, len(times)])
+        self._buckets.extend(buckets)
+
+    def add(self, t, score):
+        key = self.bucket_start(t)
+        buckets = self._buckets.view()
+        if len(buckets) and buckets["t"][-1] == key:
+            last = buckets[-1]
+            last["min"] = min(last["min"], score)
+            last["max"] = max(last["max"], score)
+            last["sum"] += score
+            last["count"] += 1
+        else:
+            # Callers append in time order, so this always starts a new bucket
+            self._buckets.append((key, score, score, score, 1))
+
+    def state(self):
+        return self._buckets.view().copy()
+
+    def restore(self, buckets):
+        self._buckets = _GrowableArray.adopt(buckets)
+
+    def view(self):
+        """Buckets as a structured array with a derived mean column"""
+        buckets = self._buckets.view()
+        out = np.empty(len(buckets), dtype=[("t", "<i8"), ("min", "<f4"), ("max", "<f4"),
+                                            ("mean", "<f4"), ("count", "<i8")])
+        out["t"] = buckets["t"]
+        out["min"] = buckets["min"]
+        out["max"] = buckets["max"]
+        out["mean"] = buckets["sum"] / np.maximum(buckets["count"], 1)
+        out["count"] = buckets["count"]
+        return out
+
+
+class ScoreStore:
+    """Append-only time series of depression scores with downsampled tiers.
+
+    Raw samples live in a flat binary file of RECORD_DTYPE records, so loading
+    a year of scores is a single np.fromfile call and appending one is a
+    12-byte write.
+    """
+
+    def __init__(self, path, state=None):
+        self.path = path
+        self.utc_offset = time.localtime().tm_gmtoff
+        # Bumped whenever existing records are reordered, so caches built on
+        # top of the store know an incremental update is not enough
+        self.revision = 0
+        self._records = _GrowableArray(RECORD_DTYPE)
+        self.rollups = {name: Rollup(width, self.utc_offset) for name, width in TIERS.items()}
+        self.restored = False
+        self._load(state)
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def times(self):
+        return self._records.view()["t"]
+
+    @property
+    def scores(self):
+        return self._records.view()["score"]
+
+    def _load(self, state=None):
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = np.fromfile(self.path, dtype=RECORD_DTYPE)
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to load score store: {str(e)}")
+            return
+        if len(data) and np.any(np.diff(data["t"]) < 0):
+            data = np.sort(data, order="t", kind="stable")
+        self._records = _GrowableArray.adopt(data)
+        self.restored = bool(state) and self._restore_rollups(state)
+        if not self.restored:
+            self._rebuild_rollups()
+
+    def state(self):
+        """Record count and rollups, for the session snapshot"""
+        state = {
+            "count": len(self),
+            "last_t": int(self.times[-1]) if len(self) else 0,
+            "utc_offset": self.utc_offset,
+        }
+        for name, rollup in self.rollups.items():
+            state[f"rollup_{name}"] = rollup.state()
+        return state
+
+    def _restore_rollups(self, state):
+        # Snapshot rollups are reused only if they cover exactly these records
+        try:
+            if (state["count"] != len(self) or state["utc_offset"] != self.utc_offset
+                    or state["last_t"] != int(self.times[-1])):
+                return False
+            buckets = {name: state[f"rollup_{name}"] for name in self.rollups}
+        except (KeyError, IndexError):
+            return False
+        for name, rollup in self.rollups.items():
+            rollup.restore(buckets[name])
+        self.revision += 1
+        return True
+
+    def _rebuild_rollups(self):
+        self.revision += 1
+        records = self._records.view()
+        for rollup in self.rollups.values():
+            rollup.build(records["t"], records["score"])
+
+    def append(self, score, t=None):
+        """Record a score; t defaults to now (epoch seconds)"""
+        t = int(time.time() if t is None else t)
+        record = np.array([(t, score)], dtype=RECORD_DTYPE)
+        in_order = not len(self._records) or t >= self.times[-1]
+        self._records.extend(record)
+
+        if in_order:
+            for rollup in self.rollups.values():
+                rollup.add(t, np.float32(score))
+        else:
+            # Clock went backwards: rare, so re-sort and rebuild everything
+            records = self._records.view()
+            records[:] = np.sort(records, order="t", kind="stable")
+            self._rebuild_rollups()
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(record.tobytes())
+        except OSError as e:
+            logging.error(f"Failed to save score: {str(e)}")
+
+    def import_legacy(self, depression_scores):
+        """Migrate the old list of {'timestamp', 'score'} dicts into the store"""
+        rows = []
+        for entry in depression_scores:
+            try:
+                t = datetime.strptime(entry["timestamp"], TIMESTAMP_FORMAT).timestamp()
+                rows.append((int(t), float(entry["score"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        if not rows:
+            return 0
+
+        data = np.sort(np.array(rows, dtype=RECORD_DTYPE), order="t", kind="stable")
+        merged = np.concatenate([self._records.view(), data])
+        merged = np.sort(merged, order="t", kind="stable")
+        self._records = _GrowableArray(RECORD_DTYPE, capacity=max(256, len(merged) * 2))
+        self._records.extend(merged)
+        self._rebuild_rollups()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        merged.tofile(self.path)
+        return len(rows)
+
+    def latest(self):
+        """Most recent (epoch seconds, score), or None when empty"""
+        if not len(self._records):
+            return None
+        last = self._records.view()[-1]
+        return int(last["t"]), float(last["score"])
+
+    def snapshot(self):
+        """A copy of all records, safe to read from another thread"""
+        return self._records.view().copy()
+
+    def tail(self, n):
+        """The last n raw records"""
+        return self._records.view()[-n:]
+
+    def rollup(self, tier):
+        """Downsampled view for 'minute', 'hour' or 'day'"""
+        return self.rollups[tier].view()
@@ -0,0 +1,57 @@
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+# Bump when the layout of any section changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, sections):
+    """Write {section: {key: value}} as one .npz file.
+
+    NumPy arrays are stored as-is; everything else goes into a JSON header
+    kept in the same file. Written to a temporary file and renamed, so a
+    crash mid-write leaves the previous snapshot in place.
+    """
+    meta = {"version": SNAPSHOT_VERSION, "written_at": time.time(), "sections": {}}
+    arrays = {}
+    for section, values in sections.items():
+        meta["sections"][section] = {}
+        for key, value in values.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{section}/{key}"] = value
+            else:
+                meta["sections"][section][key] = value
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    temp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.error(f"Failed to save session snapshot: {str(e)}")
+
+
+def load_snapshot(path):
+    """The sections saved by save_snapshot, or {} if missing, unreadable or outdated"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != SNAPSHOT_VERSION:
+                return {}
+            sections = meta["sections"]
+            for name in data.files:
+                if name != "meta":
+                    section, key = name.split("/", 1)
+                    sections.setdefault(section, {})[key] = data[name]
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable session snapshot: {str(e)}")
+        return {}
+    return sections
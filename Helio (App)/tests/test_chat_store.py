@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+
+from chat_store import OFFSET_DTYPE, ChatMessage, ChatStore, migrate_legacy
+from score_store import ScoreStore
+
+
+def make_store(tmp_path, texts=("hello", "how are you", "fine")):
+    store = ChatStore(str(tmp_path / "chat.jsonl"))
+    store.extend([ChatMessage(text, i % 2 == 0, 1700000000 + i) for i, text in enumerate(texts)])
+    return store
+
+
+def test_reopen_reads_all_messages(tmp_path):
+    make_store(tmp_path)
+    store = ChatStore(str(tmp_path / "chat.jsonl"))
+    assert len(store) == 3
+    assert [m.text for m in store.read(0, 3)] == ["hello", "how are you", "fine"]
+
+
+def test_truncated_tail_is_dropped(tmp_path):
+    store = make_store(tmp_path)
+    size = os.path.getsize(store.log_path)
+    # Crash in the middle of writing a fourth line, before its index entry
+    with open(store.log_path, "ab") as f:
+        f.write(b'{"t": 1700000003, "u": true, "x": "cut sh')
+
+    store = ChatStore(str(tmp_path / "chat.jsonl"))
+    assert len(store) == 3
+    assert os.path.getsize(store.log_path) == size
+    store.append(ChatMessage("after the crash", True, 1700000004))
+    assert [m.text for m in ChatStore(store.log_path).read(2, 4)] == ["fine", "after the crash"]
+
+
+def test_index_is_rebuilt_when_missing_or_stale(tmp_path):
+    store = make_store(tmp_path)
+    os.remove(store.index_path)
+    store = ChatStore(store.log_path)
+    assert len(store) == 3
+    assert [m.text for m in store.read(1, 3)] == ["how are you", "fine"]
+
+    # Crash after the log write but before the index write
+    with open(store.log_path, "ab") as f:
+        f.write((ChatMessage("unindexed", False, 1700000005).to_json() + "\n").encode("utf-8"))
+    store = ChatStore(store.log_path)
+    assert len(store) == 4
+    offsets = np.fromfile(store.index_path, dtype=OFFSET_DTYPE)
+    assert len(offsets) == 4
+    assert store.read(3, 4)[0].text == "unindexed"
+
+
+def test_failed_write_keeps_offsets_aligned(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    real_open = open
+
+    def failing_index_open(path, mode="r", *args, **kwargs):
+        if path == store.index_path:
+            raise OSError("disk full")
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", failing_index_open)
+    store.append(ChatMessage("lost from the index", True, 1700000006))
+    monkeypatch.undo()
+
+    assert len(store) == 3
+    store.append(ChatMessage("next", False, 1700000007))
+    assert [m.text for m in store.read(0, 4)] == ["hello", "how are you", "fine", "next"]
+
+
+def test_snapshot_restore_keeps_line_separators(tmp_path):
+    store = make_store(tmp_path, texts=("line sep", "para sep", "nel\x85x"))
+    restored = ChatStore(store.log_path, state=store.state())
+    assert restored.restored
+    assert [m.text for m in restored.recent] == ["line sep", "para sep", "nel\x85x"]
+
+
+def test_migrate_legacy_history(tmp_path):
+    legacy_path = tmp_path / "default_user_chat_history.json"
+    legacy_path.write_text(json.dumps({
+        "chat_history": [
+            {"text": "hi", "is_user": True, "timestamp": "2024-01-02 10:00:00"},
+            {"text": "hello", "is_user": False, "timestamp": "2024-01-02 10:00:05",
+             "personality": "Therapist"},
+            {"text": "no timestamp", "is_user": True},
+        ],
+        "depression_scores": [{"timestamp": "2024-01-02 10:00:05", "score": 1.5}],
+    }), encoding="utf-8")
+    chat_store = ChatStore(str(tmp_path / "chat.jsonl"))
+    score_store = ScoreStore(str(tmp_path / "scores.bin"))
+
+    assert migrate_legacy(str(legacy_path), chat_store, score_store)
+    assert not legacy_path.exists()
+    assert (tmp_path / "default_user_chat_history.migrated.json").exists()
+    assert [m.text for m in ChatStore(chat_store.log_path).read(0, 2)] == ["hi", "hello"]
+    assert len(ScoreStore(score_store.path)) == 1
+
+    # Nothing left to migrate on the next start
+    assert not migrate_legacy(str(legacy_path), chat_store, score_store)
+    assert len(chat_store) == 2
+
+
+def test_migrate_legacy_keeps_existing_history(tmp_path):
+    store = make_store(tmp_path)
+    legacy_path = tmp_path / "old.json"
+    legacy_path.write_text(json.dumps({"chat_history": [
+        {"text": "old", "is_user": True, "timestamp": "2024-01-02 10:00:00"},
+    ]}), encoding="utf-8")
+    assert migrate_legacy(str(legacy_path), store, ScoreStore(str(tmp_path / "scores.bin")))
+    assert len(store) == 3
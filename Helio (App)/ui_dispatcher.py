@@ -0,0 +1,102 @@
+import collections
+import logging
+import os
+import threading
+
+# How often pending UI operations are drained, in milliseconds (~60 fps)
+FRAME_INTERVAL = 16
+
+# Debug mode turns direct Tk access from worker threads into an AssertionError
+DEBUG = os.getenv("HELIO_DEBUG") == "1"
+
+
+class UIDispatcher:
+    """Main-thread executor for UI work posted from worker threads.
+
+    post() only appends to a deque, so workers never touch Tk. Once per
+    frame the Tk thread drains everything queued so far in one batch.
+    Operations posted with a key are coalesced: only the latest call for
+    that key runs. The reserve-a-slot check and the drain's pop of a key
+    share a lock, so a post can never land in a slot that was just drained.
+    """
+
+    def __init__(self, root, interval=FRAME_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._queue = collections.deque()
+        self._latest = {}
+        self._latest_lock = threading.Lock()
+        self._after_id = None
+        self._schedule()
+
+    def post(self, fn, *args, key=None):
+        """Run fn(*args) on the Tk thread during the next frame"""
+        if key is None:
+            self._queue.append((fn, args))
+        else:
+            # First post for a key reserves its slot in the queue; later posts
+            # in the same frame just replace the call that will run there
+            with self._latest_lock:
+                if key not in self._latest:
+                    self._queue.append((key, None))
+                self._latest[key] = (fn, args)
+
+    def call(self, fn, *args, key=None):
+        """Run now if already on the Tk thread, otherwise post"""
+        if threading.current_thread() is threading.main_thread():
+            fn(*args)
+        else:
+            self.post(fn, *args, key=key)
+
+    def _schedule(self):
+        self._after_id = self.root.after(self.interval, self._drain)
+
+    def _drain(self):
+        # Only what was queued before this frame; new posts wait for the next
+        for _ in range(len(self._queue)):
+            item, args = self._queue.popleft()
+            if args is None:
+                with self._latest_lock:
+                    item, args = self._latest.pop(item, (None, None))
+                if item is None:
+                    continue
+            try:
+                item(*args)
+            except Exception as e:
+                logging.error(f"UI update failed: {str(e)}")
+        self._schedule()
+
+    def stop(self):
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+class _ThreadCheckedTk:
+    """Proxy for a tkapp object that asserts every call is on the main thread"""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+
+    def __getattr__(self, name):
+        attr = getattr(self._tkapp, name)
+        if not callable(attr):
+            return attr
+
+        def checked(*args, **kwargs):
+            assert threading.current_thread() is threading.main_thread(), (
+                f"Tk call '{name}' from thread {threading.current_thread().name}; "
+                "use UIDispatcher.post instead"
+            )
+            return attr(*args, **kwargs)
+        return checked
+
+
+def install_thread_guard(root):
+    """In debug mode, make Tk access from worker threads fail loudly.
+
+    Must run before any other widget is created, because widgets copy their
+    master's tk object at construction.
+    """
+    if DEBUG and not isinstance(root.tk, _ThreadCheckedTk):
+        root.tk = _ThreadCheckedTk(root.tk)
@@ -0,0 +1,108 @@
+import time
+import tkinter as tk
+
+ACTIVE_INTERVAL = 16   # ms between ticks while the app has focus (~60 fps)
+IDLE_INTERVAL = 100    # ms between ticks while the app is in the background
+MAX_DT = 0.1           # seconds; longer gaps (e.g. after un-minimizing) are clamped
+
+
+class Animation:
+    """Handle for a callback registered with the FrameClock"""
+
+    def __init__(self, clock, callback, window):
+        self.clock = clock
+        self.callback = callback
+        self.window = window
+        self.last_time = None
+        self.active = True
+
+    def stop(self):
+        self.active = False
+        self.clock._animations.discard(self)
+
+
+class FrameClock:
+    """One timer driving every canvas animation in the app.
+
+    Callbacks receive the seconds elapsed since their previous frame and
+    should move things by speed * dt rather than a fixed step. Animations
+    whose window is minimized or withdrawn are skipped, the tick rate drops
+    to IDLE_INTERVAL while the app is unfocused, and the timer stops entirely
+    when nothing is visible, restarting when a window is mapped again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._animations = set()
+        self._after_id = None
+        self._watched = set()
+
+    @classmethod
+    def for_widget(cls, widget):
+        """The shared clock for the widget's Tk root"""
+        root = widget._root()
+        clock = getattr(root, "_frame_clock", None)
+        if clock is None:
+            clock = cls(root)
+            root._frame_clock = clock
+        return clock
+
+    def register(self, callback, window):
+        """Call callback(dt) every frame while window is visible"""
+        animation = Animation(self, callback, window)
+        self._animations.add(animation)
+        self._watch(window)
+        self._wake()
+        return animation
+
+    def _watch(self, window):
+        # Restart ticking as soon as a hidden window is shown again
+        key = str(window)
+        if key not in self._watched:
+            self._watched.add(key)
+            window.bind("<Map>", lambda e: self._wake(), add="+")
+            window.bind("<FocusIn>", lambda e: self._wake(), add="+")
+
+    def _wake(self):
+        if self._after_id is None and self._animations:
+            self._after_id = self.root.after(ACTIVE_INTERVAL, self._tick)
+
+    def _app_focused(self):
+        try:
+            return self.root.focus_get() is not None
+        except (KeyError, tk.TclError):
+            # focus_get fails while a ttk popdown has focus; still focused
+            return True
+
+    def _tick(self):
+        self._after_id = None
+        now = time.perf_counter()
+        visible = 0
+
+        for animation in list(self._animations):
+            try:
+                if not animation.window.winfo_exists():
+                    animation.stop()
+                    continue
+                if not animation.window.winfo_viewable():
+                    # Paused: forget the timestamp so it resumes without a jump
+                    animation.last_time = None
+                    continue
+            except tk.TclError:
+                animation.stop()
+                continue
+
+            visible += 1
+            dt = 0.0 if animation.last_time is None else min(now - animation.last_time, MAX_DT)
+            animation.last_time = now
+            try:
+                if animation.callback(dt) is False:
+                    animation.stop()
+            except tk.TclError:
+                # Widget went away mid-frame
+                animation.stop()
+
+        if not visible:
+            return  # Everything hidden; <Map> wakes the clock up again
+        interval = ACTIVE_INTERVAL if self._app_focused() else IDLE_INTERVAL
+        self._after_id = self.root.after(interval, self._tick)
@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import ttk
+import collections
 import random
 import math
 import time
+import numpy as np
+from resources.frame_clock import FrameClock
+from resources.themes import register_themed
+from .tetris_engine import TetrisEngine, NAMES as TETRIS_NAMES
 
 class GamesHub:
     def __init__(self, parent):
@@ -10,6 +15,7 @@ class GamesHub:
         self.window.title("Stress Relief Games")
         self.window.geometry("800x600")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         self.setup_ui()
         
     def setup_ui(self):
@@ -107,12 +113,36 @@ class GamesHub:
     def start_sliding_puzzle(self):
         SlidingPuzzleGame(self.window)
 
+# Bubble counts and spawn intervals (seconds) for the density modes
+BUBBLE_DENSITIES = {
+    "Calm": (10, 2.0),
+    "Lively": (40, 0.5),
+    "Swarm": (300, 0.05),
+}
+BUBBLE_COLORS = ['#3498db', '#2ecc71', '#e74c3c', '#f1c40f', '#9b59b6']
+BUBBLE_STEP = 1 / 60       # fixed simulation timestep, seconds
+BUBBLE_MAX_STEPS = 5       # steps per frame before the simulation lets time slip
+BUBBLE_SPEED = 60.0        # px/s, top drifting speed
+BUBBLE_WANDER = 120.0      # px/s^2, random push that makes the drift meander
+POP_RING_TIME = 0.1        # seconds a pop ring stays on screen
+POP_RINGS = 8              # pooled pop rings; the oldest is reused when all are showing
+
 class BubblePopGame:
+    """Bubbles drift with persistent velocities and bounce off the walls.
+
+    Positions and velocities live in NumPy arrays and advance in fixed
+    BUBBLE_STEP steps, all bubbles in one vectorized pass. Canvas ovals are
+    pooled: popping hides one and spawning shows it again, so nothing is
+    created or deleted while playing. Everything runs from one FrameClock
+    callback, which is stopped when the window is destroyed.
+    """
+
     def __init__(self, parent):
         self.window = tk.Toplevel(parent)
         self.window.title("Bubble Pop")
         self.window.geometry("600x500")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.setup_game()
         
@@ -125,9 +155,27 @@ class BubblePopGame:
             highlightthickness=0
         )
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        register_themed(self.canvas, "canvas")
+        self.bounds = np.array([600.0, 500.0])
+        self.canvas.bind("<Configure>", self.on_resize)
+        
+        # Simulation state for every pooled bubble; `active` marks those in play
+        size = max(count for count, _ in BUBBLE_DENSITIES.values())
+        self.positions = np.zeros((size, 2))
+        self.velocities = np.zeros((size, 2))
+        self.radii = np.zeros(size)
+        self.active = np.zeros(size, dtype=bool)
+        self.items = []  # canvas oval per slot, created on first use
+        self.rng = np.random.default_rng()
+        
+        self.pop_rings = [
+            [self.canvas.create_oval(0, 0, 0, 0, outline="white", width=2, state="hidden"), 0.0]
+            for _ in range(POP_RINGS)
+        ]
         
-        self.bubbles = []
         self.score = 0
+        self.spawn_timer = 0.0
+        self.step_time = 0.0
         
         # Score label
         self.score_label = tk.Label(
@@ -138,77 +186,142 @@ class BubblePopGame:
             fg="white"
         )
         self.score_label.place(x=10, y=10)
+        register_themed(self.score_label, "label")
         
-        # Start spawning bubbles
-        self.spawn_bubble()
+        # Density mode
+        self.density_var = tk.StringVar(value="Calm")
+        density_combo = ttk.Combobox(
+            self.window,
+            textvariable=self.density_var,
+            values=list(BUBBLE_DENSITIES),
+            state="readonly",
+            width=8
+        )
+        density_combo.place(relx=1.0, x=-10, y=10, anchor="ne")
+        density_combo.bind("<<ComboboxSelected>>", self.change_density)
         
+        # Start spawning bubbles; one clock callback drives spawning and floating
+        self.spawn_bubble()
+        self.animation = FrameClock.for_widget(self.window).register(self.update, self.window)
+        self.window.bind("<Destroy>", self.on_destroy, add="+")
+    
+    def on_destroy(self, event):
+        if event.widget is self.window:
+            self.animation.stop()
+    
+    def on_resize(self, event):
+        self.bounds = np.array([float(event.width), float(event.height)])
+    
+    def change_density(self, event=None):
+        # Fewer bubbles allowed: hide the extras without scoring them
+        limit = BUBBLE_DENSITIES[self.density_var.get()][0]
+        for slot in np.flatnonzero(self.active)[limit:]:
+            self.hide_bubble(slot)
+        self.spawn_timer = 0.0
+        
+    def update(self, dt):
+        """Frame clock callback: spawn, step the simulation, then redraw once"""
+        limit, interval = BUBBLE_DENSITIES[self.density_var.get()]
+        self.spawn_timer += dt
+        while self.spawn_timer >= interval:
+            self.spawn_timer -= interval
+            if self.active.sum() < limit:
+                self.spawn_bubble()
+        
+        self.step_time += dt
+        steps = min(int(self.step_time / BUBBLE_STEP), BUBBLE_MAX_STEPS)
+        self.step_time = min(self.step_time - steps * BUBBLE_STEP, BUBBLE_STEP)
+        for _ in range(steps):
+            self.step()
+        self.draw(dt)
+    
+    def step(self):
+        """Advance every bubble by one BUBBLE_STEP"""
+        velocities = self.velocities
+        velocities += self.rng.normal(0, BUBBLE_WANDER * BUBBLE_STEP, velocities.shape)
+        speeds = np.linalg.norm(velocities, axis=1, keepdims=True)
+        velocities *= np.minimum(1.0, BUBBLE_SPEED / np.maximum(speeds, 1e-9))
+        self.positions += velocities * BUBBLE_STEP
+        
+        # Bounce: clamp to the wall and point the velocity back inside
+        radii = self.radii[:, None]
+        low = self.positions < radii
+        high = self.positions > self.bounds - radii
+        self.positions = np.clip(self.positions, radii, np.maximum(self.bounds - radii, radii))
+        velocities[low] = np.abs(velocities[low])
+        velocities[high] = -np.abs(velocities[high])
+    
+    def draw(self, dt):
+        for slot in np.flatnonzero(self.active).tolist():
+            (x, y), r = self.positions[slot], self.radii[slot]
+            self.canvas.coords(self.items[slot], x - r, y - r, x + r, y + r)
+        
+        for ring in self.pop_rings:
+            if ring[1] > 0:
+                ring[1] -= dt
+                if ring[1] <= 0:
+                    self.canvas.itemconfigure(ring[0], state="hidden")
+    
     def spawn_bubble(self):
-        if len(self.bubbles) < 10:  # Limit number of bubbles
-            x = random.randint(50, 550)
-            y = random.randint(50, 450)
-            size = random.randint(20, 40)
-            color = random.choice(['#3498db', '#2ecc71', '#e74c3c', '#f1c40f', '#9b59b6'])
-            
-            bubble = self.canvas.create_oval(
-                x, y, x + size, y + size,
-                fill=color,
-                outline="white"
-            )
-            
-            self.bubbles.append(bubble)
-            self.canvas.tag_bind(bubble, '<Button-1>', lambda e, b=bubble: self.pop_bubble(b))
-            
-            # Add some floating animation
-            self.float_bubble(bubble)
-        
-        self.window.after(2000, self.spawn_bubble)
-        
-    def float_bubble(self, bubble):
-        if bubble in self.bubbles:
-            dx = random.uniform(-2, 2)
-            dy = random.uniform(-2, 2)
-            
-            self.canvas.move(bubble, dx, dy)
-            
-            # Keep bubble in bounds
-            pos = self.canvas.coords(bubble)
-            if pos[0] < 0 or pos[2] > 600:
-                dx = -dx
-            if pos[1] < 0 or pos[3] > 500:
-                dy = -dy
-            
-            self.window.after(50, lambda: self.float_bubble(bubble))
-        
-    def pop_bubble(self, bubble):
-        if bubble in self.bubbles:
-            # Add pop animation
-            pos = self.canvas.coords(bubble)
-            x = (pos[0] + pos[2]) / 2
-            y = (pos[1] + pos[3]) / 2
-            
-            # Create pop effect
-            size = 20
-            pop = self.canvas.create_oval(
-                x - size, y - size,
-                x + size, y + size,
-                outline="white",
-                width=2
-            )
-            
-            self.canvas.delete(bubble)
-            self.bubbles.remove(bubble)
-            self.score += 1
-            self.score_label.config(text=f"Bubbles Popped: {self.score}")
-            
-            # Remove pop effect after animation
-            self.window.after(100, lambda: self.canvas.delete(pop))
+        free = np.flatnonzero(~self.active)
+        if not len(free):
+            return
+        slot = int(free[0])
+        while len(self.items) <= slot:
+            item = self.canvas.create_oval(0, 0, 0, 0, outline="white", state="hidden")
+            self.canvas.tag_bind(item, '<Button-1>', lambda e, s=len(self.items): self.pop_bubble(s))
+            self.items.append(item)
+        
+        radius = random.randint(10, 20)
+        self.radii[slot] = radius
+        self.positions[slot] = [random.uniform(radius, max(radius, self.bounds[0] - radius)),
+                                random.uniform(radius, max(radius, self.bounds[1] - radius))]
+        angle = random.uniform(0, 2 * math.pi)
+        self.velocities[slot] = [math.cos(angle) * BUBBLE_SPEED / 2, math.sin(angle) * BUBBLE_SPEED / 2]
+        self.active[slot] = True
+        
+        x, y = self.positions[slot]
+        self.canvas.coords(self.items[slot], x - radius, y - radius, x + radius, y + radius)
+        self.canvas.itemconfigure(self.items[slot], fill=random.choice(BUBBLE_COLORS), state="normal")
+    
+    def hide_bubble(self, slot):
+        self.active[slot] = False
+        self.canvas.itemconfigure(self.items[slot], state="hidden")
+        
+    def pop_bubble(self, slot):
+        if not self.active[slot]:
+            return
+        x, y = self.positions[slot]
+        self.hide_bubble(slot)
+        self.score += 1
+        self.score_label.config(text=f"Bubbles Popped: {self.score}")
+        
+        # Pop effect: show the ring with the least time left
+        ring = min(self.pop_rings, key=lambda ring: ring[1])
+        size = 20
+        self.canvas.coords(ring[0], x - size, y - size, x + size, y + size)
+        self.canvas.itemconfigure(ring[0], state="normal")
+        self.canvas.tag_raise(ring[0])
+        ring[1] = POP_RING_TIME
+
+TETRIS_FRAME_SAMPLES = 600  # draw_board timings kept for frame_stats()
+TETRIS_GHOST_COLOR = "#5d6d7e"  # where the falling piece would land
 
 class TetrisGame:
+    """Tetris on a retained canvas grid, driven by the bitboard TetrisEngine.
+
+    Every cell has one rectangle, created up front; draw_board compares the
+    new frame with the colours on screen and reconfigures only the cells
+    that changed, so a move costs a few item updates instead of a full
+    redraw.
+    """
+
     def __init__(self, parent):
         self.window = tk.Toplevel(parent)
         self.window.title("Tetris")
         self.window.geometry("400x600")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.block_size = 25
         self.cols = 10
@@ -220,13 +333,20 @@ class TetrisGame:
         score_frame = ttk.Frame(self.window)
         score_frame.pack(pady=10)
         
-        self.score = 0
         self.score_label = ttk.Label(
             score_frame,
-            text=f"Score: {self.score}",
+            text="Score: 0",
             font=("Arial", 14)
         )
-        self.score_label.pack()
+        self.score_label.pack(side=tk.LEFT, padx=(0, 15))
+        
+        # Level and held piece
+        self.status_label = ttk.Label(
+            score_frame,
+            text="",
+            font=("Arial", 11)
+        )
+        self.status_label.pack(side=tk.LEFT)
         
         # Game canvas
         self.canvas = tk.Canvas(
@@ -236,136 +356,85 @@ class TetrisGame:
             bg="#34495e"
         )
         self.canvas.pack(pady=10)
+        register_themed(self.canvas, "canvas")
+        
+        # Retained grid: one rectangle per cell, hidden while the cell is empty
+        size = self.block_size
+        self.cells = [
+            [self.canvas.create_rectangle(
+                x * size, y * size, (x + 1) * size, (y + 1) * size,
+                fill="", outline="white", state="hidden"
+            ) for x in range(self.cols)]
+            for y in range(self.rows)
+        ]
+        self.shown = [[None] * self.cols for _ in range(self.rows)]  # colour on screen
+        self.frame_times = collections.deque(maxlen=TETRIS_FRAME_SAMPLES)
         
         # Initialize game state
-        self.board = [[None for _ in range(self.cols)] for _ in range(self.rows)]
-        self.current_piece = None
-        self.game_over = False
-        
-        # Bind keys
-        self.window.bind('<Left>', lambda e: self.move(-1))
-        self.window.bind('<Right>', lambda e: self.move(1))
-        self.window.bind('<Down>', lambda e: self.move_down())
-        self.window.bind('<Up>', lambda e: self.rotate())
-        
-        self.new_piece()
-        self.update()
-        
-    def new_piece(self):
-        # Tetris pieces (I, O, T, S, Z, J, L)
-        pieces = [
-            [[1, 1, 1, 1]],
-            [[1, 1], [1, 1]],
-            [[0, 1, 0], [1, 1, 1]],
-            [[0, 1, 1], [1, 1, 0]],
-            [[1, 1, 0], [0, 1, 1]],
-            [[1, 0, 0], [1, 1, 1]],
-            [[0, 0, 1], [1, 1, 1]]
-        ]
-        colors = ['#3498db', '#f1c40f', '#9b59b6', '#2ecc71', '#e74c3c', '#e67e22', '#1abc9c']
-        
-        piece_idx = random.randint(0, len(pieces) - 1)
-        self.current_piece = {
-            'shape': pieces[piece_idx],
-            'color': colors[piece_idx],
-            'x': self.cols // 2 - len(pieces[piece_idx][0]) // 2,
-            'y': 0
-        }
+        self.engine = TetrisEngine(self.cols, self.rows)
         
-        if self.check_collision():
-            self.game_over = True
-    
-    def draw_board(self):
-        self.canvas.delete("all")
+        # Bind keys; each move is drawn straight away
+        self.window.bind('<Left>', lambda e: self.on_key(self.engine.move, -1))
+        self.window.bind('<Right>', lambda e: self.on_key(self.engine.move, 1))
+        self.window.bind('<Down>', lambda e: self.on_key(self.engine.soft_drop))
+        self.window.bind('<Up>', lambda e: self.on_key(self.engine.rotate))
+        self.window.bind('<space>', lambda e: self.on_key(self.engine.hard_drop))
+        self.window.bind('<c>', lambda e: self.on_key(self.engine.hold))
         
-        # Draw placed blocks
-        for y in range(self.rows):
-            for x in range(self.cols):
-                if self.board[y][x]:
-                    self.draw_block(x, y, self.board[y][x])
-        
-        # Draw current piece
-        if self.current_piece:
-            for y, row in enumerate(self.current_piece['shape']):
-                for x, cell in enumerate(row):
-                    if cell:
-                        self.draw_block(
-                            self.current_piece['x'] + x,
-                            self.current_piece['y'] + y,
-                            self.current_piece['color']
-                        )
-    
-    def draw_block(self, x, y, color):
-        x1 = x * self.block_size
-        y1 = y * self.block_size
-        x2 = x1 + self.block_size
-        y2 = y1 + self.block_size
-        
-        self.canvas.create_rectangle(
-            x1, y1, x2, y2,
-            fill=color,
-            outline="white"
-        )
-    
-    def check_collision(self):
-        for y, row in enumerate(self.current_piece['shape']):
-            for x, cell in enumerate(row):
-                if cell:
-                    board_x = self.current_piece['x'] + x
-                    board_y = self.current_piece['y'] + y
-                    
-                    if (board_x < 0 or board_x >= self.cols or
-                        board_y >= self.rows or
-                        (board_y >= 0 and self.board[board_y][board_x])):
-                        return True
-        return False
-    
-    def move(self, dx):
-        self.current_piece['x'] += dx
-        if self.check_collision():
-            self.current_piece['x'] -= dx
+        self.draw_board()
+        self.animation = FrameClock.for_widget(self.window).register(self.update, self.window)
     
-    def move_down(self):
-        self.current_piece['y'] += 1
-        if self.check_collision():
-            self.current_piece['y'] -= 1
-            self.place_piece()
-            self.new_piece()
-            self.check_lines()
+    def on_key(self, action, *args):
+        if action(*args):
+            self.draw_board()
     
-    def rotate(self):
-        old_shape = self.current_piece['shape']
-        self.current_piece['shape'] = list(zip(*reversed(self.current_piece['shape'])))
-        if self.check_collision():
-            self.current_piece['shape'] = old_shape
+    def draw_board(self):
+        """Recolour the cells that differ from the last frame; returns how many changed"""
+        start = time.perf_counter()
+        changed = 0
+        for y, row in enumerate(self.engine.frame(TETRIS_GHOST_COLOR)):
+            shown = self.shown[y]
+            if row == shown:
+                continue
+            for x, color in enumerate(row):
+                if color != shown[x]:
+                    if color is None:
+                        self.canvas.itemconfigure(self.cells[y][x], state="hidden")
+                    else:
+                        self.canvas.itemconfigure(self.cells[y][x], fill=color, state="normal")
+                    changed += 1
+            self.shown[y] = row
+        self.frame_times.append(time.perf_counter() - start)
+        self.update_labels()
+        return changed
     
-    def place_piece(self):
-        for y, row in enumerate(self.current_piece['shape']):
-            for x, cell in enumerate(row):
-                if cell:
-                    board_y = self.current_piece['y'] + y
-                    board_x = self.current_piece['x'] + x
-                    if 0 <= board_y < self.rows:
-                        self.board[board_y][board_x] = self.current_piece['color']
+    def update_labels(self):
+        engine = self.engine
+        score = f"Score: {engine.score}"
+        hold = TETRIS_NAMES[engine.hold_piece] if engine.hold_piece is not None else "-"
+        status = f"Level {engine.level} · Lines {engine.lines} · Hold (C): {hold}"
+        if self.score_label.cget("text") != score:
+            self.score_label.config(text=score)
+        if self.status_label.cget("text") != status:
+            self.status_label.config(text=status)
     
-    def check_lines(self):
-        lines_to_clear = []
-        for y in range(self.rows):
-            if all(self.board[y]):
-                lines_to_clear.append(y)
-        
-        for line in lines_to_clear:
-            del self.board[line]
-            self.board.insert(0, [None] * self.cols)
-            self.score += 100
-            self.score_label.config(text=f"Score: {self.score}")
+    def frame_stats(self):
+        """Mean, 95th percentile and worst draw_board time so far, in ms"""
+        times = sorted(self.frame_times)
+        if not times:
+            return None
+        return {
+            'frames': len(times),
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+            'max_ms': times[-1] * 1000,
+        }
     
-    def update(self):
-        if not self.game_over:
-            self.move_down()
+    def update(self, dt):
+        """Frame clock callback: gravity speeds up with the level"""
+        if self.engine.tick(dt):
             self.draw_board()
-            self.window.after(500, self.update)
-        else:
+        if self.engine.game_over:
             self.canvas.create_text(
                 self.cols * self.block_size // 2,
                 self.rows * self.block_size // 2,
@@ -373,6 +442,24 @@ class TetrisGame:
                 font=("Arial", 20, "bold"),
                 fill="white"
             )
+            return False
+
+def benchmark_tetris(moves=600):
+    """Play random moves on a hidden Tetris window and return its frame_stats()"""
+    root = tk.Tk()
+    root.withdraw()
+    game = TetrisGame(root)
+    game.animation.stop()
+    engine = game.engine
+    actions = [(engine.move, -1), (engine.move, 1), (engine.rotate,), (engine.soft_drop,)]
+    for _ in range(moves):
+        if engine.game_over:
+            break
+        action, *args = random.choice(actions)
+        game.on_key(action, *args)
+    stats = game.frame_stats()
+    root.destroy()
+    return stats
 
 class BrickSmasherGame:
     def __init__(self, parent):
@@ -380,6 +467,7 @@ class BrickSmasherGame:
         self.window.title("Brick Smasher")
         self.window.geometry("600x700")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.setup_game()
         
@@ -405,6 +493,7 @@ class BrickSmasherGame:
             highlightthickness=0
         )
         self.canvas.pack()
+        register_themed(self.canvas, "canvas")
         
         # Initialize game objects
         self.paddle_width = 100
@@ -438,7 +527,7 @@ class BrickSmasherGame:
         self.window.bind('<space>', self.start_game)
         
         # Start game loop
-        self.game_loop()
+        self.animation = FrameClock.for_widget(self.window).register(self.game_loop, self.window)
         
     def create_bricks(self):
         self.bricks = []
@@ -517,17 +606,17 @@ class BrickSmasherGame:
                     self.game_over("You Win!")
                 break
     
-    def game_loop(self):
+    def game_loop(self, dt):
+        """Frame clock callback; ball speeds are in pixels per 16 ms frame"""
         if self.game_started:
-            self.canvas.move(self.ball, self.ball_speed_x, self.ball_speed_y)
+            scale = dt * 1000 / 16
+            self.canvas.move(self.ball, self.ball_speed_x * scale, self.ball_speed_y * scale)
             self.check_collision()
             
             # Check if ball is below paddle
             if self.canvas.coords(self.ball)[1] > 600:
                 self.game_over("Game Over!")
-                return
-        
-        self.window.after(16, self.game_loop)
+                return False
     
     def game_over(self, message):
         self.game_started = False
@@ -544,6 +633,7 @@ class SlidingPuzzleGame:
         self.window.title("Sliding Puzzle")
         self.window.geometry("400x500")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.setup_game()
         
@@ -576,6 +666,7 @@ class SlidingPuzzleGame:
             highlightthickness=0
         )
         self.canvas.pack(pady=10)
+        register_themed(self.canvas, "canvas")
         
         self.canvas.bind('<Button-1>', self.click_tile)
         
@@ -0,0 +1,223 @@
+import random
+
+# Tetris pieces (I, O, T, S, Z, J, L) in their spawn orientation
+PIECES = [
+    [[1, 1, 1, 1]],
+    [[1, 1], [1, 1]],
+    [[0, 1, 0], [1, 1, 1]],
+    [[0, 1, 1], [1, 1, 0]],
+    [[1, 1, 0], [0, 1, 1]],
+    [[1, 0, 0], [1, 1, 1]],
+    [[0, 0, 1], [1, 1, 1]]
+]
+COLORS = ['#3498db', '#f1c40f', '#9b59b6', '#2ecc71', '#e74c3c', '#e67e22', '#1abc9c']
+NAMES = ['I', 'O', 'T', 'S', 'Z', 'J', 'L']
+
+# Columns of wall on each side of a row; pieces are at most 4 wide, so a
+# piece that pokes out of the board always overlaps a wall bit
+WALL = 3
+LINE_SCORES = [0, 100, 300, 500, 800]  # by lines cleared at once, times the level
+LINES_PER_LEVEL = 10
+MAX_LEVEL = 20
+MIN_GRAVITY_INTERVAL = 1 / 60  # at most one row per frame, however high the level
+KICKS = (0, -1, 1, -2, 2)  # horizontal nudges tried when a rotation collides
+
+
+def gravity_interval(level):
+    """Seconds per row at `level`: 0.5 s at level 1, speeding up each level"""
+    level = min(level, MAX_LEVEL)
+    return max(MIN_GRAVITY_INTERVAL, 0.5 * (0.8 - (level - 1) * 0.007) ** (level - 1))
+
+
+def _rotations(shape):
+    states = [shape]
+    for _ in range(3):
+        states.append([list(row) for row in zip(*reversed(states[-1]))])
+    return states
+
+
+class TetrisEngine:
+    """Headless Tetris on a bitboard.
+
+    Each board row is an int with bit WALL + x set when column x is filled,
+    and WALL solid bits on either side. Every piece rotation is precomputed
+    as row masks for every column it can sit in, so a collision test is one
+    AND per piece row and a full line is an integer compare. Colours are kept
+    in a parallel grid that only changes when a piece locks or lines clear.
+    """
+
+    def __init__(self, cols=10, rows=20, level=1, seed=None):
+        self.cols = cols
+        self.rows = rows
+        self.walls = ((1 << WALL) - 1) | (((1 << WALL) - 1) << (cols + WALL))
+        self.full = (1 << (cols + 2 * WALL)) - 1
+        self.rng = random.Random(seed)
+
+        # masks[piece][rotation][x + WALL] -> ((dy, row mask), ...)
+        # cells[piece][rotation] -> ((dx, dy), ...)
+        self.masks = []
+        self.cells = []
+        for shape in PIECES:
+            piece_masks, piece_cells = [], []
+            for state in _rotations(shape):
+                rows = [(dy, sum(1 << dx for dx, cell in enumerate(row) if cell))
+                        for dy, row in enumerate(state)]
+                piece_masks.append([tuple((dy, mask << (x + WALL)) for dy, mask in rows if mask)
+                                    for x in range(-WALL, cols)])
+                piece_cells.append(tuple((dx, dy) for dy, row in enumerate(state)
+                                         for dx, cell in enumerate(row) if cell))
+            self.masks.append(piece_masks)
+            self.cells.append(piece_cells)
+
+        self.start_level = level
+        self.reset()
+
+    def reset(self):
+        self.board = [self.walls] * self.rows
+        self.colors = [[None] * self.cols for _ in range(self.rows)]
+        self.score = 0
+        self.lines = 0
+        self.level = self.start_level
+        self.game_over = False
+        self.hold_piece = None
+        self.can_hold = True
+        self._bag = []
+        self._gravity_time = 0.0
+        self.spawn()
+
+    # --- Queries ---
+
+    def fits(self, rotation, x, y):
+        masks = self.masks[self.piece][rotation]
+        if not 0 <= x + WALL < len(masks):
+            return False
+        for dy, mask in masks[x + WALL]:
+            row = y + dy
+            if row >= self.rows or (self.board[row] if row >= 0 else self.walls) & mask:
+                return False
+        return True
+
+    def ghost_y(self):
+        """Row the current piece would land on if dropped now"""
+        y = self.y
+        while self.fits(self.rotation, self.x, y + 1):
+            y += 1
+        return y
+
+    def piece_cells(self, y=None):
+        """(x, y) board cells of the current piece, at row `y` if given"""
+        top = self.y if y is None else y
+        return [(self.x + dx, top + dy) for dx, dy in self.cells[self.piece][self.rotation]]
+
+    def frame(self, ghost_color=None):
+        """Colour of every cell: placed blocks, the ghost piece, then the falling piece"""
+        frame = [row[:] for row in self.colors]
+        if self.game_over:
+            return frame
+        if ghost_color is not None:
+            for x, y in self.piece_cells(self.ghost_y()):
+                if 0 <= y < self.rows:
+                    frame[y][x] = ghost_color
+        for x, y in self.piece_cells():
+            if 0 <= y < self.rows:
+                frame[y][x] = COLORS[self.piece]
+        return frame
+
+    # --- Actions; each returns whether anything changed ---
+
+    def move(self, dx):
+        if not self.game_over and self.fits(self.rotation, self.x + dx, self.y):
+            self.x += dx
+            return True
+        return False
+
+    def rotate(self, direction=1):
+        if self.game_over:
+            return False
+        rotation = (self.rotation + direction) % 4
+        for kick in KICKS:
+            if self.fits(rotation, self.x + kick, self.y):
+                self.rotation = rotation
+                self.x += kick
+                return True
+        return False
+
+    def soft_drop(self):
+        """Move down one row, or lock the piece if it can't"""
+        if self.game_over:
+            return False
+        if self.fits(self.rotation, self.x, self.y + 1):
+            self.y += 1
+        else:
+            self.lock()
+        return True
+
+    def hard_drop(self):
+        if self.game_over:
+            return False
+        self.y = self.ghost_y()
+        self.lock()
+        return True
+
+    def hold(self):
+        """Swap the falling piece with the held one, once per piece"""
+        if self.game_over or not self.can_hold:
+            return False
+        held, self.hold_piece = self.hold_piece, self.piece
+        self.spawn(held)
+        self.can_hold = False
+        return True
+
+    def tick(self, dt):
+        """Apply gravity for `dt` seconds; True if the piece moved or locked"""
+        if self.game_over:
+            return False
+        self._gravity_time += dt
+        interval = gravity_interval(self.level)
+        moved = False
+        while self._gravity_time >= interval and not self.game_over:
+            self._gravity_time -= interval
+            moved = self.soft_drop() or moved
+        return moved
+
+    # --- Internals ---
+
+    def spawn(self, piece=None):
+        if piece is None:
+            if not self._bag:
+                # 7-bag: every piece once per seven, in random order
+                self._bag = list(range(len(PIECES)))
+                self.rng.shuffle(self._bag)
+            piece = self._bag.pop()
+        self.piece = piece
+        self.rotation = 0
+        self.x = self.cols // 2 - len(PIECES[piece][0]) // 2
+        self.y = 0
+        if not self.fits(self.rotation, self.x, self.y):
+            self.game_over = True
+
+    def lock(self):
+        color = COLORS[self.piece]
+        for dy, mask in self.masks[self.piece][self.rotation][self.x + WALL]:
+            if self.y + dy >= 0:
+                self.board[self.y + dy] |= mask
+        for x, y in self.piece_cells():
+            if y >= 0:
+                self.colors[y][x] = color
+
+        # Only the rows the piece touched can have become full
+        cleared = [y for y in range(max(self.y, 0), min(self.y + 4, self.rows))
+                   if self.board[y] == self.full]
+        for y in reversed(cleared):
+            del self.board[y]
+            del self.colors[y]
+        if cleared:
+            self.board[:0] = [self.walls] * len(cleared)
+            self.colors[:0] = [[None] * self.cols for _ in cleared]
+            self.lines += len(cleared)
+            self.score += LINE_SCORES[min(len(cleared), 4)] * self.level
+            self.level = max(self.level, self.start_level + self.lines // LINES_PER_LEVEL)
+
+        self.can_hold = True
+        self._gravity_time = 0.0  # a new piece gets a full interval before it falls
+        self.spawn()
@@ -0,0 +1,312 @@
+import logging
+import math
+import threading
+
+import numpy as np
+import pygame
+
+AMBIENT_PREFIX = 'ambient:'  # track paths for generated sounds
+AMBIENT_CHANNEL = 2          # after the two channels reserved by MixingEngine
+BLOCK = 4096                 # samples per block (~93 ms at 44.1 kHz)
+PINK_OCTAVES = 12            # Voss rows; BLOCK must be a multiple of 2**(PINK_OCTAVES - 1)
+
+
+def one_pole(x, a, state):
+    """y[n] = a*y[n-1] + (1-a)*x[n] for x of shape (n, channels), vectorized.
+
+    Uses y[n] = a**(n+1)*y[-1] + (1-a)*a**n*cumsum(x[k]*a**-k), split into
+    spans short enough that a**-k stays below e**10. Filters that decay
+    within a few dozen samples use a truncated FIR instead (error < 1e-6).
+    Returns (y, last y).
+    """
+    span = max(1, int(10 / -math.log(a)))
+    if span < 64:
+        taps = (1 - a) * a ** np.arange(int(14 / -math.log(a)) + 1)
+        out = np.stack([np.convolve(x[:, c], taps)[:len(x)] for c in range(x.shape[1])], axis=1)
+        out += a ** np.arange(1, len(x) + 1)[:, None] * state
+        return out, out[-1]
+    out = np.empty_like(x)
+    for start in range(0, len(x), span):
+        segment = x[start:start + span]
+        powers = a ** np.arange(len(segment))[:, None]
+        y = (1 - a) * powers * np.cumsum(segment / powers, axis=0) + state * powers * a
+        out[start:start + span] = y
+        state = y[-1]
+    return out, state
+
+
+def cutoff_coefficient(cutoff, rate):
+    return math.exp(-2 * math.pi * cutoff / rate)
+
+
+class _Generator:
+    """Stereo float blocks in [-1, 1]; filter state carries across blocks"""
+
+    # name: (label, minimum, maximum, default)
+    PARAMS = {}
+
+    def __init__(self, rate, rng):
+        self.rate = rate
+        self.rng = rng
+
+    def white(self, n):
+        return self.rng.standard_normal((n, 2))
+
+
+class WhiteNoise(_Generator):
+    PARAMS = {'brightness': ("Brightness", 0.0, 1.0, 1.0)}
+
+    def __init__(self, rate, rng):
+        super().__init__(rate, rng)
+        self.state = np.zeros(2)
+
+    def render(self, n, params):
+        noise = self.white(n) * 0.25
+        # Full brightness is plain white noise; lower values roll off the top
+        cutoff = 500 * 32 ** params['brightness']
+        if cutoff >= 16000:
+            return noise
+        out, self.state = one_pole(noise, cutoff_coefficient(cutoff, self.rate), self.state)
+        return out * min(4.0, math.sqrt(self.rate / (2 * cutoff)))
+
+
+class PinkNoise(_Generator):
+    """Voss-McCartney: octave rows of held random values, summed"""
+
+    PARAMS = {'warmth': ("Warmth", 0.0, 1.0, 0.5)}
+
+    def render(self, n, params):
+        # Warmth turns down the fastest row for a darker sound
+        out = self.white(n) * (1 - params['warmth'])
+        for octave in range(1, PINK_OCTAVES):
+            hold = 2 ** octave
+            out += np.repeat(self.rng.standard_normal((n // hold, 2)), hold, axis=0)
+        return out * (0.25 / math.sqrt(PINK_OCTAVES))
+
+
+class BrownNoise(_Generator):
+    PARAMS = {'depth': ("Depth", 0.0, 1.0, 0.5)}
+
+    def __init__(self, rate, rng):
+        super().__init__(rate, rng)
+        self.state = np.zeros(2)
+
+    def render(self, n, params):
+        # A low one-pole cutoff gives the -6 dB/octave slope of brown noise
+        cutoff = 200 - 180 * params['depth']
+        out, self.state = one_pole(self.white(n), cutoff_coefficient(cutoff, self.rate), self.state)
+        return out * math.sqrt(self.rate / (2 * cutoff)) * 0.3
+
+
+class Rain(_Generator):
+    """High-passed noise bed plus individual droplets"""
+
+    PARAMS = {
+        'intensity': ("Intensity", 5.0, 200.0, 60.0),
+        'brightness': ("Brightness", 0.0, 1.0, 0.5),
+    }
+
+    def __init__(self, rate, rng):
+        super().__init__(rate, rng)
+        self.low_state = np.zeros(2)
+        self.soft_state = np.zeros(2)
+        length = int(0.012 * rate)
+        t = np.arange(length) / rate
+        # A droplet: a short noise burst with a fast exponential decay
+        self.droplet = rng.standard_normal(length) * np.exp(-t / 0.002)
+        self.tail = np.zeros((length, 2))
+
+    def render(self, n, params):
+        noise = self.white(n)
+        low, self.low_state = one_pole(noise, cutoff_coefficient(400, self.rate), self.low_state)
+        cutoff = 2000 + 8000 * params['brightness']
+        bed, self.soft_state = one_pole(noise - low, cutoff_coefficient(cutoff, self.rate), self.soft_state)
+
+        # Droplets: Poisson arrivals, each adding the droplet shape in place
+        out = np.zeros((n + len(self.droplet), 2))
+        out[:len(self.tail)] += self.tail
+        count = self.rng.poisson(params['intensity'] * n / self.rate)
+        if count:
+            starts = self.rng.integers(0, n, count)
+            gains = self.rng.uniform(0.1, 0.6, (count, 2))
+            index = starts[:, None] + np.arange(len(self.droplet))
+            for side in range(2):
+                np.add.at(out[:, side], index, gains[:, side, None] * self.droplet)
+        self.tail = out[n:].copy()
+        intensity = params['intensity'] / 200
+        return out[:n] * 0.3 + bed * (0.15 + 0.35 * intensity)
+
+
+class Wind(_Generator):
+    """Low-passed noise with slowly drifting gusts"""
+
+    PARAMS = {'gustiness': ("Gustiness", 0.0, 1.0, 0.5)}
+
+    def __init__(self, rate, rng):
+        super().__init__(rate, rng)
+        self.state = np.zeros(2)
+        self.gust = 0.5
+
+    def render(self, n, params):
+        out, self.state = one_pole(self.white(n), cutoff_coefficient(350, self.rate), self.state)
+        # Gust level random-walks once per block and ramps across it
+        target = float(np.clip(self.gust + self.rng.normal(0, 0.08 * params['gustiness']), 0.2, 1.0))
+        envelope = np.linspace(self.gust, target, n)[:, None]
+        self.gust = target
+        return out * envelope * math.sqrt(self.rate / 700) * 0.35
+
+
+class Binaural(_Generator):
+    """Two sine drones, `beat` Hz apart between the ears"""
+
+    PARAMS = {
+        'base': ("Base tone (Hz)", 80.0, 400.0, 200.0),
+        'beat': ("Beat (Hz)", 1.0, 30.0, 6.0),
+    }
+
+    def __init__(self, rate, rng):
+        super().__init__(rate, rng)
+        self.phase = np.zeros(2)
+
+    def render(self, n, params):
+        frequencies = np.array([params['base'], params['base'] + params['beat']])
+        steps = 2 * math.pi * frequencies / self.rate
+        phases = self.phase + np.arange(1, n + 1)[:, None] * steps
+        self.phase = phases[-1] % (2 * math.pi)
+        return (np.sin(phases) + 0.3 * np.sin(2 * phases)) * 0.25
+
+
+GENERATORS = {
+    'white': ("White Noise", WhiteNoise),
+    'pink': ("Pink Noise", PinkNoise),
+    'brown': ("Brown Noise", BrownNoise),
+    'rain': ("Rain", Rain),
+    'wind': ("Wind", Wind),
+    'binaural': ("Binaural Drone", Binaural),
+}
+
+# Which library category lists each generated sound
+GENERATED_CATEGORIES = {
+    'White Noise': ['white', 'pink', 'brown'],
+    'Rain Sounds': ['rain'],
+    'Nature Sounds': ['wind'],
+    'Meditation Music': ['binaural'],
+}
+
+
+def generated_tracks(category):
+    return [{'name': f"✨ {GENERATORS[kind][0]} (generated)", 'path': AMBIENT_PREFIX + kind}
+            for kind in GENERATED_CATEGORIES.get(category, [])]
+
+
+class AmbientPlayer:
+    """Streams a generator into one mixer channel, a block at a time.
+
+    A worker keeps exactly one block queued behind the one playing, so memory
+    is two blocks and CPU is one render per block. Parameters can be changed
+    from any thread and take effect on the next block; volume ramps across
+    the block so changes never click.
+    """
+
+    def __init__(self):
+        self.rate, size, self.channels = pygame.mixer.get_init()
+        self.dtype = np.int16 if abs(size) == 16 else np.float32
+        pygame.mixer.set_reserved(AMBIENT_CHANNEL + 1)
+        self.channel = pygame.mixer.Channel(AMBIENT_CHANNEL)
+        self.rng = np.random.default_rng()
+
+        self.kind = None
+        self.params = {}
+        self.volume = 0.5
+        self.is_playing = False
+        self._generator = None
+        self._previous = None  # (generator, params) crossfaded out over one block
+        self._applied_volume = 0.0
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def current_path(self):
+        return AMBIENT_PREFIX + self.kind if self.kind else None
+
+    def start(self, kind):
+        label, cls = GENERATORS[kind]
+        generator = cls(self.rate, self.rng)
+        if self._generator is not None:
+            self._previous = (self._generator, self.params)
+        self.params = {name: spec[3] for name, spec in cls.PARAMS.items()}
+        self._generator = generator
+        self.kind = kind
+        self.is_playing = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="ambient", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def set_param(self, name, value):
+        if name == 'volume':
+            self.volume = float(value)
+        else:
+            self.params[name] = float(value)
+
+    def pause(self):
+        self.is_playing = False
+        self.channel.pause()
+
+    def resume(self):
+        if self.kind:
+            self.is_playing = True
+            self.channel.unpause()
+            self._wake.set()
+
+    def stop(self):
+        self.kind = None
+        self.is_playing = False
+        self._generator = None
+        self._previous = None
+        self._applied_volume = 0.0
+        self.channel.fadeout(300)
+
+    def _render_block(self):
+        generator, previous = self._generator, self._previous
+        if generator is None:
+            return None
+        block = generator.render(BLOCK, self.params)
+        if previous is not None:
+            # Crossfade from the old sound across this block
+            ramp = np.linspace(0, 1, BLOCK)[:, None]
+            block = block * ramp + previous[0].render(BLOCK, previous[1]) * (1 - ramp)
+            self._previous = None
+        gain = np.linspace(self._applied_volume, self.volume, BLOCK)[:, None]
+        self._applied_volume = self.volume
+        block = np.clip(block * gain, -1.0, 1.0)
+
+        if self.channels == 1:
+            block = block.mean(axis=1)
+        if self.dtype == np.int16:
+            block = (block * 32767).astype(np.int16)
+        else:
+            block = block.astype(np.float32)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(block))
+
+    def _run(self):
+        interval = BLOCK / self.rate / 4
+        while True:
+            if not self.is_playing:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            try:
+                if self.channel.get_queue() is None:
+                    sound = self._render_block()
+                    if sound is None:
+                        pass
+                    elif self.channel.get_busy():
+                        self.channel.queue(sound)
+                    else:
+                        self.channel.play(sound)
+            except Exception as e:
+                logging.error(f"Ambient generator error: {str(e)}")
+                self.stop()
+            self._wake.wait(interval)
+            self._wake.clear()
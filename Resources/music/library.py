@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import threading
+import wave
+
+try:
+    import mutagen  # optional: durations and tags for mp3/ogg/flac
+except ImportError:
+    mutagen = None
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg')
+INDEX_FILE = '.library_index.json'
+INDEX_VERSION = 1
+
+# Display names for the folders the app ships with; any other folder becomes
+# a category named after it
+CATEGORY_NAMES = {
+    'nature': 'Nature Sounds',
+    'classical': 'Classical Music',
+    'meditation': 'Meditation Music',
+    'white_noise': 'White Noise',
+    'rain': 'Rain Sounds'
+}
+
+PUBLISH_EVERY = 500  # files between partial results during a scan
+
+
+def category_name(folder):
+    return CATEGORY_NAMES.get(folder, folder.replace('_', ' ').title())
+
+
+def category_order(folder):
+    # Built-in categories first, in their usual order, then the rest by name
+    known = list(CATEGORY_NAMES)
+    return (known.index(folder), '') if folder in known else (len(known), folder.lower())
+
+
+def read_metadata(path):
+    """Duration in seconds and title/artist tags, where they can be read"""
+    info = {'duration': None, 'title': None, 'artist': None}
+    try:
+        if mutagen is not None:
+            audio = mutagen.File(path, easy=True)
+            if audio is not None:
+                if audio.info is not None:
+                    info['duration'] = round(audio.info.length, 1)
+                tags = audio.tags or {}
+                info['title'] = (tags.get('title') or [None])[0]
+                info['artist'] = (tags.get('artist') or [None])[0]
+        elif path.lower().endswith('.wav'):
+            with wave.open(path, 'rb') as f:
+                info['duration'] = round(f.getnframes() / f.getframerate(), 1)
+    except Exception as e:
+        logging.warning(f"Could not read metadata for {path}: {str(e)}")
+    return info
+
+
+class MusicLibrary:
+    """Index of the music folder, built and refreshed on a background thread.
+
+    Every top-level folder is a category; files in its subfolders count too.
+    Metadata is cached in INDEX_FILE keyed by path and reused while the file's
+    mtime and size are unchanged, so a rescan of an unchanged library is one
+    stat per file. `tracks` is replaced as a whole after each batch, so
+    readers on the Tk thread never see a half-built dict; `version` goes up
+    each time so they can tell it changed.
+    """
+
+    def __init__(self, music_dir):
+        self.music_dir = music_dir
+        self.index_path = os.path.join(music_dir, INDEX_FILE)
+        self.tracks = {}
+        self.version = 0
+        self._index = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def scanning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self):
+        """Start a background scan unless one is already running"""
+        with self._lock:
+            if self.scanning:
+                return
+            self._thread = threading.Thread(target=self._run, name="music-library", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        if not self._index:
+            self._load_index()
+        self._scan()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        self._index = data.get('files', {})
+        # Show the cached library straight away, before the scan confirms it
+        self._publish(self._index)
+
+    def _save_index(self, index):
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'files': index}, f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logging.error(f"Failed to save music index: {str(e)}")
+
+    def _folders(self):
+        try:
+            return [entry for entry in os.scandir(self.music_dir)
+                    if entry.is_dir() and not entry.name.startswith(('.', '_'))]
+        except OSError:
+            return []
+
+    def _walk(self, folders):
+        """(category folder, relative path, stat) for every audio file"""
+        for folder in folders:
+            stack = [folder.path]
+            while stack:
+                try:
+                    entries = list(os.scandir(stack.pop()))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                        rel_path = os.path.relpath(entry.path, self.music_dir)
+                        yield folder.name, rel_path, entry.stat()
+
+    def _scan(self):
+        index = {}
+        changed = False
+        # Empty folders still show up as categories, with a hint to add files
+        folders = self._folders()
+        names = [folder.name for folder in folders]
+        # With no cached index, show the first files while the rest are read
+        first_scan = not self._index
+        for count, (folder, rel_path, stat) in enumerate(self._walk(folders), 1):
+            cached = self._index.get(rel_path)
+            if cached and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                entry = cached
+            else:
+                entry = {
+                    'category': folder,
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    **read_metadata(os.path.join(self.music_dir, rel_path)),
+                }
+                changed = True
+            index[rel_path] = entry
+            if first_scan and count % PUBLISH_EVERY == 0:
+                self._publish(index, names)
+
+        changed = changed or len(index) != len(self._index)
+        self._index = index
+        self._publish(index, names)
+        if changed:
+            self._save_index(index)
+
+    def _publish(self, index, folders=()):
+        by_folder = {folder: [] for folder in folders}
+        for rel_path, entry in index.items():
+            name = os.path.splitext(os.path.basename(rel_path))[0]
+            by_folder.setdefault(entry['category'], []).append({
+                'name': entry.get('title') or name,
+                'path': os.path.join(self.music_dir, rel_path),
+                'duration': entry.get('duration'),
+                'artist': entry.get('artist'),
+            })
+        tracks = {}
+        for folder in sorted(by_folder, key=category_order):
+            tracks[category_name(folder)] = sorted(by_folder[folder], key=lambda track: track['name'].lower())
+        self.tracks = tracks
+        self.version += 1
@@ -0,0 +1,404 @@
+import collections
+import logging
+import math
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# Gains (incoming, outgoing) at crossfade progress x in [0, 1]
+CURVES = {
+    'linear': lambda x: (x, 1 - x),
+    'equal_power': lambda x: (math.sin(x * math.pi / 2), math.cos(x * math.pi / 2)),
+    's_curve': lambda x: ((1 - math.cos(x * math.pi)) / 2, (1 + math.cos(x * math.pi)) / 2),
+    'exponential': lambda x: (x * x, (1 - x) * (1 - x)),
+}
+
+DEFAULT_CROSSFADE = 3.0   # seconds
+DEFAULT_CURVE = 'equal_power'
+TICK = 0.02               # seconds between fade / auto-advance updates
+DECODE_CACHE_SIZE = 3     # decoded tracks kept in memory (current, next, previous)
+# Tracks that would decode to more than this are streamed with mixer.music
+# instead of being held in memory as a Sound
+MAX_DECODED_BYTES = 128 * 1024 * 1024
+COMPRESSION_RATIO = 11    # rough decoded / encoded size for mp3 and ogg
+
+
+def decoded_size(path):
+    size = os.path.getsize(path)
+    return size if path.lower().endswith('.wav') else size * COMPRESSION_RATIO
+
+
+class _SoundVoice:
+    """A fully decoded track playing on one of the engine's channels"""
+
+    def __init__(self, path, sound, channel):
+        self.path = path
+        self.sound = sound
+        self.channel = channel
+        self.length = sound.get_length()
+        self.started_at = None
+        self._paused_at = None
+
+    def start(self, loops, volume):
+        self.channel.set_volume(volume)
+        self.channel.play(self.sound, loops=loops)
+        self.started_at = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def set_volume(self, volume):
+        self.channel.set_volume(volume)
+
+    def pause(self):
+        self.channel.pause()
+        self._paused_at = time.monotonic()
+
+    def unpause(self):
+        self.started_at += time.monotonic() - self._paused_at
+        self.channel.unpause()
+
+    def busy(self):
+        return self.channel.get_busy()
+
+    def stop(self):
+        self.channel.stop()
+
+
+class _StreamVoice:
+    """A long track streamed from disk through pygame.mixer.music"""
+
+    def __init__(self, path):
+        self.path = path
+        self.length = None  # unknown without decoding; never auto-advanced early
+
+    def start(self, loops, volume):
+        pygame.mixer.music.load(self.path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(loops)
+
+    def elapsed(self):
+        return pygame.mixer.music.get_pos() / 1000
+
+    def set_volume(self, volume):
+        pygame.mixer.music.set_volume(volume)
+
+    def pause(self):
+        pygame.mixer.music.pause()
+
+    def unpause(self):
+        pygame.mixer.music.unpause()
+
+    def busy(self):
+        return pygame.mixer.music.get_busy()
+
+    def stop(self):
+        pygame.mixer.music.stop()
+
+
+class MixingEngine:
+    """Plays tracks on two reserved mixer channels with crossfades.
+
+    Every public method only queues a command, so the Tk thread never waits
+    on decoding or fading. The engine thread applies commands, steps fades
+    every TICK and starts the next track `crossfade` seconds before the end
+    of the current one. The next track in the playlist is decoded ahead of
+    time on a separate worker, so changing tracks has no silent gap.
+    """
+
+    def __init__(self, crossfade=DEFAULT_CROSSFADE, curve=DEFAULT_CURVE):
+        pygame.mixer.set_num_channels(max(8, pygame.mixer.get_num_channels()))
+        # Channels 0 and 1 are ours; Sound.play() elsewhere won't pick them
+        pygame.mixer.set_reserved(2)
+        self._channels = [pygame.mixer.Channel(0), pygame.mixer.Channel(1)]
+
+        self.crossfade = crossfade
+        self.curve = curve
+        self.volume = 1.0
+        self.shuffle = False
+        self.repeat_one = True  # loop the current track, like the old player
+
+        # Read by the UI; written by the public methods and the engine thread
+        self.current_path = None
+        self.is_playing = False
+        self.track_changes = 0  # bumped when the engine moves to another track
+
+        self._playlist = []
+        self._order = []
+        self._position = 0
+        self._current = None
+        self._pending = None  # track waiting on the decoder before it starts
+        self._advanced = None  # voice auto-advance already moved on from
+        self._fades = []  # [voice, start time, fade_in]
+        self._decoded = collections.OrderedDict()  # path -> Future[Sound]
+        self._decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="music-decode")
+        self._commands = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="music-engine", daemon=True)
+        self._thread.start()
+
+    # --- Public API (any thread, never blocks) ---
+
+    def play(self, path, playlist=None):
+        self.current_path = path
+        self.is_playing = True
+        self._commands.put(('play', path, list(playlist or [path])))
+
+    def next(self):
+        self._commands.put(('skip', 1))
+
+    def previous(self):
+        self._commands.put(('skip', -1))
+
+    def pause(self):
+        self.is_playing = False
+        self._commands.put(('pause',))
+
+    def resume(self):
+        if self.current_path:
+            self.is_playing = True
+            self._commands.put(('resume',))
+
+    def stop(self):
+        self.current_path = None
+        self.is_playing = False
+        self._commands.put(('stop',))
+
+    def set_shuffle(self, shuffle):
+        self._commands.put(('shuffle', shuffle))
+
+    def set_repeat_one(self, repeat_one):
+        self._commands.put(('repeat_one', repeat_one))
+
+    def set_crossfade(self, seconds, curve=None):
+        if curve is not None and curve not in CURVES:
+            raise ValueError(f"Unknown crossfade curve: {curve}")
+        self._commands.put(('crossfade', seconds, curve))
+
+    def set_volume(self, volume):
+        self._commands.put(('volume', max(0.0, min(1.0, volume))))
+
+    def preload(self, path):
+        """Start decoding a track the user is likely to play"""
+        self._commands.put(('preload', path))
+
+    # --- Engine thread ---
+
+    def _run(self):
+        while True:
+            try:
+                # Idle (nothing fading or due to advance): sleep until a command
+                command = self._commands.get(timeout=TICK if self._busy() else None)
+            except queue.Empty:
+                command = None
+            try:
+                if command is not None:
+                    getattr(self, f"_cmd_{command[0]}")(*command[1:])
+                self._tick()
+            except Exception as e:
+                logging.error(f"Music engine error: {str(e)}")
+
+    def _decode(self, path):
+        future = self._decoded.pop(path, None)
+        if future is None:
+            future = self._decoder.submit(pygame.mixer.Sound, path)
+        self._decoded[path] = future
+        while len(self._decoded) > DECODE_CACHE_SIZE:
+            self._decoded.popitem(last=False)
+        return future
+
+    def _cmd_preload(self, path):
+        if decoded_size(path) <= MAX_DECODED_BYTES:
+            self._decode(path)
+
+    def _free_channel(self):
+        in_use = {voice.channel for voice, _, _ in self._fades if isinstance(voice, _SoundVoice)}
+        if isinstance(self._current, _SoundVoice):
+            in_use.add(self._current.channel)
+        for channel in self._channels:
+            if channel not in in_use:
+                return channel
+        # Both busy (a third change mid-fade): cut the oldest fade-out short
+        for fade in self._fades:
+            voice = fade[0]
+            if isinstance(voice, _SoundVoice) and voice is not self._current:
+                self._fades.remove(fade)
+                voice.stop()
+                return voice.channel
+        return self._channels[0]
+
+    def _voice(self, path, future):
+        """A streamed voice without a decode future, else one for the decoded Sound"""
+        if future is None:
+            return _StreamVoice(path)
+        try:
+            return _SoundVoice(path, future.result(), self._free_channel())
+        except Exception as e:
+            self._decoded.pop(path, None)
+            logging.error(f"Could not load track {path}: {str(e)}")
+            return None
+
+    def _start(self, path):
+        """Start `path` now if it can be, otherwise once the decoder has it"""
+        self._pending = None
+        try:
+            future = None if decoded_size(path) > MAX_DECODED_BYTES else self._decode(path)
+        except OSError as e:
+            logging.error(f"Could not load track {path}: {str(e)}")
+            return
+        if future is not None and not future.done():
+            # Not preloaded: keep stepping fades and taking commands while it
+            # decodes, and start it when the decoder posts it back
+            self._pending = path
+            future.add_done_callback(lambda future: self._commands.put(('decoded', path, future)))
+            return
+        self._begin(path, future)
+
+    def _cmd_decoded(self, path, future):
+        if path != self._pending:
+            return  # another track was picked, or playback stopped, meanwhile
+        playing = self.is_playing
+        self._pending = None
+        self._begin(path, future)
+        if not playing:  # paused while it was decoding
+            self.is_playing = False
+            self._cmd_pause()
+
+    def _begin(self, path, future):
+        voice = self._voice(path, future)
+        if voice is None:
+            return
+        if isinstance(voice, _StreamVoice):
+            # Only one stream can play at a time; stop any other stream first
+            for fade in [f for f in self._fades if isinstance(f[0], _StreamVoice)]:
+                fade[0].stop()
+                self._fades.remove(fade)
+            if isinstance(self._current, _StreamVoice):
+                self._current.stop()
+                self._current = None
+
+        now = time.monotonic()
+        if self._current is not None:
+            # A track still fading in now fades out instead
+            self._fades = [fade for fade in self._fades if fade[0] is not self._current]
+            self._fades.append([self._current, now, False])
+        voice.start(-1 if self.repeat_one else 0, 0.0 if self.crossfade > 0 else self.volume)
+        self._fades.append([voice, now, True])
+        self._current = voice
+        self.current_path = path
+        self.is_playing = True
+        self.track_changes += 1
+        self._preload_next()
+
+    def _preload_next(self):
+        if len(self._order) > 1:
+            next_path = self._playlist[self._order[(self._position + 1) % len(self._order)]]
+            self._cmd_preload(next_path)
+
+    def _reorder(self, current_index):
+        self._order = list(range(len(self._playlist)))
+        if self.shuffle:
+            random.shuffle(self._order)
+            self._order.remove(current_index)
+            self._order.insert(0, current_index)
+        self._position = self._order.index(current_index)
+
+    def _cmd_play(self, path, playlist):
+        self._playlist = playlist if path in playlist else [path]
+        self._reorder(self._playlist.index(path))
+        self._start(path)
+
+    def _cmd_skip(self, step):
+        if not self._order:
+            return
+        self._position = (self._position + step) % len(self._order)
+        self._start(self._playlist[self._order[self._position]])
+
+    def _cmd_pause(self):
+        # Finish fades now so nothing is left half-faded while paused
+        for voice, _, fade_in in self._fades:
+            if not fade_in:
+                voice.stop()
+        self._fades = []
+        if self._current is not None:
+            self._current.set_volume(self.volume)
+            self._current.pause()
+
+    def _cmd_resume(self):
+        if self._current is not None:
+            self._current.unpause()
+
+    def _cmd_stop(self):
+        self._pending = None
+        for voice, _, _ in self._fades:
+            voice.stop()
+        self._fades = []
+        if self._current is not None:
+            self._current.stop()
+            self._current = None
+        self.current_path = None
+        self.is_playing = False
+
+    def _cmd_shuffle(self, shuffle):
+        self.shuffle = shuffle
+        if self._order:
+            self._reorder(self._order[self._position])
+            self._preload_next()
+
+    def _cmd_repeat_one(self, repeat_one):
+        self.repeat_one = repeat_one
+
+    def _cmd_crossfade(self, seconds, curve):
+        self.crossfade = max(0.0, seconds)
+        if curve is not None:
+            self.curve = curve
+
+    def _cmd_volume(self, volume):
+        self.volume = volume
+        if self._current is not None and not self._fades:
+            self._current.set_volume(volume)
+
+    def _busy(self):
+        """Whether _tick has anything to do before the next command"""
+        if self._fades:
+            return True
+        return (self._current is not None and self.is_playing and not self.repeat_one
+                and not self._pending and self._current is not self._advanced)
+
+    def _tick(self):
+        now = time.monotonic()
+        curve = CURVES[self.curve]
+        for fade in list(self._fades):
+            voice, start, fade_in = fade
+            progress = 1.0 if self.crossfade <= 0 else min(1.0, (now - start) / self.crossfade)
+            gain_in, gain_out = curve(progress)
+            voice.set_volume((gain_in if fade_in else gain_out) * self.volume)
+            if progress >= 1.0:
+                self._fades.remove(fade)
+                if not fade_in:
+                    voice.stop()
+
+        current = self._current
+        if current is None or self._pending or not self.is_playing or self.repeat_one:
+            return
+        if current is self._advanced:
+            return  # already moved on; waiting for the next track to start
+        # Start the next track early enough to overlap by one crossfade. A
+        # track started in loop mode advances at the end of its current pass
+        if not current.busy():
+            self._advance(current)
+        elif current.length:
+            # Short tracks overlap by at most half their length, and never
+            # before they have played for that long
+            crossfade = min(self.crossfade, current.length / 2)
+            elapsed = current.elapsed()
+            if elapsed > crossfade and current.length - elapsed % current.length <= crossfade:
+                self._advance(current)
+
+    def _advance(self, voice):
+        self._advanced = voice
+        self._cmd_skip(1)
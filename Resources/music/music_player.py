@@ -1,74 +1,123 @@
-import os
 import pygame
 import threading
 from tkinter import ttk
 import tkinter as tk
+from resources.themes import register_themed
+from resources.music.library import MusicLibrary
+from resources.music.mixer import MixingEngine
+from resources.music.track_list import TrackList
+from resources.music.ambient import (
+    AmbientPlayer, AMBIENT_PREFIX, GENERATORS, GENERATED_CATEGORIES, generated_tracks
+)
+
+LIBRARY_POLL_INTERVAL = 250  # ms between checks for new scan results
+PLAYBACK_POLL_INTERVAL = 500  # ms between checks for automatic track changes
+FILTER_DELAY = 150  # ms of typing pause before the track filter runs
 
 class MusicPlayer:
     def __init__(self, music_dir):
         pygame.mixer.init()
         self.music_dir = music_dir
-        self.current_track = None
-        self.is_playing = False
-        self.tracks = self._load_tracks()
-        
-    def _load_tracks(self):
-        """Load all music tracks from the music directory"""
-        tracks = {}
-        categories = {
-            'nature': 'Nature Sounds',
-            'classical': 'Classical Music',
-            'meditation': 'Meditation Music',
-            'white_noise': 'White Noise',
-            'rain': 'Rain Sounds'
-        }
-        
-        for category in categories:
-            category_path = os.path.join(self.music_dir, category)
-            if os.path.exists(category_path):
-                tracks[categories[category]] = []
-                for file in os.listdir(category_path):
-                    if file.endswith(('.mp3', '.wav')):
-                        tracks[categories[category]].append({
-                            'name': os.path.splitext(file)[0],
-                            'path': os.path.join(category_path, file)
-                        })
-        
-        return tracks
+        # Decoding, crossfades and playlist order all run off the Tk thread
+        self.engine = MixingEngine()
+        # Generated noise, rain, wind and drones; no files needed
+        self.ambient = AmbientPlayer()
+        self._tracks_cache = (None, {})
+        self._search_keys = (None, {})
+        # Indexed on a background thread; `tracks` fills in as the scan runs
+        self.library = MusicLibrary(music_dir)
+        self.library.refresh()
+    
+    @property
+    def tracks(self):
+        """Library tracks by category, with the generated sounds listed first"""
+        version = self.library.version
+        if self._tracks_cache[0] != version:
+            tracks = dict(self.library.tracks)
+            for category in GENERATED_CATEGORIES:
+                tracks[category] = generated_tracks(category) + tracks.get(category, [])
+            self._tracks_cache = (version, tracks)
+        return self._tracks_cache[1]
+    
+    def search(self, category, query, rows=None):
+        """Rows of `category` whose title or artist contains every word of `query`.
+        
+        `rows` limits the search to an earlier result, e.g. the matches for
+        the query before the user typed another letter.
+        """
+        tracks = self.tracks.get(category, [])
+        version, keys = self._search_keys
+        if version != self._tracks_cache[0]:
+            keys = {}
+            self._search_keys = (self._tracks_cache[0], keys)
+        if category not in keys:
+            keys[category] = [f"{track['name']} {track.get('artist') or ''}".lower() for track in tracks]
+        category_keys = keys[category]
+        words = query.lower().split()
+        return [row for row in (range(len(tracks)) if rows is None else rows)
+                if all(word in category_keys[row] for word in words)]
     
-    def play(self, track_path):
-        if self.current_track != track_path:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(track_path)
-            pygame.mixer.music.play(-1)
-            self.current_track = track_path
-            self.is_playing = True
+    @property
+    def current_track(self):
+        return self.ambient.current_path or self.engine.current_path
+    
+    @property
+    def is_playing(self):
+        return self.ambient.is_playing or self.engine.is_playing
+    
+    def play(self, track_path, playlist=None):
+        if self.current_track == track_path:
+            return
+        if track_path.startswith(AMBIENT_PREFIX):
+            self.engine.stop()
+            self.ambient.start(track_path[len(AMBIENT_PREFIX):])
+        else:
+            self.ambient.stop()
+            files = [path for path in playlist or [] if not path.startswith(AMBIENT_PREFIX)]
+            self.engine.play(track_path, files or None)
     
     def pause(self):
-        if self.is_playing:
-            pygame.mixer.music.pause()
-            self.is_playing = False
+        if self.ambient.is_playing:
+            self.ambient.pause()
+        elif self.is_playing:
+            self.engine.pause()
     
     def resume(self):
-        if not self.is_playing and self.current_track:
-            pygame.mixer.music.unpause()
-            self.is_playing = True
+        if self.ambient.kind:
+            self.ambient.resume()
+        elif not self.is_playing and self.current_track:
+            self.engine.resume()
     
     def stop(self):
-        pygame.mixer.music.stop()
-        self.current_track = None
-        self.is_playing = False
+        self.ambient.stop()
+        self.engine.stop()
+    
+    def next(self):
+        self.engine.next()
+    
+    def previous(self):
+        self.engine.previous()
 
 class MusicPlayerUI:
     def __init__(self, parent, music_player):
         self.window = tk.Toplevel(parent)
         self.window.title("Relaxing Music")
-        self.window.geometry("500x400")
+        self.window.geometry("560x450")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.music_player = music_player
-        self.current_track_widget = None
+        self._library_version = None
+        self._shown_tracks = None
+        self._filter = ("", None, None)  # (query, category, matching rows)
+        self._filter_job = None
+        self._track_changes = music_player.engine.track_changes
         self.setup_ui()
+        
+        # Pick up files added since the last scan, without blocking the window
+        self.music_player.library.refresh()
+        self._poll_library()
+        self._poll_playback()
     
     def setup_ui(self):
         # Main frame
@@ -109,30 +158,31 @@ class MusicPlayerUI:
         self.category_combo.pack(side=tk.LEFT)
         self.category_combo.bind("<<ComboboxSelected>>", self.update_track_list)
         
-        # Tracks list frame
-        tracks_frame = ttk.Frame(main_frame)
-        tracks_frame.pack(fill=tk.BOTH, expand=True)
+        # Filter-as-you-type search over the selected category
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 10))
         
-        # Create track listing with scrollbar
-        self.tracks_canvas = tk.Canvas(
-            tracks_frame,
-            bg="#2c3e50",
-            highlightthickness=0
-        )
-        scrollbar = ttk.Scrollbar(tracks_frame, orient="vertical", command=self.tracks_canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.tracks_canvas)
+        ttk.Label(
+            search_frame,
+            text="🔍",
+            font=("Arial", 11)
+        ).pack(side=tk.LEFT, padx=(0, 5))
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.tracks_canvas.configure(scrollregion=self.tracks_canvas.bbox("all"))
-        )
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self._schedule_filter())
+        ttk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Arial", 11)
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        self.tracks_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.tracks_canvas.configure(yscrollcommand=scrollbar.set)
+        # Tracks list frame
+        tracks_frame = ttk.Frame(main_frame)
+        tracks_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Pack the track listing components
-        self.tracks_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Only the visible rows have widgets, so large categories stay fast
+        self.track_list = TrackList(tracks_frame, self.play_track)
+        self.track_list.pack()
         
         # Player controls frame
         control_frame = ttk.Frame(main_frame)
@@ -150,10 +200,21 @@ class MusicPlayerUI:
         )
         self.track_name_label.pack()
         
+        # Live controls for generated sounds, shown while one is playing
+        self.ambient_frame = ttk.Frame(control_frame)
+        
         # Control buttons frame
         buttons_frame = ttk.Frame(control_frame)
         buttons_frame.pack()
         
+        # Previous track button
+        ttk.Button(
+            buttons_frame,
+            text="⏮️",
+            width=3,
+            command=self.music_player.previous
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Play/Pause button
         self.play_pause_btn = ttk.Button(
             buttons_frame,
@@ -172,11 +233,31 @@ class MusicPlayerUI:
         )
         self.stop_btn.pack(side=tk.LEFT, padx=5)
         
-        # Initialize with first category
-        if categories:
-            self.category_combo.set(categories[0])
-            self.update_track_list()
-            
+        # Next track button
+        ttk.Button(
+            buttons_frame,
+            text="⏭️",
+            width=3,
+            command=self.music_player.next
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Playlist options: shuffle the category, or keep looping one track
+        self.shuffle_var = tk.BooleanVar(value=self.music_player.engine.shuffle)
+        ttk.Checkbutton(
+            buttons_frame,
+            text="🔀 Shuffle",
+            variable=self.shuffle_var,
+            command=lambda: self.music_player.engine.set_shuffle(self.shuffle_var.get())
+        ).pack(side=tk.LEFT, padx=(15, 5))
+        
+        self.repeat_var = tk.BooleanVar(value=self.music_player.engine.repeat_one)
+        ttk.Checkbutton(
+            buttons_frame,
+            text="🔁 Loop track",
+            variable=self.repeat_var,
+            command=lambda: self.music_player.engine.set_repeat_one(self.repeat_var.get())
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Instructions (subtle)
         ttk.Label(
             main_frame,
@@ -185,67 +266,137 @@ class MusicPlayerUI:
             foreground="gray"
         ).pack(side=tk.BOTTOM, pady=(10, 0))
     
-    def update_track_list(self, event=None):
-        # Clear existing tracks
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
+    def _poll_library(self):
+        """Show new scan results on the Tk thread until the scan is done"""
+        if not self.window.winfo_exists():
+            return
+        library = self.music_player.library
+        if library.version != self._library_version:
+            self._library_version = library.version
+            categories = list(self.music_player.tracks.keys())
+            self.category_combo.configure(values=categories)
+            if categories and self.category_var.get() not in categories:
+                self.category_combo.set(categories[0])
+            self.update_track_list()
+        if library.scanning or library.version != self._library_version:
+            self.window.after(LIBRARY_POLL_INTERVAL, self._poll_library)
+    
+    def _schedule_filter(self):
+        # Wait for a pause in typing rather than filtering on every key
+        if self._filter_job is not None:
+            self.window.after_cancel(self._filter_job)
+        self._filter_job = self.window.after(FILTER_DELAY, self._apply_filter)
+    
+    def _apply_filter(self):
+        self._filter_job = None
+        self.update_track_list(keep_position=False)
+    
+    def _filtered(self, category, tracks):
+        """The tracks matching the search box, narrowing the last result when possible"""
+        query = self.search_var.get().strip().lower()
+        if not query:
+            self._filter = ("", category, None)
+            return tracks
+        last_query, last_category, last_rows = self._filter
+        rows = None
+        if last_category == category and last_rows is not None and query.startswith(last_query):
+            rows = last_rows
+        rows = self.music_player.search(category, query, rows)
+        self._filter = (query, category, rows)
+        return [tracks[row] for row in rows]
+    
+    def update_track_list(self, event=None, keep_position=None):
         selected_category = self.category_var.get()
         tracks = self.music_player.tracks.get(selected_category, [])
+        query = self.search_var.get().strip().lower()
+        scanning = self.music_player.library.scanning
+        shown = (selected_category, tracks, scanning, query)
+        if event is None and shown == self._shown_tracks:
+            return  # Rescan found nothing new for this category
+        previous = self._shown_tracks or (None, None, None, None)
+        if previous[1] is not tracks:
+            self._filter = ("", None, None)  # Cached matches are rows of another list
+        if keep_position is None:
+            # A rescan of the same category keeps the scroll position
+            keep_position = event is None and previous[0] == selected_category and previous[3] == query
+        self._shown_tracks = shown
+        
+        if not tracks and scanning:
+            message = "Scanning music library..."
+        elif not tracks:
+            message = f"No tracks available in {selected_category}.\nAdd .mp3 or .wav files to the appropriate folder."
+        else:
+            message = f"No tracks in {selected_category} match \"{self.search_var.get().strip()}\"."
+        self.track_list.select(self.music_player.current_track)
+        self.track_list.set_tracks(self._filtered(selected_category, tracks), message, keep_position)
+    
+    def _show_current(self, track):
+        """Highlight the playing track and show its name"""
+        self.track_list.select(track['path'])
         
-        if not tracks:
-            ttk.Label(
-                self.scrollable_frame,
-                text=f"No tracks available in {selected_category}.\nAdd .mp3 or .wav files to the appropriate folder.",
-                font=("Arial", 11),
-                wraplength=400
-            ).pack(expand=True)
+        # Update track name label
+        self.track_name_label.config(text=track['name'])
+    
+    def _show_ambient_controls(self, track):
+        """One slider per generator parameter, plus volume"""
+        for widget in self.ambient_frame.winfo_children():
+            widget.destroy()
+        if not track['path'].startswith(AMBIENT_PREFIX):
+            self.ambient_frame.pack_forget()
             return
         
-        for track in tracks:
-            track_frame = ttk.Frame(self.scrollable_frame)
-            track_frame.pack(fill=tk.X, pady=5)
-            
-            # Track button (whole row is clickable)
-            track_btn = tk.Button(
-                track_frame,
-                text=track['name'],
-                font=("Arial", 11),
-                bg="#34495e" if track['path'] != self.music_player.current_track else "#FFD700",  # Changed selected color to yellow
-                fg="white" if track['path'] != self.music_player.current_track else "black",  # Black text on yellow background
-                relief=tk.FLAT,
-                anchor="w",
-                padx=10,
-                pady=5,
-                command=lambda t=track: self.play_track(t)
+        ambient = self.music_player.ambient
+        params = {'volume': ("Volume", 0.0, 1.0, ambient.volume)}
+        params.update(GENERATORS[track['path'][len(AMBIENT_PREFIX):]][1].PARAMS)
+        for row, (name, (label, low, high, default)) in enumerate(params.items()):
+            ttk.Label(self.ambient_frame, text=label, font=("Arial", 10)).grid(
+                row=row, column=0, sticky="w", padx=(0, 10)
             )
-            track_btn.pack(fill=tk.X)
-            
-            # Store reference to current track's widget
-            if track['path'] == self.music_player.current_track:
-                self.current_track_widget = track_btn
+            scale = ttk.Scale(
+                self.ambient_frame,
+                from_=low,
+                to=high,
+                length=250,
+                command=lambda value, name=name: ambient.set_param(name, float(value))
+            )
+            scale.set(default)
+            scale.grid(row=row, column=1, pady=2)
+        self.ambient_frame.pack(after=self.info_frame, pady=(0, 10))
     
     def play_track(self, track):
         # Update UI first
-        if self.current_track_widget:
-            self.current_track_widget.configure(bg="#34495e", fg="white")
-        
-        for widget in self.scrollable_frame.winfo_children():
-            if isinstance(widget, ttk.Frame):
-                btn = widget.winfo_children()[0]
-                if btn['text'] == track['name']:
-                    btn.configure(bg="#FFD700", fg="black")  # Yellow background with black text for selected track
-                    self.current_track_widget = btn
-                    break
-        
-        # Update track name label
-        self.track_name_label.config(text=track['name'])
+        self._show_current(track)
         
         # Update play/pause button
         self.play_pause_btn.config(text="⏸️")
         
-        # Play the track
-        self.music_player.play(track['path'])
+        # Play the track; the rest of the category is the playlist
+        playlist = [t['path'] for t in self.music_player.tracks.get(self.category_var.get(), [])]
+        self.music_player.play(track['path'], playlist)
+        self._show_ambient_controls(track)
+    
+    def play_from(self, category, track):
+        """Show `category` and play `track` from it"""
+        self.category_combo.set(category)
+        self.search_var.set("")
+        self.update_track_list(event=True)
+        self.track_list.see(track['path'])
+        self.play_track(track)
+    
+    def _poll_playback(self):
+        """Follow track changes made by the engine (auto-advance, next/previous)"""
+        if not self.window.winfo_exists():
+            return
+        engine = self.music_player.engine
+        if engine.track_changes != self._track_changes:
+            self._track_changes = engine.track_changes
+            for track in self.music_player.tracks.get(self.category_var.get(), []):
+                if track['path'] == engine.current_path:
+                    self._show_current(track)
+                    self.track_list.see(track['path'])
+                    self.play_pause_btn.config(text="⏸️")
+                    break
+        self.window.after(PLAYBACK_POLL_INTERVAL, self._poll_playback)
     
     def toggle_play_pause(self):
         if not self.music_player.current_track:
@@ -260,10 +411,9 @@ class MusicPlayerUI:
     
     def stop_music(self):
         self.music_player.stop()
+        self._show_ambient_controls({'path': ''})
         self.play_pause_btn.config(text="▶️")
         self.track_name_label.config(text="No track selected")
         
         # Reset track highlighting
-        if self.current_track_widget:
-            self.current_track_widget.configure(bg="#34495e", fg="white")
-            self.current_track_widget = None
\ No newline at end of file
+        self.track_list.select(None)
\ No newline at end of file
@@ -0,0 +1,141 @@
+import tkinter as tk
+from tkinter import ttk
+from resources.themes import register_themed, role_options
+
+ROW_HEIGHT = 40  # px per row, including the gap below it
+ROW_GAP = 10
+OVERSCAN = 2     # rows rendered beyond each edge of the viewport
+
+
+class TrackList:
+    """Scrollable track list that only has widgets for the visible rows.
+
+    The canvas scroll region is as tall as the whole list, but only a pool
+    of buttons sized to the viewport exists; scrolling moves and relabels
+    them, so a category of 50,000 tracks costs the same as one of 20.
+    Visible buttons are keyed by track path, so moving the highlight
+    reconfigures just the old and the new row.
+    """
+
+    def __init__(self, parent, on_select):
+        self.on_select = on_select
+        self.tracks = []
+        self.selected = None
+        self._index = {}    # path -> row
+        self._pool = []     # (button, canvas window) pairs, reused across renders
+        self._rows = []     # track shown by each pool button
+        self._visible = {}  # path -> button
+        self._shown = None  # (first row, row count) last rendered
+
+        self.canvas = tk.Canvas(parent, bg="#2c3e50", highlightthickness=0, yscrollincrement=ROW_HEIGHT)
+        register_themed(self.canvas, "canvas")
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self._bind_wheel(self.canvas)
+
+        # Shown instead of rows when the list is empty
+        self._message = ttk.Label(self.canvas, font=("Arial", 11), wraplength=400, justify=tk.CENTER)
+        self._message_window = self.canvas.create_window(0, 40, window=self._message, anchor="n", state="hidden")
+
+    def pack(self):
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+    def set_tracks(self, tracks, message="", keep_position=False):
+        """Show `tracks`, or `message` if there are none"""
+        self.tracks = tracks
+        self._index = {track['path']: row for row, track in enumerate(tracks)}
+        self.canvas.itemconfigure(self._message_window, state="hidden" if tracks else "normal")
+        self._message.configure(text=message)
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def select(self, path):
+        """Move the highlight to `path`; only the two affected rows change"""
+        previous = self._visible.get(self.selected)
+        if previous is not None:
+            self._style(previous, "button")
+        self.selected = path
+        current = self._visible.get(path)
+        if current is not None:
+            self._style(current, "selected")
+
+    def see(self, path):
+        """Scroll just far enough for `path` to be visible"""
+        row = self._index.get(path)
+        if row is None:
+            return
+        top = int(self.canvas.canvasy(0) // ROW_HEIGHT)
+        rows = max(1, self.canvas.winfo_height() // ROW_HEIGHT)
+        if row < top:
+            self.canvas.yview_scroll(row - top, "units")
+        elif row >= top + rows:
+            self.canvas.yview_scroll(row - top - rows + 1, "units")
+
+    def refresh(self):
+        """Re-render after a resize or a new track list"""
+        width = self.canvas.winfo_width()
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.tracks) * ROW_HEIGHT))
+        self.canvas.coords(self._message_window, width // 2, 40)
+        for _, window in self._pool:
+            self.canvas.itemconfigure(window, width=width)
+        self._shown = None
+        self._render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    @staticmethod
+    def _style(button, role):
+        """Colour a row button for `role` and keep it following theme switches"""
+        button.configure(**role_options(role))
+        register_themed(button, role)
+
+    def _grow_pool(self, size):
+        width = self.canvas.winfo_width()
+        while len(self._pool) < size:
+            slot = len(self._pool)
+            button = tk.Button(
+                self.canvas,
+                font=("Arial", 11),
+                relief=tk.FLAT,
+                anchor="w",
+                padx=10,
+                pady=5,
+                command=lambda slot=slot: self.on_select(self._rows[slot])
+            )
+            self._bind_wheel(button)
+            window = self.canvas.create_window(
+                0, 0, window=button, anchor="nw", width=width, height=ROW_HEIGHT - ROW_GAP
+            )
+            self._pool.append((button, window))
+
+    def _render(self):
+        first = max(0, int(self.canvas.canvasy(0) // ROW_HEIGHT) - OVERSCAN)
+        rows = self.canvas.winfo_height() // ROW_HEIGHT + 2 * OVERSCAN + 1
+        count = max(0, min(rows, len(self.tracks) - first))
+        if (first, count) == self._shown:
+            return
+        self._shown = (first, count)
+        self._grow_pool(count)
+
+        self._rows = self.tracks[first:first + count]
+        self._visible = {}
+        for slot, (button, window) in enumerate(self._pool):
+            if slot >= count:
+                self.canvas.itemconfigure(window, state="hidden")
+                continue
+            track = self._rows[slot]
+            button.configure(text=track['name'])
+            self._style(button, "selected" if track['path'] == self.selected else "button")
+            self.canvas.coords(window, 0, (first + slot) * ROW_HEIGHT + ROW_GAP // 2)
+            self.canvas.itemconfigure(window, state="normal")
+            self._visible[track['path']] = button
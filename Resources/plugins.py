@@ -0,0 +1,119 @@
+import importlib
+import importlib.util
+import logging
+import threading
+from importlib import metadata
+
+# Third-party stress-relief modules can register under this entry point
+# group as "name = package.module"
+ENTRY_POINT_GROUP = "helio.plugins"
+
+
+class Plugin:
+    """One stress-relief module, known by name before it is imported"""
+
+    def __init__(self, name, label, module, warm=None):
+        self.name = name
+        self.label = label
+        # Candidate import paths, first one found wins
+        self.candidates = (module,) if isinstance(module, str) else tuple(module)
+        self.module_name = self.candidates[0]
+        # Optional warm(module) hook run on the warm-up thread after import
+        self.warm = warm
+        self.available = None  # unknown until discover()
+        self.module = None
+        self.error = None
+
+
+# Built-in manifest, in menu order. Stories and games are also looked up in
+# the nested folders they ship in.
+MANIFEST = [
+    ("music", "🎵 Relaxing Music", "resources.music.music_player"),
+    ("stories", "📖 Motivational Stories",
+     ("resources.stories.stories_viewer", "resources.stories.stories.stories_viewer")),
+    ("games", "🎮 Stress Relief Games",
+     ("resources.games.games_module", "resources.games.games.games_module")),
+    ("breathing", "🌬️ Breathing Exercises", "resources.breathing.breathing_exercises"),
+]
+
+
+class PluginRegistry:
+    """Finds stress-relief modules without importing them and loads on demand"""
+
+    def __init__(self, manifest=MANIFEST):
+        self.plugins = {name: Plugin(name, label, module) for name, label, module in manifest}
+        self._lock = threading.Lock()
+        self._warming = set()
+
+    def discover(self):
+        """Check which modules exist using import specs only; no module code runs"""
+        try:
+            entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except Exception as e:
+            logging.warning(f"Could not read plugin entry points: {str(e)}")
+            entry_points = []
+        for entry_point in entry_points:
+            if entry_point.name not in self.plugins:
+                label = entry_point.name.replace("_", " ").title()
+                self.plugins[entry_point.name] = Plugin(entry_point.name, label, entry_point.value)
+
+        for plugin in self.plugins.values():
+            plugin.available = False
+            for module_name in plugin.candidates:
+                try:
+                    found = importlib.util.find_spec(module_name) is not None
+                except (ImportError, ValueError):
+                    found = False
+                if found:
+                    plugin.module_name = module_name
+                    plugin.available = True
+                    break
+            if not plugin.available:
+                logging.info(f"Stress-relief module '{plugin.name}' not found ({plugin.module_name})")
+        return self
+
+    def __iter__(self):
+        return iter(self.plugins.values())
+
+    def get(self, name):
+        return self.plugins.get(name)
+
+    def set_warm_hook(self, name, hook):
+        if name in self.plugins:
+            self.plugins[name].warm = hook
+
+    def load(self, name):
+        """Import a plugin's module (once); returns None if it is missing or broken"""
+        plugin = self.plugins.get(name)
+        if plugin is None or plugin.available is False:
+            return None
+        if plugin.module is None and plugin.error is None:
+            with self._lock:
+                if plugin.module is None and plugin.error is None:
+                    try:
+                        plugin.module = importlib.import_module(plugin.module_name)
+                    except Exception as e:
+                        plugin.error = str(e)
+                        logging.error(f"Failed to load stress-relief module '{name}': {plugin.error}")
+        return plugin.module
+
+    def warm_up(self, names):
+        """Import (and run warm hooks for) the given plugins on a daemon thread"""
+        pending = [name for name in names if name in self.plugins and name not in self._warming]
+        if not pending:
+            return None
+        self._warming.update(pending)
+
+        def run():
+            for name in pending:
+                module = self.load(name)
+                plugin = self.plugins[name]
+                if module is not None and plugin.warm is not None:
+                    try:
+                        plugin.warm(module)
+                    except Exception as e:
+                        logging.warning(f"Warm-up of '{name}' failed: {str(e)}")
+
+        thread = threading.Thread(target=run, name="plugin-warm-up", daemon=True)
+        thread.start()
+        return thread
@@ -1,26 +1,24 @@
-import json
-import os
 import tkinter as tk
 from tkinter import ttk
+from resources.themes import register_themed
+from .story_store import open_store
 
 class StoriesViewer:
-    def __init__(self, parent, stories_file):
+    def __init__(self, parent, stories_file, story_id=None):
         self.window = tk.Toplevel(parent)
         self.window.title("Motivational Stories")
         self.window.geometry("700x600")
         self.window.configure(bg="#2c3e50")
+        register_themed(self.window, "window")
         
         self.stories_file = stories_file
-        self.stories = self._load_stories()
+        # Titles and categories only; a story's text is read when it's picked
+        self.store = open_store(stories_file)
+        self.shown_ids = []
         self.current_story = None
         self.setup_ui()
-    
-    def _load_stories(self):
-        """Load stories from JSON file"""
-        if os.path.exists(self.stories_file):
-            with open(self.stories_file, 'r') as f:
-                return json.load(f)['stories']
-        return []
+        if story_id is not None:
+            self.open_story(story_id)
     
     def setup_ui(self):
         # Main frame
@@ -39,7 +37,7 @@ class StoriesViewer:
         ).pack(side=tk.LEFT)
         
         # Create category combobox
-        categories = sorted(list(set(story['category'] for story in self.stories)))
+        categories = sorted(self.store.categories)
         self.category_var = tk.StringVar()
         
         category_frame = ttk.Frame(top_frame)
@@ -59,7 +57,25 @@ class StoriesViewer:
             width=20
         )
         self.category_combo.pack(side=tk.LEFT)
-        self.category_combo.bind("<<ComboboxSelected>>", self.update_stories_list)
+        self.category_combo.bind("<<ComboboxSelected>>", self.on_category_select)
+        
+        # Ranked search across every story; replaces the category list while non-empty
+        search_frame = ttk.Frame(main_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(
+            search_frame,
+            text="🔍 Search:",
+            font=("Arial", 11)
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.update_stories_list())
+        ttk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Arial", 11)
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # Stories list (now using a more compact listbox)
         list_frame = ttk.Frame(main_frame)
@@ -81,6 +97,7 @@ class StoriesViewer:
             highlightthickness=0
         )
         self.stories_listbox.pack(side=tk.LEFT, fill=tk.Y)
+        register_themed(self.stories_listbox, "listbox")
         
         scrollbar = ttk.Scrollbar(left_panel, orient=tk.VERTICAL)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -114,6 +131,7 @@ class StoriesViewer:
             height=0  # Will expand with parent
         )
         self.story_content.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        register_themed(self.story_content, "text")
         self.story_content.config(state=tk.DISABLED)
         
         # Moral frame at the bottom
@@ -144,26 +162,48 @@ class StoriesViewer:
             foreground="gray"
         ).pack(side=tk.BOTTOM, pady=(10, 0))
     
+    def on_category_select(self, event=None):
+        if self.search_var.get():
+            self.search_var.set("")  # Clearing the search also refreshes the list
+        else:
+            self.update_stories_list()
+    
     def update_stories_list(self, event=None):
         self.stories_listbox.delete(0, tk.END)
         selected_category = self.category_var.get()
-        
-        # Filter stories by category
-        category_stories = [s for s in self.stories if s['category'] == selected_category]
-        
-        # Add stories to listbox
-        for story in category_stories:
-            self.stories_listbox.insert(tk.END, story['title'])
+        query = self.search_var.get()
+        
+        # Listbox rows map to story ids through shown_ids
+        if query.strip():
+            self.shown_ids = self.store.search(query)
+        else:
+            self.shown_ids = self.store.categories.get(selected_category, [])
+        titles = [self.store.titles[story_id] for story_id in self.shown_ids]
+        if titles:
+            self.stories_listbox.insert(tk.END, *titles)
     
     def on_story_select(self, event):
         selection = self.stories_listbox.curselection()
         if not selection:
             return
             
-        selected_category = self.category_var.get()
-        category_stories = [s for s in self.stories if s['category'] == selected_category]
-        story = category_stories[selection[0]]
-        self.show_story(story)
+        story = self.store.load(self.shown_ids[selection[0]])
+        if story is not None:
+            self.show_story(story)
+    
+    def open_story(self, story_id):
+        """Switch to the story's category and show it, selected in the list"""
+        category = self.store.category_of(story_id)
+        if category is None:
+            return
+        self.category_combo.set(category)
+        self.on_category_select()
+        row = self.shown_ids.index(story_id)
+        self.stories_listbox.selection_set(row)
+        self.stories_listbox.see(row)
+        story = self.store.load(story_id)
+        if story is not None:
+            self.show_story(story)
     
     def show_story(self, story):
         """Display the selected story"""
@@ -171,9 +211,9 @@ class StoriesViewer:
         
         self.story_content.config(state=tk.NORMAL)
         self.story_content.delete(1.0, tk.END)
-        self.story_content.insert(tk.END, story['content'])
+        self.story_content.insert(tk.END, story.get('content', ''))
         self.story_content.config(state=tk.DISABLED)
         
-        self.moral_label.config(text=f"Moral: {story['moral']}")
+        self.moral_label.config(text=f"Moral: {story['moral']}" if story.get('moral') else "")
         
         self.current_story = story
\ No newline at end of file
@@ -0,0 +1,162 @@
+import bisect
+import collections
+import itertools
+import math
+import re
+import unicodedata
+
+import numpy as np
+
+# A word in the title counts three times, in the moral twice
+FIELD_WEIGHTS = {'title': 3, 'moral': 2, 'content': 1}
+K1 = 1.2
+B = 0.75
+MAX_PREFIX_TERMS = 64  # most common completions tried for a half-typed word
+
+# Devanagari vowel signs and viramas are not \w; without them Hindi and
+# Marathi words would split into fragments (the danda stays punctuation)
+_WORD = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+')
+# Scripts written without spaces between words
+_CJK_RUN = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+')
+
+
+def tokenize(text):
+    """Case-folded words, then CJK runs as overlapping bigrams (order is not kept)"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    runs = _CJK_RUN.findall(text)
+    if not runs:
+        return _WORD.findall(text)
+    tokens = _WORD.findall(_CJK_RUN.sub(' ', text))
+    for run in runs:
+        tokens.extend([run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)])
+    return tokens
+
+
+class BM25Index:
+    """Inverted index over stories, ranked with BM25 across weighted fields.
+
+    Postings are stored CSR-style: the documents and weighted term
+    frequencies of term i are docs[pointers[i]:pointers[i + 1]] and the same
+    slice of tfs. A query touches only the postings of its own terms, and
+    the last word is treated as a prefix so results follow typing.
+    """
+
+    def __init__(self, vocab, pointers, docs, tfs, lengths):
+        self.vocab = vocab  # sorted
+        self.pointers = pointers
+        self.docs = docs
+        self.tfs = tfs
+        self.lengths = lengths
+        self._term_ids = None
+        average = lengths.mean() if len(lengths) else 1.0
+        self._norm = K1 * (1 - B + B * lengths / max(average, 1e-9))
+
+    @classmethod
+    def build(cls, stories):
+        # Postings are collected in story order with provisional term ids
+        # (unique but not contiguous), then regrouped by term with one stable sort
+        term_ids = {}
+        next_ids = itertools.count()
+        terms, docs, tfs, lengths = [], [], [], []
+        for doc, story in enumerate(stories):
+            # Repeating a field's tokens `weight` times weights its counts
+            tokens = []
+            for field, weight in FIELD_WEIGHTS.items():
+                tokens += tokenize(str(story.get(field) or '')) * weight
+            counts = collections.Counter(tokens)
+            terms.extend(map(term_ids.setdefault, counts, next_ids))
+            tfs.extend(counts.values())
+            docs.extend([doc] * len(counts))
+            lengths.append(len(tokens))
+
+        vocab = sorted(term_ids)
+        rank = np.zeros(next(next_ids), dtype=np.int64)
+        rank[[term_ids[term] for term in vocab]] = np.arange(len(vocab))
+        term_ranks = rank[np.array(terms, dtype=np.int64)]
+        order = np.argsort(term_ranks, kind='stable')
+        pointers = np.zeros(len(vocab) + 1, dtype=np.int64)
+        pointers[1:] = np.cumsum(np.bincount(term_ranks, minlength=len(vocab)))
+        return cls(
+            vocab,
+            pointers,
+            np.array(docs, dtype=np.int32)[order],
+            np.array(tfs, dtype=np.float32)[order],
+            np.array(lengths, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_arrays(cls, vocab, arrays):
+        return cls(vocab, arrays['pointers'], arrays['docs'], arrays['tfs'], arrays['lengths'])
+
+    def arrays(self):
+        return {
+            'pointers': self.pointers,
+            'docs': self.docs,
+            'tfs': self.tfs,
+            'lengths': self.lengths,
+        }
+
+    def _terms(self, query):
+        if self._term_ids is None:
+            self._term_ids = {term: i for i, term in enumerate(self.vocab)}
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+        # Until a space follows it, the last word may still be half-typed
+        partial = None
+        if not query[-1:].isspace():
+            last = tokenize(query.split()[-1])
+            if last:
+                partial = last[-1]
+                tokens.remove(partial)
+        terms = {self._term_ids[token] for token in tokens if token in self._term_ids}
+        if partial is not None:
+            low = bisect.bisect_left(self.vocab, partial)
+            high = bisect.bisect_left(self.vocab, partial + '\uffff')
+            if high - low > MAX_PREFIX_TERMS:
+                counts = np.diff(self.pointers[low:high + 1])
+                terms.update((low + np.argsort(-counts, kind='stable')[:MAX_PREFIX_TERMS]).tolist())
+            else:
+                terms.update(range(low, high))
+        return terms
+
+    def search(self, query, limit=50):
+        """Story ids for `query`, best match first"""
+        count = len(self.lengths)
+        scores = np.zeros(count, dtype=np.float32)
+        for term in self._terms(query):
+            start, end = self.pointers[term], self.pointers[term + 1]
+            docs, tfs = self.docs[start:end], self.tfs[start:end]
+            idf = math.log(1 + (count - (end - start) + 0.5) / ((end - start) + 0.5))
+            # Each story appears once per term, so plain fancy indexing adds
+            scores[docs] += idf * tfs * (K1 + 1) / (tfs + self._norm[docs])
+        hits = np.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit)[:limit]]
+        return hits[np.argsort(-scores[hits], kind='stable')].tolist()
+
+    def tfidf(self, max_features, include=()):
+        """(terms, idf, matrix) with one L2-normalised TF-IDF row per story.
+
+        Columns are the `max_features` terms found in the most stories (but
+        not in over half of them), plus any of `include` in the vocabulary.
+        """
+        count = len(self.lengths)
+        df = np.diff(self.pointers)
+        usable = np.flatnonzero(df <= max(1, count // 2))
+        chosen = set(usable[np.argsort(-df[usable], kind='stable')[:max_features]].tolist())
+        if self._term_ids is None:
+            self._term_ids = {term: i for i, term in enumerate(self.vocab)}
+        chosen.update(self._term_ids[term] for term in include if term in self._term_ids)
+        chosen = np.array(sorted(chosen), dtype=np.int64)
+
+        # Gather every posting of the chosen terms in one go
+        starts, sizes = self.pointers[chosen], df[chosen]
+        columns = np.repeat(np.arange(len(chosen)), sizes)
+        postings = np.arange(sizes.sum()) + np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+        idf = np.log((1 + count) / (1 + df[chosen])).astype(np.float32) + 1
+        matrix = np.zeros((count, len(chosen)), dtype=np.float32)
+        matrix[self.docs[postings], columns] = (1 + np.log(self.tfs[postings])) * idf[columns]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, 1e-9)
+        return [self.vocab[i] for i in chosen], idf, matrix
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+
+from .story_search import BM25Index, tokenize
+
+INDEX_VERSION = 3
+_STORIES_LIST = re.compile(r'"stories"\s*:\s*\[')
+_SEPARATORS = ' \t\r\n,'
+
+
+def scan_stories(data):
+    """(story, start byte, end byte) for every story in a stories JSON file.
+
+    Stories are decoded one at a time with raw_decode, so the byte range of
+    each one can be recorded while the file is read.
+    """
+    text = data.decode('utf-8')
+    match = _STORIES_LIST.search(text)
+    if match is None:
+        raise ValueError('no "stories" list found')
+    decoder = json.JSONDecoder()
+    # Character positions advance through the text once; the byte position
+    # follows by encoding only the span in between
+    char_pos = byte_pos = 0
+
+    def to_bytes(pos):
+        nonlocal char_pos, byte_pos
+        byte_pos += len(text[char_pos:pos].encode('utf-8'))
+        char_pos = pos
+        return byte_pos
+
+    pos = match.end()
+    while True:
+        while pos < len(text) and text[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            return
+        story, end = decoder.raw_decode(text, pos)
+        yield story, to_bytes(pos), to_bytes(end)
+        pos = end
+
+
+class StoryStore:
+    """Titles and categories of a stories file, with bodies read on demand.
+
+    The first open scans the file and records the byte range of every story.
+    The index, with a BM25 search index built in the same pass, is saved
+    next to the file and reused while the file's mtime and size are
+    unchanged, so later openings read only titles, offsets and postings;
+    `load` seeks straight to the one story the user picked.
+    """
+
+    # Same tokens as the index, for callers building their own queries
+    tokenize = staticmethod(tokenize)
+
+    def __init__(self, stories_file):
+        self.stories_file = stories_file
+        directory, name = os.path.split(stories_file)
+        self.index_path = os.path.join(directory, f".{os.path.splitext(name)[0]}.index.npz")
+        self.titles = []
+        self.categories = {}  # category -> story ids, in file order
+        self._offsets = np.zeros((0, 2), dtype=np.int64)
+        self._search = None
+        self._stamp = None
+        self.refresh()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.stories_file)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def refresh(self):
+        """Re-index if the stories file changed; True if anything was reloaded"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        self.titles, self.categories = [], {}
+        self._offsets = np.zeros((0, 2), dtype=np.int64)
+        self._search = None
+        self._stamp = stamp
+        if stamp is not None and not self._load_index(stamp):
+            self._build()
+        return True
+
+    def _load_index(self, stamp):
+        try:
+            with np.load(self.index_path, allow_pickle=False) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if meta.get('version') != INDEX_VERSION or meta.get('stamp') != stamp:
+                    return False
+                offsets = data['offsets']
+                search = {name: data[f'search_{name}'] for name in ('pointers', 'docs', 'tfs', 'lengths')}
+        except (OSError, KeyError, ValueError):
+            return False
+        self.titles = meta['titles']
+        self.categories = meta['categories']
+        self._offsets = offsets
+        self._search = BM25Index.from_arrays(meta['vocab'], search)
+        return True
+
+    def _build(self):
+        try:
+            with open(self.stories_file, 'rb') as f:
+                data = f.read()
+            scanned = list(scan_stories(data))
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read stories from {self.stories_file}: {str(e)}")
+            return
+
+        for story_id, (story, start, end) in enumerate(scanned):
+            self.titles.append(story.get('title', ''))
+            self.categories.setdefault(story.get('category', ''), []).append(story_id)
+        self._offsets = np.array([(start, end - start) for _, start, end in scanned],
+                                 dtype=np.int64).reshape(-1, 2)
+        self._search = BM25Index.build(story for story, _, _ in scanned)
+        self._save_index()
+
+    def _save_index(self):
+        meta = {
+            'version': INDEX_VERSION,
+            'stamp': self._stamp,
+            'titles': self.titles,
+            'categories': self.categories,
+            'vocab': self._search.vocab,
+        }
+        arrays = {f'search_{name}': array for name, array in self._search.arrays().items()}
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                    offsets=self._offsets,
+                    **arrays
+                )
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            # Read-only install: the index is rebuilt next time instead
+            logging.warning(f"Could not save story index: {str(e)}")
+
+    def search(self, query, limit=50):
+        """Ids of the stories best matching `query`, across all categories"""
+        if self._search is None or not query.strip():
+            return []
+        return self._search.search(query, limit)
+
+    def tfidf(self, max_features, include=()):
+        """TF-IDF vectors of every story; see BM25Index.tfidf"""
+        if self._search is None:
+            return [], np.zeros(0, dtype=np.float32), np.zeros((len(self.titles), 0), dtype=np.float32)
+        return self._search.tfidf(max_features, include)
+
+    def category_of(self, story_id):
+        for category, ids in self.categories.items():
+            if story_id in ids:
+                return category
+        return None
+
+    def load(self, story_id):
+        """The full story (title, category, content, moral), or None"""
+        start, length = self._offsets[story_id].tolist()
+        try:
+            with open(self.stories_file, 'rb') as f:
+                f.seek(start)
+                return json.loads(f.read(length).decode('utf-8'))
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not load story {story_id}: {str(e)}")
+            return None
+
+
+# One store per file for the life of the app, so reopening the window only
+# costs a stat of the stories file. The warm-up thread and the Tk thread both
+# open stores; the lock makes the second caller wait for the first build
+# instead of indexing the file (and writing its index) a second time.
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(stories_file):
+    with _stores_lock:
+        store = _stores.get(stories_file)
+        if store is None:
+            store = _stores[stories_file] = StoryStore(stories_file)
+        else:
+            store.refresh()
+        return store
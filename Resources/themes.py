@@ -1,4 +1,5 @@
 import tkinter as tk
+import weakref
 from ttkbootstrap import Style
 
 THEMES = {
@@ -130,11 +131,96 @@ THEMES = {
     }
 }
 
+DEFAULT_THEME = "Current (Black & Yellow)"
+
+# History chat bubbles keep their user / assistant colours in every theme
+BUBBLE_STYLES = {
+    "UserBubble.TLabel": "#3498db",
+    "AIBubble.TLabel": "#e74c3c",
+}
+
+
+def _role_styles(theme):
+    """configure() options for each themeable classic Tk widget role"""
+    return {
+        "window": {"bg": theme["bg"]},
+        "canvas": {"bg": theme["canvas_bg"]},
+        "label": {"bg": theme["bg"], "fg": theme["fg"]},
+        "button": {
+            "bg": theme["button_bg"],
+            "fg": theme["button_fg"],
+            "activebackground": theme["button_active_bg"],
+            "activeforeground": theme["button_active_fg"]
+        },
+        # Highlighted button, e.g. the playing track
+        "selected": {
+            "bg": theme["accent"],
+            "fg": "black",
+            "activebackground": theme["accent"],
+            "activeforeground": "black"
+        },
+        "listbox": {
+            "bg": theme["button_bg"],
+            "fg": theme["button_fg"],
+            "selectbackground": theme["dropdown_highlight"]
+        },
+        "text": {
+            "bg": theme["bg"],
+            "fg": theme["fg"],
+            "insertbackground": theme["fg"]
+        },
+    }
+
+
+# Precomputed once so a theme switch is only configure() calls
+ROLE_STYLES = {name: _role_styles(theme) for name, theme in THEMES.items()}
+
+
+def register_themed(widget, role):
+    """Register a classic Tk widget with the active ThemeManager (no-op if none)"""
+    manager = ThemeManager.active
+    if manager is not None:
+        manager.register(widget, role)
+    return widget
+
+
+def role_options(role):
+    """configure() options for `role` in the active theme"""
+    manager = ThemeManager.active
+    theme_name = manager.current_theme if manager is not None else DEFAULT_THEME
+    return ROLE_STYLES[theme_name][role]
+
+
 class ThemeManager:
+    # The manager of the running app; lets resource windows register widgets
+    # without holding a reference to the app
+    active = None
+
     def __init__(self, app):
         self.app = app
-        self.current_theme = "Current (Black & Yellow)"
-        
+        self.current_theme = DEFAULT_THEME
+        # role -> widgets; weak so destroyed windows drop out on their own
+        self._registry = {role: weakref.WeakSet() for role in ROLE_STYLES[DEFAULT_THEME]}
+        ThemeManager.active = self
+
+    def register(self, widget, role):
+        """Track a classic Tk widget that has no ttk style to follow themes.
+
+        A widget has one role at a time; registering it again moves it.
+        """
+        for widgets in self._registry.values():
+            widgets.discard(widget)
+        self._registry[role].add(widget)
+        if self.current_theme != DEFAULT_THEME:
+            self._configure(widget, ROLE_STYLES[self.current_theme][role])
+
+    @staticmethod
+    def _configure(widget, options):
+        try:
+            widget.configure(**options)
+        except tk.TclError:
+            pass  # Destroyed but not yet collected
+
     def apply_theme(self, theme_name):
         if theme_name not in THEMES:
             return
@@ -145,7 +231,8 @@ class ThemeManager:
         # Update main window background
         self.app.root.configure(bg=theme["bg"])
         
-        # Update style configuration
+        # Update style configuration; every ttk widget in every window
+        # follows these, so they are configured exactly once per switch
         style = Style()
         style.configure(".", 
                        background=theme["bg"], 
@@ -160,6 +247,16 @@ class ThemeManager:
                        background=theme["bg"], 
                        foreground=theme["fg"])
         
+        # Secondary text (dates, timestamps) keeps its muted color
+        style.configure("Caption.TLabel",
+                       background=theme["bg"])
+        style.configure("HistoryDate.TLabel",
+                       background=theme["bg"])
+        for bubble_style, bubble_bg in BUBBLE_STYLES.items():
+            style.configure(bubble_style,
+                           background=bubble_bg,
+                           foreground="white")
+        
         # Configure Button style
         style.configure("TButton", 
                        background=theme["button_bg"], 
@@ -173,9 +270,11 @@ class ThemeManager:
                        troughcolor=theme["progressbar_bg"],
                        background=theme["meter_bg"])
         
-        # Update canvas colors
-        self.app.canvas.configure(bg=theme["canvas_bg"])
-        self.app.menu_button.configure(bg=theme["canvas_bg"])
+        # Configure Entry style (the main text input is a ttk.Entry)
+        style.configure("TEntry",
+                       fieldbackground=theme["input_bg"],
+                       foreground=theme["input_fg"],
+                       insertcolor=theme["fg"])
         
         # Update circle colors
         self.app.canvas.itemconfig(self.app.circle, 
@@ -185,13 +284,6 @@ class ThemeManager:
                                       fill=theme["accent"], 
                                       outline=theme["accent"])
         
-        # Update text input
-        self.app.text_input.configure(
-            bg=theme["input_bg"], 
-            fg=theme["input_fg"],
-            insertbackground=theme["fg"]  # Cursor color
-        )
-        
         # Configure Combobox style
         style.configure("TCombobox",
                        fieldbackground=theme["dropdown_bg"],
@@ -207,57 +299,13 @@ class ThemeManager:
                  background=[("readonly", theme["dropdown_bg"])],
                  foreground=[("readonly", theme["dropdown_fg"])])
         
-        # Update any open windows
-        self._update_child_windows(theme)
+        # Classic Tk widgets registered by role, one pass with precomputed options
+        self._update_registered(theme_name)
         
-    def _update_child_windows(self, theme):
-        """Update all child windows with the new theme"""
-        # Update all toplevel windows
-        for window in self.app.root.winfo_children():
-            if isinstance(window, tk.Toplevel):
-                window.configure(bg=theme["bg"])
-                
-                # Update all frames and labels in the window
-                for child in window.winfo_children():
-                    self._update_widget_theme(child, theme)
-                        
-        # Update any open specialty windows
-        if hasattr(self.app, 'music_player') and self.app.music_player:
-            for widget in self.app.music_player.winfo_children():
-                self._update_widget_theme(widget, theme)
-                
-    def _update_widget_theme(self, widget, theme):
-        """Recursively update a widget and its children with the new theme"""
-        if isinstance(widget, (ttk.Frame, ttk.Label)):
-            widget.configure(background=theme["bg"])
-        elif isinstance(widget, tk.Label):
-            widget.configure(bg=theme["bg"], fg=theme["fg"])
-        elif isinstance(widget, tk.Canvas):
-            widget.configure(bg=theme["canvas_bg"])
-        elif isinstance(widget, ttk.Entry):
-            widget.configure(
-                fieldbackground=theme["input_bg"]
-            )
-        elif isinstance(widget, tk.Entry):
-            widget.configure(
-                bg=theme["input_bg"],
-                fg=theme["input_fg"],
-                insertbackground=theme["fg"]
-            )
-        elif isinstance(widget, tk.Button):
-            widget.configure(
-                bg=theme["button_bg"],
-                fg=theme["button_fg"],
-                activebackground=theme["button_active_bg"],
-                activeforeground=theme["button_active_fg"]
-            )
-        elif isinstance(widget, ttk.Combobox):
-            widget.configure(
-                background=theme["dropdown_bg"],
-                foreground=theme["dropdown_fg"],
-                fieldbackground=theme["dropdown_bg"]
-            )
-            
-        # Recursively update children
-        for child in widget.winfo_children():
-            self._update_widget_theme(child, theme)
\ No newline at end of file
+    def _update_registered(self, theme_name):
+        """Apply the theme's role styles to every registered, live widget"""
+        role_styles = ROLE_STYLES[theme_name]
+        for role, widgets in self._registry.items():
+            options = role_styles[role]
+            for widget in list(widgets):
+                self._configure(widget, options)